@@ -0,0 +1,79 @@
+"""Push notification that a game's QR code has been scanned.
+
+play_game publishes the game id on a pub/sub channel in the game store.
+Every worker runs one listener thread that records recently accessed ids
+and wakes any counter device long-polling for them. The counter hears
+about a scan as soon as it happens, without polling storage.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+log = logging.getLogger('cafe.access')
+
+ACCESS_CHANNEL = 'GAME_ACCESSED'
+ACCESS_RECENT_SIZE = int(os.getenv('ACCESS_RECENT_SIZE', '10000'))
+
+
+class AccessNotifier:
+    def __init__(self, store, channel=ACCESS_CHANNEL, recent_size=ACCESS_RECENT_SIZE):
+        self.store = store
+        self.channel = channel
+        self.recent_size = recent_size
+        self.recent = OrderedDict()  # game ids accessed recently, oldest first
+        self.condition = threading.Condition()
+        self.listening = False
+        self.thread = None
+        self.start_lock = threading.Lock()
+
+    def _mark(self, game_id):
+        with self.condition:
+            self.recent[game_id] = True
+            self.recent.move_to_end(game_id)
+            while len(self.recent) > self.recent_size:
+                self.recent.popitem(last=False)
+            self.condition.notify_all()
+
+    def publish(self, game_id):
+        """Record a scan locally and tell every other worker"""
+        self._mark(game_id)
+        try:
+            self.store.publish(self.channel, game_id)
+        except Exception as e:
+            log.warning("Access publish error", extra={'game_id': game_id, 'error': str(e)})
+
+    def seen(self, game_id):
+        with self.condition:
+            return game_id in self.recent
+
+    def wait(self, game_id, timeout):
+        """Block until game_id is accessed or timeout passes; True if accessed"""
+        self.ensure_listening()
+        with self.condition:
+            return self.condition.wait_for(lambda: game_id in self.recent, timeout)
+
+    def ensure_listening(self):
+        # Started lazily so the thread is created after gunicorn forks
+        with self.start_lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._listen_loop, name='access-listener', daemon=True)
+                self.thread.start()
+
+    def _listen_loop(self):
+        backoff = 1
+        while True:
+            try:
+                for game_id in self.store.listen(self.channel):
+                    if game_id is None:
+                        self.listening = True
+                        backoff = 1
+                    else:
+                        self._mark(game_id)
+            except Exception as e:
+                log.warning("Access listener error - reconnecting", extra={'error': str(e), 'backoff': backoff})
+            self.listening = False
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
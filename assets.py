@@ -0,0 +1,198 @@
+# assets.py - Build display-sized, fingerprinted images into static/dist
+#
+#   python assets.py                  # static/*.png|jpg -> static/dist + manifest.json
+#   python assets.py --quality 70 --workers 4
+#
+# Every still image in static/ is resized to the widths it is shown at
+# (DISPLAY_WIDTHS, at 1x and 2x pixel density, never upscaled) and encoded as
+# AVIF (when Pillow has an AVIF encoder - pillow-avif-plugin on Pillow < 11.2),
+# WebP and a PNG/JPEG fallback. Each file is named after a hash of its bytes,
+# e.g. ad1.800-3f2a9c1b0d.webp, so the server can mark everything under
+# /static/dist immutable, and a changed image gets a new URL.
+#
+# manifest.json maps each original filename to its variants; the templates'
+# picture() macro turns that into <picture> srcsets, and the /sw.js service
+# worker keeps whichever variants a phone fetched in a cache named after the
+# manifest version. Images the manifest doesn't cover (or that changed after the build)
+# are served from static/ as before.
+
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+try:
+    import pillow_avif  # noqa: F401 - registers the AVIF encoder on older Pillow
+except ImportError:  # optional: without it only WebP and the fallback are built
+    pass
+
+STATIC_DIR = 'static'
+DIST_DIR = 'dist'
+MANIFEST_FILE = 'manifest.json'
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif')
+
+# CSS widths each image is displayed at (the largest across pages and breakpoints)
+DISPLAY_WIDTHS = {
+    'QWORD_logo.png': (150, 200, 300),  # staff, game page, counter tablet
+    'ad1.png': (400, 850),  # phones, then .ad-image-large's max-width
+}
+DEFAULT_WIDTHS = (600,)
+DENSITIES = (1, 2)
+FORMATS = {'avif': 'image/avif', 'webp': 'image/webp'}
+
+log = logging.getLogger('cafe.assets')
+
+
+def target_widths(name, width):
+    """Pixel widths to build for an image: each display width at each density, capped at the original"""
+    widths = {min(css * density, width) for css in DISPLAY_WIDTHS.get(name, DEFAULT_WIDTHS) for density in DENSITIES}
+    return sorted(widths)
+
+
+def formats():
+    """Modern formats this Pillow can encode, best first"""
+    Image.init()
+    return [fmt for fmt in FORMATS if fmt.upper() in Image.SAVE]
+
+
+def slug(name):
+    return re.sub(r'[^A-Za-z0-9_-]+', '-', os.path.splitext(name)[0]).strip('-')
+
+
+def encode(image, fmt, quality):
+    buffer = io.BytesIO()
+    if fmt == 'png':
+        image.save(buffer, format='PNG', optimize=True)
+    elif fmt == 'jpg':
+        image.save(buffer, format='JPEG', quality=quality, optimize=True, progressive=True)
+    elif fmt == 'webp':
+        image.save(buffer, format='WEBP', quality=quality, method=6)
+    else:
+        image.save(buffer, format='AVIF', quality=quality)
+    return buffer.getvalue()
+
+
+def build_image(task):
+    """Resize and encode one source image; returns (name, manifest entry or None if it is animated)"""
+    name, static_dir, quality, modern = task
+    source = Image.open(os.path.join(static_dir, name))
+    if getattr(source, 'is_animated', False):
+        return name, None
+    has_alpha = source.mode in ('RGBA', 'LA', 'PA') or 'transparency' in source.info
+    source = source.convert('RGBA' if has_alpha else 'RGB')
+    fallback = 'png' if has_alpha else 'jpg'
+
+    entry = {'width': source.width, 'height': source.height, 'fallback': fallback, 'variants': {}}
+    for width in target_widths(name, source.width):
+        height = round(source.height * width / source.width)
+        image = source if width == source.width else source.resize((width, height), Image.LANCZOS)
+        for fmt in modern + [fallback]:
+            data = encode(image, fmt, quality)
+            filename = f"{slug(name)}.{width}-{hashlib.sha256(data).hexdigest()[:10]}.{fmt}"
+            path = os.path.join(static_dir, DIST_DIR, filename)
+            if not os.path.exists(path):
+                with open(path, 'wb') as f:
+                    f.write(data)
+            entry['variants'].setdefault(fmt, []).append([width, f"{DIST_DIR}/{filename}"])
+    return name, entry
+
+
+def build_assets(static_dir=STATIC_DIR, quality=75, workers=None):
+    """Build every variant and write the manifest; returns (manifest, source image names)"""
+    os.makedirs(os.path.join(static_dir, DIST_DIR), exist_ok=True)
+    names = sorted(name for name in os.listdir(static_dir)
+                   if name.lower().endswith(SOURCE_EXTENSIONS) and os.path.isfile(os.path.join(static_dir, name)))
+    tasks = [(name, static_dir, quality, formats()) for name in names]
+    with ProcessPoolExecutor(workers) as pool:
+        results = list(pool.map(build_image, tasks))
+
+    manifest = {name: entry for name, entry in results if entry}
+    with open(os.path.join(static_dir, DIST_DIR, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+    # Superseded fingerprints are no longer referenced - remove them
+    current = {path.split('/', 1)[1] for entry in manifest.values()
+               for variants in entry['variants'].values() for _, path in variants}
+    for filename in os.listdir(os.path.join(static_dir, DIST_DIR)):
+        if filename != MANIFEST_FILE and filename not in current:
+            os.remove(os.path.join(static_dir, DIST_DIR, filename))
+    return manifest, names
+
+
+class AssetManifest:
+    """The built image variants, as <picture> sources for templates"""
+
+    def __init__(self, entries, static_url='/static'):
+        self.entries = entries
+        self.static_url = static_url
+        self.version = hashlib.sha256(json.dumps(entries, sort_keys=True).encode()).hexdigest()[:10]
+
+    def url(self, path):
+        return f"{self.static_url}/{path}"
+
+    def picture(self, name):
+        """src, width, height and (mime type, srcset) sources for an image - the original if it wasn't built"""
+        entry = self.entries.get(name)
+        if not entry:
+            return {'src': self.url(name), 'width': None, 'height': None, 'sources': []}
+        sources = [(FORMATS[fmt], self.srcset(entry['variants'][fmt])) for fmt in FORMATS if fmt in entry['variants']]
+        fallback = entry['variants'][entry['fallback']]
+        return {'src': self.url(fallback[-1][1]), 'srcset': self.srcset(fallback),
+                'width': entry['width'], 'height': entry['height'], 'sources': sources}
+
+    def srcset(self, variants):
+        return ', '.join(f"{self.url(path)} {width}w" for width, path in variants)
+
+
+def load_manifest(static_dir=STATIC_DIR, static_url='/static'):
+    """The asset manifest, leaving out images changed since the build (those are served as-is)"""
+    path = os.path.join(static_dir, DIST_DIR, MANIFEST_FILE)
+    try:
+        built = os.path.getmtime(path)
+        with open(path) as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        return AssetManifest({}, static_url)
+    except Exception as e:
+        log.error("Error loading asset manifest", extra={'path': path, 'error': str(e)})
+        return AssetManifest({}, static_url)
+
+    for name in list(entries):
+        source = os.path.join(static_dir, name)
+        if os.path.exists(source) and os.path.getmtime(source) > built:
+            log.warning("Image is newer than its built variants - rebuild with 'python assets.py'",
+                        extra={'path': source})
+            del entries[name]
+    return AssetManifest(entries, static_url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build display-sized, fingerprinted images")
+    parser.add_argument('--static', default=STATIC_DIR)
+    parser.add_argument('--quality', type=int, default=75, help="AVIF/WebP/JPEG quality")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    start = time.perf_counter()
+    manifest, names = build_assets(args.static, args.quality, args.workers)
+    for name, entry in manifest.items():
+        original = os.path.getsize(os.path.join(args.static, name))
+        best = min(entry['variants'].values(), key=lambda variants: os.path.getsize(
+            os.path.join(args.static, variants[-1][1])))[-1]
+        print(f"  {name}: {original / 1024:.0f} KB -> {os.path.getsize(os.path.join(args.static, best[1])) / 1024:.0f} KB "
+              f"at {best[0]}px ({', '.join(entry['variants'])})")
+    skipped = [name for name in names if name not in manifest]
+    print(f"✅ Built {len(manifest)} images into {os.path.join(args.static, DIST_DIR)} "
+          f"in {time.perf_counter() - start:.2f}s" + (f" (kept animated: {', '.join(skipped)})" if skipped else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Asyncio versions of the storage drivers, for wordle_cafe_async.py.
+
+They mirror storage.py's GameStore drivers and store values in the same
+format, so sync and async workers can share one backend:
+
+    memory   wraps a storage.MemoryStore (calls never block on I/O)
+    redis    redis.asyncio with msgpack-encoded values
+    upstash  httpx.AsyncClient keep-alive pool against the REST API
+"""
+
+import itertools
+import json
+import os
+
+from storage import (GAME_STORE, REDIS_URL, STORAGE_TIMEOUT, SUBMIT_GUESS_SCRIPT,
+                     MemoryStore, RedisStore, StorageError, apply_guess)
+
+try:
+    import httpx
+except ImportError:  # only needed for the async serving mode
+    httpx = None
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # only needed for GAME_STORE=redis
+    aioredis = None
+
+# One event loop multiplexes every in-flight request, so the pool can be much larger than the sync one
+ASYNC_STORAGE_POOL_SIZE = int(os.getenv('ASYNC_STORAGE_POOL_SIZE', '200'))
+# httpcore scans every pooled connection on each request, which gets slow past a few
+# dozen connections, so the REST pool is split across several small clients
+ASYNC_POOL_SHARD_SIZE = 25
+
+
+class AsyncMemoryStore:
+    name = 'memory'
+
+    def __init__(self, store=None):
+        self.store = store or MemoryStore()
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ttl=None):
+        return self.store.set(key, value, ttl)
+
+    async def get_many(self, keys):
+        return self.store.get_many(keys)
+
+    async def set_many(self, items, ttl=None, expire_keys=()):
+        return self.store.set_many(items, ttl, expire_keys)
+
+    async def expire(self, key, ttl):
+        return self.store.expire(key, ttl)
+
+    async def submit_guess(self, key, guess, ttl=None, expire_keys=()):
+        return self.store.submit_guess(key, guess, ttl, expire_keys)
+
+    async def incr(self, key, amount=1):
+        return self.store.incr(key, amount)
+
+    async def incr_many(self, amounts, ttls=None):
+        return self.store.incr_many(amounts, ttls)
+
+    async def get_counts(self, keys):
+        return self.store.get_counts(keys)
+
+    async def publish(self, channel, message):
+        return self.store.publish(channel, message)
+
+    async def close(self):
+        pass
+
+
+class AsyncRedisStore:
+    name = 'redis'
+
+    def __init__(self, url=REDIS_URL, pool_size=ASYNC_STORAGE_POOL_SIZE, timeout=STORAGE_TIMEOUT):
+        if aioredis is None:
+            raise StorageError("GAME_STORE=redis needs the 'redis' and 'msgpack' packages")
+        self.client = aioredis.Redis.from_url(
+            url, max_connections=pool_size,
+            socket_timeout=timeout, socket_connect_timeout=timeout)
+
+    async def get(self, key):
+        return RedisStore.decode(await self.client.get(key))
+
+    async def set(self, key, value, ttl=None):
+        return bool(await self.client.set(key, RedisStore.encode(value), ex=ttl))
+
+    async def get_many(self, keys):
+        if not keys:
+            return []
+        return [RedisStore.decode(raw) for raw in await self.client.mget(keys)]
+
+    async def set_many(self, items, ttl=None, expire_keys=()):
+        if not items:
+            return True
+        if ttl is None:
+            return bool(await self.client.mset({k: RedisStore.encode(v) for k, v in items.items()}))
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(key, RedisStore.encode(value), ex=ttl)
+        for key in expire_keys:
+            pipe.expire(key, ttl)
+        return all((await pipe.execute())[:len(items)])
+
+    async def expire(self, key, ttl):
+        return bool(await self.client.expire(key, ttl))
+
+    async def submit_guess(self, key, guess, ttl=None, expire_keys=()):
+        async def transaction(pipe):
+            game = RedisStore.decode(await pipe.get(key))
+            if game is None:
+                return None
+            result = apply_guess(game, guess)
+            if result['applied']:
+                pipe.multi()
+                pipe.set(key, RedisStore.encode(game), ex=ttl)
+                for other in expire_keys if ttl else ():
+                    pipe.expire(other, ttl)
+            return result
+
+        return await self.client.transaction(transaction, key, value_from_callable=True)
+
+    async def incr(self, key, amount=1):
+        return int(await self.client.incrby(key, amount))
+
+    async def incr_many(self, amounts, ttls=None):
+        pipe = self.client.pipeline(transaction=False)
+        for key, amount in amounts.items():
+            pipe.incrby(key, amount)
+        for key, ttl in (ttls or {}).items():
+            pipe.expire(key, ttl)
+        return [int(v) for v in (await pipe.execute())[:len(amounts)]]
+
+    async def get_counts(self, keys):
+        if not keys:
+            return []
+        return [int(raw or 0) for raw in await self.client.mget(keys)]
+
+    async def publish(self, channel, message):
+        return await self.client.publish(channel, message)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class AsyncUpstashClient:
+    name = 'upstash'
+
+    def __init__(self, url, token, pool_size=ASYNC_STORAGE_POOL_SIZE, timeout=STORAGE_TIMEOUT):
+        if httpx is None:
+            raise StorageError("The async serving mode needs the 'httpx' package")
+        shard_size = min(pool_size, ASYNC_POOL_SHARD_SIZE)
+        self.clients = [
+            httpx.AsyncClient(
+                base_url=url.rstrip('/'),
+                headers={'Authorization': f"Bearer {token}"},
+                timeout=timeout,
+                limits=httpx.Limits(max_connections=shard_size, max_keepalive_connections=shard_size))
+            for _ in range(max(1, pool_size // shard_size))]
+        self.next_client = itertools.cycle(self.clients).__next__
+
+    async def post(self, path, body):
+        response = await self.next_client().post(path, json=body)
+        response.raise_for_status()
+        return response.json()
+
+    async def command(self, *args):
+        result = await self.post('', [str(arg) for arg in args])
+        if 'error' in result:
+            raise StorageError(result['error'])
+        return result.get('result')
+
+    async def get(self, key):
+        result = await self.command('GET', key)
+        return json.loads(result) if result else None
+
+    async def set(self, key, value, ttl=None):
+        if ttl:
+            return await self.command('SET', key, json.dumps(value), 'EX', int(ttl)) == 'OK'
+        return await self.command('SET', key, json.dumps(value)) == 'OK'
+
+    async def get_many(self, keys):
+        if not keys:
+            return []
+        return [json.loads(raw) if raw else None for raw in await self.command('MGET', *keys)]
+
+    async def set_many(self, items, ttl=None, expire_keys=()):
+        if not items:
+            return True
+        expiry = ['EX', str(int(ttl))] if ttl else []
+        commands = [['SET', k, json.dumps(v)] + expiry for k, v in items.items()]
+        commands += [['EXPIRE', key, str(int(ttl))] for key in expire_keys if ttl]
+        results = await self.post('/pipeline', commands)
+        errors = [r['error'] for r in results if 'error' in r]
+        if errors:
+            raise StorageError(errors[0])
+        return all(r.get('result') == 'OK' for r in results[:len(items)])
+
+    async def expire(self, key, ttl):
+        return bool(await self.command('EXPIRE', key, int(ttl)))
+
+    async def submit_guess(self, key, guess, ttl=None, expire_keys=()):
+        result = await self.command('EVAL', SUBMIT_GUESS_SCRIPT, 1 + len(expire_keys), key, *expire_keys,
+                                    guess, int(ttl) if ttl else '')
+        if result is None:
+            return None
+        result = json.loads(result)
+        result.setdefault('answer', None)
+        return result
+
+    async def incr(self, key, amount=1):
+        return int(await self.command('INCRBY', key, amount))
+
+    async def incr_many(self, amounts, ttls=None):
+        commands = [['INCRBY', key, str(amount)] for key, amount in amounts.items()]
+        commands += [['EXPIRE', key, str(int(ttl))] for key, ttl in (ttls or {}).items()]
+        results = await self.post('/pipeline', commands)
+        errors = [r['error'] for r in results if 'error' in r]
+        if errors:
+            raise StorageError(errors[0])
+        return [int(r['result']) for r in results[:len(amounts)]]
+
+    async def get_counts(self, keys):
+        if not keys:
+            return []
+        return [int(raw or 0) for raw in await self.command('MGET', *keys)]
+
+    async def publish(self, channel, message):
+        return await self.command('PUBLISH', channel, message)
+
+    async def close(self):
+        for client in self.clients:
+            await client.aclose()
+
+
+def get_async_store(driver=GAME_STORE, **options):
+    """Build the async driver named by GAME_STORE"""
+    if driver == 'memory':
+        return AsyncMemoryStore(options.get('store'))
+    if driver == 'redis':
+        return AsyncRedisStore(options.get('url', REDIS_URL))
+    if driver == 'upstash':
+        return AsyncUpstashClient(options['url'], options['token'])
+    raise StorageError(f"Unknown GAME_STORE driver: {driver!r}")
@@ -0,0 +1,87 @@
+# bench_catalog_memory.py - RSS of the expanded game list: dicts vs catalog table
+#
+# Run from the repo root:  python benchmarks/bench_catalog_memory.py
+#
+# Each measurement runs in a fresh interpreter so RSS numbers don't bleed
+# into each other.
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SYNTHETIC_PUZZLES = 50000
+
+
+def rss_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def load_puzzles(size):
+    from catalog import load_letter_puzzles
+    import generate_puzzles
+    if size == 'current':
+        return load_letter_puzzles(os.path.join(ROOT, 'letter_puzzles.txt'))
+    words = generate_puzzles.load_words(os.path.join(ROOT, 'words.txt'))
+    bands = generate_puzzles.parse_bands(generate_puzzles.DEFAULT_BANDS)
+    puzzles, _, _ = generate_puzzles.generate(int(size), bands, None, words, words, seed=3)
+    return puzzles
+
+
+def measure(mode, size):
+    """Runs inside the child: build the expanded games and report RSS growth"""
+    import contextlib
+    from catalog import Catalog, encode_catalog, load_word_list
+    from dictionary import Dictionary
+
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        dictionary = Dictionary(load_word_list(os.path.join(ROOT, 'words.txt')))
+        puzzles = load_puzzles(size)
+
+    before = rss_kb()
+    if mode == 'dicts':
+        games = []
+        catalog = Catalog(data=encode_catalog(dictionary, puzzles))
+        for puzzle_idx, puzzle in enumerate(puzzles):
+            first_game, count, _, _, _ = catalog.puzzle_record(puzzle_idx)
+            letters = puzzle['available_letters']
+            for answer_num in range(1, count + 1):
+                games.append({
+                    'puzzle_number': puzzle_idx + 1,
+                    'answer_number': answer_num,
+                    'total_answers_in_puzzle': count,
+                    'featured_letter': puzzle['featured_letter'],
+                    'available_letters': letters,
+                    'answer': catalog.word(catalog.game_pairs[(first_game + answer_num - 1) * 2 + 1]),
+                    'original_answer': puzzle['answer']
+                })
+        del catalog
+    else:
+        games = Catalog(data=encode_catalog(dictionary, puzzles)).games
+    print(len(games), rss_kb() - before)
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        measure(sys.argv[2], sys.argv[3])
+        return
+
+    print(f"{'catalog':>10} {'games':>9} {'dicts MB':>9} {'table MB':>9}")
+    for size in ['current', str(SYNTHETIC_PUZZLES)]:
+        results = {}
+        for mode in ['dicts', 'table']:
+            out = subprocess.run([sys.executable, __file__, '--child', mode, size],
+                                 capture_output=True, text=True, check=True).stdout.split()
+            results[mode] = (int(out[-2]), int(out[-1]))
+        games = results['dicts'][0]
+        print(f"{size:>10} {games:>9} {results['dicts'][1] / 1024:>9.1f} {results['table'][1] / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# bench_guess_stats.py - guess log aggregation throughput and memory
+#
+# Run from the repo root:  python benchmarks/bench_guess_stats.py [events]
+#
+# Writes a synthetic guess log (2M events by default) across a few daily
+# files: every catalog puzzle/answer pair, Zipf-distributed wrong guesses
+# drawn from a 50k-word vocabulary (far more distinct guesses than the
+# sketch keeps). Then runs guess_stats.py over it in a fresh process and
+# samples RSS as events go through, and checks the sketch's top wrong
+# guesses for the busiest puzzle against exact counts.
+
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import guess_stats
+
+EVENTS = 2_000_000
+DAYS = 4
+PUZZLES = 400
+ANSWERS_PER_PUZZLE = 6
+VOCABULARY = 50_000
+SAMPLES = 8
+
+AGGREGATE = """
+import os, sys, time
+sys.path.insert(0, {root!r})
+import guess_stats
+
+def rss_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+
+stats = guess_stats.empty_stats()
+baseline = rss_kb()
+every = max(1, {events} // {samples})
+start = time.perf_counter()
+for name in sorted(os.listdir({log_dir!r})):
+    for line, _ in guess_stats.read_new_lines(os.path.join({log_dir!r}, name), 0):
+        guess_stats.add_lines(stats, (line,))
+        if stats['events'] % every == 0:
+            print(f"{{stats['events']:>10}} events  RSS +{{(rss_kb() - baseline) / 1024:6.1f}} MB", flush=True)
+elapsed = time.perf_counter() - start
+print(f"{{stats['events']}} events in {{elapsed:.1f}}s = {{stats['events'] / elapsed:,.0f}} events/s")
+guess_stats.save_stats(stats, {out!r})
+"""
+
+
+def write_log(log_dir, events):
+    """Synthetic daily log files; returns exact wrong-guess counts for puzzle 1"""
+    rng = random.Random(7)
+    vocabulary = [f"W{i:05d}" for i in range(VOCABULARY)]
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY)]
+    exact = Counter()
+    now = time.time()
+    per_day = events // DAYS
+    for day in range(DAYS):
+        with open(os.path.join(log_dir, f"guesses-2026010{day + 1}.jsonl"), 'w') as f:
+            wrong = iter(rng.choices(vocabulary, weights, k=per_day))
+            for n in range(per_day):
+                puzzle = 1 if n % 10 == 0 else rng.randint(1, PUZZLES)
+                answer = rng.randint(1, ANSWERS_PER_PUZZLE)
+                won = rng.random() < 0.1 + 0.8 * (answer / ANSWERS_PER_PUZZLE)
+                guess = f"A{answer}" if won else next(wrong)
+                if puzzle == 1 and not won:
+                    exact[guess] += 1
+                opened = now - rng.randint(0, 86400)
+                f.write(json.dumps({'ts': round(opened + rng.expovariate(1 / 40), 3), 'game': f"g{day}-{n}",
+                                    'puzzle': puzzle, 'answer': answer, 'guess': guess,
+                                    'outcome': 'won' if won else 'lost', 'created': opened - 5,
+                                    'opened': round(opened, 3)}, separators=(',', ':')) + '\n')
+    return exact
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else EVENTS
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = os.path.join(tmp, 'log')
+        os.makedirs(log_dir)
+        start = time.perf_counter()
+        exact = write_log(log_dir, events)
+        size = sum(os.path.getsize(os.path.join(log_dir, n)) for n in os.listdir(log_dir))
+        print(f"Wrote {events} events ({size / 1e6:.0f} MB, {DAYS} files) in {time.perf_counter() - start:.1f}s\n")
+
+        out = os.path.join(tmp, 'stats.json')
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        subprocess.run([sys.executable, '-c', AGGREGATE.format(root=root, log_dir=log_dir, out=out,
+                                                               events=events, samples=SAMPLES)], check=True)
+
+        stats = guess_stats.load_stats(out)
+        print(f"\nStats file: {os.path.getsize(out) / 1e3:.0f} kB for {len(stats['pairs'])} pairs")
+        print(f"\nPuzzle 1 wrong guesses, sketch vs exact ({len(exact)} distinct):")
+        for guess, count in guess_stats.top_wrong_guesses(stats['puzzles']['1'], 5):
+            print(f"  {guess}  sketch {count:>6}  exact {exact[guess]:>6}")
+        sketch_top = [g for g, _ in guess_stats.top_wrong_guesses(stats['puzzles']['1'], 5)]
+        assert sketch_top == [g for g, _ in exact.most_common(5)], (sketch_top, exact.most_common(5))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# bench_logging.py - cost on the request thread of print() vs the queued logger
+#
+# Run from the repo root:  python benchmarks/bench_logging.py
+#
+# Both write 20k game-created lines to a pipe whose reader is slow (it
+# drains 4 KB every 2 ms, like a busy log shipper), and time each call on
+# the calling thread. print() has to wait whenever the pipe buffer is full;
+# log.info() only puts the record on the queue, and the listener thread
+# does the formatting and the blocking write.
+
+import io
+import logging
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logs
+
+LINES = 20_000
+
+
+def slow_pipe():
+    """A writable text stream drained slowly by a background thread"""
+    read_fd, write_fd = os.pipe()
+
+    def drain():
+        while os.read(read_fd, 4096):
+            time.sleep(0.002)
+
+    threading.Thread(target=drain, daemon=True).start()
+    return io.TextIOWrapper(os.fdopen(write_fd, 'wb', buffering=0), write_through=True)
+
+
+def report(label, times, total):
+    times.sort()
+    pct = lambda p: times[int(len(times) * p)] * 1e6
+    print(f"{label:<24} {pct(0.5):>8.1f} {pct(0.99):>9.1f} {times[-1] * 1e6:>10.0f} {total:>9.2f}")
+
+
+def timed(call):
+    times = []
+    start = time.perf_counter()
+    for n in range(LINES):
+        t = time.perf_counter()
+        call(n)
+        times.append(time.perf_counter() - t)
+    return times, time.perf_counter() - start
+
+
+def main():
+    print(f"{LINES} lines to a slow pipe; per-call time on the request thread")
+    print(f"{'':<24} {'p50 us':>8} {'p99 us':>9} {'max us':>10} {'total s':>9}")
+
+    stream = slow_pipe()
+    times, total = timed(lambda n: print(f"Game #{n}: Puzzle 12.3 created for game {n:08x}", file=stream))
+    report('print', times, total)
+
+    for label, sample in (('log.info (queued)', ''), ('log.info (10% sampled)', 'cafe.games=0.1')):
+        log = logs.setup_logging(level='INFO', sample=sample, stream=slow_pipe()).getChild('games')
+        times, total = timed(lambda n: log.info("Game created", extra={'sequence': n, 'puzzle': '12.3',
+                                                                         'game_id': f"{n:08x}"}))
+        stats = logs.log_stats()
+        report(label, times, total)
+        print(f"{'':<24} dropped {stats['dropped']}, sampled out {stats['sampled_out']}, still queued {stats['queued']}")
+        logs.stop_logging()
+        logging.getLogger(logs.ROOT_LOGGER).handlers.clear()
+
+
+if __name__ == "__main__":
+    main()
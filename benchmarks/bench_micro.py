@@ -0,0 +1,117 @@
+# bench_micro.py - regression numbers for the hot CPU paths
+#
+# Run from the repo root:
+#   python benchmarks/bench_micro.py                         # print the table
+#   python benchmarks/bench_micro.py --save baseline.json    # record a baseline
+#   python benchmarks/bench_micro.py --compare baseline.json # flag slowdowns (exit 1 if any)
+#
+# Times validate_word (valid guesses and each rejection path),
+# expand_puzzles_to_all_answers over the shipped puzzle file,
+# generate_qr_code in every format, and Wordle scoring and hints (direct,
+# and from feedback.bin when it has been built). Each case reports the best of REPEATS
+# runs, which is the least noisy estimate on a shared machine.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import timeit
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('LOG_LEVEL', 'ERROR')  # keep the server's logs out of the report
+os.environ['QR_POOL_SIZE'] = '0'
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import wordle_cafe
+
+from feedback import count_remaining, score as wordle_score
+
+REPEATS = 5
+THRESHOLD = 1.25  # --compare flags cases more than 25% slower than the baseline
+
+
+def guess_cases():
+    """(label, [(guess, letters, featured), ...]) for each validate_word path"""
+    rng = random.Random(1)
+    all_games = wordle_cafe.EXPANDED_GAMES
+    games = [all_games[i] for i in rng.sample(range(len(all_games)), min(500, len(all_games)))]
+    valid = [(g.answer, g.available_letters, g.featured_letter) for g in games]
+    not_a_word = [(g.featured_letter + 'QZXJ', g.available_letters, g.featured_letter) for g in games]
+    missing_featured = [(g.answer, g.available_letters, next(c for c in 'QZXJVK' if c not in g.answer))
+                        for g in games]
+    return [('valid', valid), ('not a word', not_a_word), ('no featured', missing_featured)]
+
+
+def cases():
+    """{name: (callable, operations per call)}"""
+    result = {}
+    for label, guesses in guess_cases():
+        result[f"validate_word ({label})"] = (
+            lambda guesses=guesses: [wordle_cafe.validate_word(*g) for g in guesses], len(guesses))
+    result['expand_puzzles_to_all_answers'] = (wordle_cafe.expand_puzzles_to_all_answers, 1)
+    rng = random.Random(2)
+    pairs = [(rng.choice(wordle_cafe.WORD_LIST), rng.choice(wordle_cafe.ANSWER_LIST)) for _ in range(500)]
+    hints = [([guess], [wordle_score(guess, answer)]) for guess, answer in pairs[:20]]
+    result['wordle score (direct)'] = (lambda: [wordle_score(*p) for p in pairs], len(pairs))
+    result['wordle remaining (direct)'] = (
+        lambda: [count_remaining(wordle_cafe.ANSWER_LIST, *h) for h in hints], len(hints))
+    if wordle_cafe.FEEDBACK:
+        result['wordle score (table)'] = (lambda: [wordle_cafe.FEEDBACK.code(*p) for p in pairs], len(pairs))
+        result['wordle remaining (table)'] = (lambda: [wordle_cafe.FEEDBACK.remaining(*h) for h in hints], len(hints))
+    urls = [f"https://example.com/game/{uuid.uuid4()}" for _ in range(20)]
+    for fmt in wordle_cafe.QR_FORMATS:
+        result[f"generate_qr_code ({fmt})"] = (
+            lambda fmt=fmt: [wordle_cafe.generate_qr_code(url, fmt) for url in urls], len(urls))
+    return result
+
+
+def run():
+    """{name: microseconds per operation}"""
+    results = {}
+    for name, (call, ops) in cases().items():
+        number, _ = timeit.Timer(call).autorange()
+        best = min(timeit.repeat(call, number=number, repeat=REPEATS)) / number
+        results[name] = best / ops * 1e6
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the hot CPU paths")
+    parser.add_argument('--save', metavar='FILE', help="write the results as a baseline")
+    parser.add_argument('--compare', metavar='FILE', help="compare against a saved baseline")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = run()
+    print(f"{'case':<40} {'us/op':>10} {'ops/s':>12}" + (f" {'baseline':>10} {'change':>8}" if baseline else ''))
+    regressions = []
+    for name, us in results.items():
+        line = f"{name:<40} {us:>10.2f} {1e6 / us:>12,.0f}"
+        if name in baseline:
+            ratio = us / baseline[name]
+            line += f" {baseline[name]:>10.2f} {(ratio - 1) * 100:>+7.0f}%"
+            if ratio > THRESHOLD:
+                line += "  SLOWER"
+                regressions.append(name)
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+    if regressions:
+        print(f"\n{len(regressions)} case(s) more than {(THRESHOLD - 1) * 100:.0f}% slower than the baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# bench_qr_formats.py - bytes on the wire and server CPU per QR: PNG vs SVG vs bitmap
+#
+# Run from the repo root:  python benchmarks/bench_qr_formats.py
+
+import contextlib
+import gzip
+import io
+import json
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('LOG_LEVEL', 'ERROR')  # keep the server's logs out of the report
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import wordle_cafe
+
+ROUNDS = 1000
+
+
+def main():
+    urls = [f"https://example.com/game/{uuid.uuid4()}" for _ in range(ROUNDS)]
+
+    for url in urls[:50]:  # warm up qrcode's lookup tables
+        wordle_cafe.generate_qr_code(url, 'png')
+
+    # Building the module matrix is shared by every format; report it separately
+    start = time.process_time()
+    for url in urls:
+        wordle_cafe.make_qr(url).get_matrix()
+    matrix_cpu = (time.process_time() - start) / ROUNDS * 1000
+    print(f"QR matrix (all formats): {matrix_cpu:.2f} ms CPU\n")
+
+    print(f"{'format':<8} {'CPU ms/QR':>10} {'render ms':>10} {'JSON bytes':>11} {'gzipped':>8}")
+    for fmt in wordle_cafe.QR_FORMATS:
+        start = time.process_time()
+        codes = [wordle_cafe.generate_qr_code(url, fmt) for url in urls]
+        cpu = (time.process_time() - start) / ROUNDS * 1000
+
+        # Size of the /api/create_game payload that carries the code
+        payloads = [json.dumps({'success': True, 'game_id': url[-36:], 'qr_code': code,
+                                'qr_format': fmt, 'game_url': url}).encode()
+                    for url, code in zip(urls, codes)]
+        raw = sum(len(p) for p in payloads) / ROUNDS
+        zipped = sum(len(gzip.compress(p)) for p in payloads) / ROUNDS
+        print(f"{fmt:<8} {cpu:>10.2f} {cpu - matrix_cpu:>10.2f} {raw:>11.0f} {zipped:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
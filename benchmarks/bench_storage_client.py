@@ -0,0 +1,53 @@
+# bench_storage_client.py - per-call requests vs pooled session vs pipeline
+#
+# Run from the repo root:  python benchmarks/bench_storage_client.py
+
+import json
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_upstash import FakeUpstash
+from storage import UpstashClient
+
+OPERATIONS = 200
+LATENCY = 0.005  # injected per-request server latency, seconds
+
+
+def unpooled(fake, key, value):
+    """What redis_get/redis_set used to do: a fresh connection every call"""
+    headers = {"Authorization": "Bearer test"}
+    requests.post(f"{fake.url}/set/{key}", headers=headers, data=json.dumps(value), timeout=5).json()
+    return requests.get(f"{fake.url}/get/{key}", headers=headers, timeout=5).json()
+
+
+def run(label, fake, body):
+    fake.reset_counters()
+    start = time.perf_counter()
+    for i in range(OPERATIONS):
+        body(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {elapsed / OPERATIONS * 1000:>8.2f} ms {fake.requests:>9} {fake.connections:>12}")
+
+
+def main():
+    fake = FakeUpstash(latency=LATENCY).start()
+    client = UpstashClient(fake.url, 'test')
+    game = {'id': 'x', 'status': 'active', 'available_letters': list('ABCDEFGHIJKL')}
+
+    print(f"{OPERATIONS} x (SET + GET), {LATENCY * 1000:.0f} ms injected latency")
+    print(f"{'mode':<22} {'per op':>11} {'requests':>9} {'connections':>12}")
+    run('requests per call', fake, lambda i: unpooled(fake, f"GAME_{i}", game))
+    run('pooled session', fake, lambda i: (client.set(f"GAME_{i}", game), client.get(f"GAME_{i}")))
+    run('pooled + pipeline', fake,
+        lambda i: client.pipeline().set(f"GAME_{i}", game).get(f"GAME_{i}").execute())
+    fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# bench_validate_word.py - per-guess validation cost as the word list grows
+#
+# Run from the repo root:  python benchmarks/bench_validate_word.py
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('LOG_LEVEL', 'ERROR')  # keep the server's logs out of the report
+
+import wordle_cafe
+from dictionary import Dictionary
+
+SIZES = [2315, 10000, 100000, 250000]
+GUESSES = 2000
+
+
+def legacy_validate(guess, available_letters, featured_letter, word_list):
+    """The list-scan + dict-count validation this module replaced"""
+    if len(guess) != 5 or featured_letter not in guess or guess not in word_list:
+        return False
+    available_count = {}
+    for letter in available_letters:
+        available_count[letter] = available_count.get(letter, 0) + 1
+    guess_count = {}
+    for letter in guess:
+        guess_count[letter] = guess_count.get(letter, 0) + 1
+    return all(available_count.get(l, 0) >= n for l, n in guess_count.items())
+
+
+def synthetic_words(base, size):
+    """Pad the real word list with random 5-letter strings"""
+    rng = random.Random(42)
+    words = list(base)
+    seen = set(words)
+    while len(words) < size:
+        word = ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(5))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def main():
+    puzzle = wordle_cafe.LETTER_PUZZLES[0]
+    letters, featured = puzzle['available_letters'], puzzle['featured_letter']
+    rng = random.Random(1)
+
+    print(f"{'words':>8} {'legacy us/guess':>16} {'dictionary us/guess':>20}")
+    for size in SIZES:
+        words = synthetic_words(wordle_cafe.WORD_LIST, size)
+        guesses = [rng.choice(words) for _ in range(GUESSES)]
+        wordle_cafe.DICTIONARY = Dictionary(words)
+
+        legacy = timeit.timeit(
+            lambda: [legacy_validate(g, letters, featured, words) for g in guesses[:200]],
+            number=1) / 200
+        current = timeit.timeit(
+            lambda: [wordle_cafe.validate_word(g, letters, featured) for g in guesses],
+            number=5) / (5 * GUESSES)
+        print(f"{size:>8} {legacy * 1e6:>16.2f} {current * 1e6:>20.2f}")
+
+
+if __name__ == "__main__":
+    main()
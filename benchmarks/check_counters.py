@@ -0,0 +1,111 @@
+# check_counters.py - dashboard counters stay exact across threads, outages and restarts
+#
+# Run from the repo root:  python benchmarks/check_counters.py
+#
+# Plays games through the real Flask app against the fake Upstash server:
+# first from many threads at once, then with the store dead (counts go to
+# memory and are added back when it recovers). A freshly started worker
+# process must then report exactly the expected totals.
+
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('LOG_LEVEL', 'ERROR')  # keep the server's logs out of the report
+
+os.environ.setdefault('STORAGE_TIMEOUT', '1')
+os.environ.setdefault('FAILOVER_PROBE_INTERVAL', '0.5')
+os.environ['QR_POOL_SIZE'] = '0'
+# Sequence numbers never come from the memory fallback, so keep the counter out of the outage
+os.environ['SEQUENCE_FILE'] = os.path.join(tempfile.mkdtemp(), 'sequence')
+
+from fake_upstash import FakeUpstash
+
+fake = FakeUpstash().start()
+os.environ['UPSTASH_REDIS_URL'] = fake.url
+with contextlib.redirect_stdout(io.StringIO()):
+    import wordle_cafe
+
+THREADS = 16
+GAMES_PER_THREAD = 10
+OUTAGE_GAMES = 20
+
+READ_TOTALS = """
+import contextlib, io, json
+with contextlib.redirect_stdout(io.StringIO()):
+    import wordle_cafe
+    totals = wordle_cafe.app.test_client().get('/api/stats?hours=1').get_json()['totals']
+print(json.dumps(totals))
+"""
+
+
+def play(client, win):
+    """Scan, open and guess one game, plus an ad click; returns the outcome"""
+    game_id = client.post('/api/create_game', json={}).get_json()['game_id']
+    client.get(f"/game/{game_id}")
+    game = wordle_cafe.get_game_instance(game_id)
+    guess = game['answer'] if win else wrong_word(game)
+    status = client.post(f"/game/{game_id}/guess", json={'guess': guess}).get_json()['status']
+    client.get('/ad_click')
+    return status
+
+
+def wrong_word(game):
+    for idx in wordle_cafe.DICTIONARY.matching_words(game['available_letters'], game['featured_letter']):
+        if wordle_cafe.DICTIONARY.words[idx] != game['answer']:
+            return wordle_cafe.DICTIONARY.words[idx]
+    return game['answer']
+
+
+def main():
+    outcomes = []
+
+    def player(n):
+        client = wordle_cafe.app.test_client()
+        for i in range(GAMES_PER_THREAD):
+            outcomes.append(play(client, win=(n + i) % 3 == 0))
+
+    threads = [threading.Thread(target=player, args=(n,)) for n in range(THREADS)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        fake.dead = True
+        client = wordle_cafe.app.test_client()
+        outcomes += [play(client, win=i % 2 == 0) for i in range(OUTAGE_GAMES)]
+        tripped = not wordle_cafe.STORAGE.closed
+        fake.dead = False
+        deadline = time.time() + 10
+        while not wordle_cafe.STORAGE.closed and time.time() < deadline:
+            time.sleep(0.1)
+
+    games = len(outcomes)
+    expected = {'scans': games, 'accesses': games, 'wins': outcomes.count('won'),
+                'losses': outcomes.count('lost'), 'ad_clicks': games}
+    restarted = json.loads(subprocess.run(
+        [sys.executable, '-c', READ_TOTALS], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=dict(os.environ), capture_output=True, text=True, check=True).stdout)
+
+    print(f"{games} games: {THREADS} threads x {GAMES_PER_THREAD}, then {OUTAGE_GAMES} with the store dead "
+          f"(circuit {'opened' if tripped else 'did not open'})")
+    print(f"{'counter':<10} {'expected':>9} {'restarted worker':>17}")
+    for event, count in expected.items():
+        print(f"{event:<10} {count:>9} {restarted[event]:>17}")
+    assert restarted == expected, (restarted, expected)
+    print("all counters exact")
+    fake.stop()
+
+
+if __name__ == "__main__":
+    main()
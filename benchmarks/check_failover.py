@@ -0,0 +1,119 @@
+# check_failover.py - the circuit breaker under a slow, then dead, then healthy store
+#
+# Run from the repo root:  python benchmarks/check_failover.py
+#
+# Drives the real Flask app against the fake Upstash server and flips the
+# fake between outage modes. Checks that page views stop waiting on the
+# store once the circuit opens, that games created during the outage keep
+# working from memory, and that they are copied back (with their TTL) after
+# the store recovers.
+
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('LOG_LEVEL', 'ERROR')  # keep the server's logs out of the report
+
+os.environ.setdefault('STORAGE_TIMEOUT', '1')
+os.environ.setdefault('FAILOVER_SLOW_CALL', '0.5')
+os.environ.setdefault('FAILOVER_PROBE_INTERVAL', '0.5')
+os.environ['QR_POOL_SIZE'] = '0'
+
+from fake_upstash import FakeUpstash
+
+fake = FakeUpstash().start()
+os.environ['UPSTASH_REDIS_URL'] = fake.url
+with contextlib.redirect_stdout(io.StringIO()):
+    import wordle_cafe
+
+VIEWS = 50
+client = wordle_cafe.app.test_client()
+store = wordle_cafe.STORAGE
+
+
+def timed_views(game_id, views=VIEWS):
+    """Milliseconds per /status view, in order"""
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(views):
+            start = time.perf_counter()
+            client.get(f"/game/{game_id}/status")
+            times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def report(label, times):
+    tripped_after = next((i for i, t in enumerate(times) if t < 20), len(times))
+    tail = times[tripped_after:] or [0]
+    print(f"{label:<34} {times[0]:>8.0f} {tripped_after:>8} {max(tail):>10.1f} {store.state:>10}")
+
+
+def create_and_win():
+    with contextlib.redirect_stdout(io.StringIO()):
+        game_id = client.post('/api/create_game', json={}).get_json()['game_id']
+        answer = wordle_cafe.get_game_instance(game_id)['answer']
+        assert client.get(f"/game/{game_id}").status_code == 200
+        body = client.post(f"/game/{game_id}/guess", json={'guess': answer}).get_json()
+    assert body['success'] and body['status'] == 'won', body
+    return game_id
+
+
+def wait_closed(timeout=10):
+    deadline = time.time() + timeout
+    while not store.closed and time.time() < deadline:
+        time.sleep(0.1)
+    assert store.closed, store.stats()
+
+
+def main():
+    with contextlib.redirect_stdout(io.StringIO()):
+        game_id = client.post('/api/create_game', json={}).get_json()['game_id']
+    print(f"{'phase':<34} {'first ms':>8} {'slow':>8} {'max after':>10} {'circuit':>10}")
+    print(f"{'':<34} {'':>8} {'views':>8} {'ms':>10}")
+    report('healthy', timed_views(game_id))
+
+    # Slow past the client timeout: the first FAILOVER_THRESHOLD views each wait
+    # STORAGE_TIMEOUT, then the circuit opens and views stop waiting
+    fake.latency = 3
+    report('slow (3s, beyond timeout)', timed_views(game_id))
+    outage_game = create_and_win()
+
+    # Dead: connections dropped - probes keep failing, views stay fast
+    fake.latency = 0
+    fake.dead = True
+    time.sleep(1.5)
+    report('dead', timed_views(game_id))
+    assert not store.closed
+
+    # Recovered: the probe reconciles the outage game and closes the circuit
+    fake.dead = False
+    wait_closed()
+    state = json.loads(fake.data[f"GAME_STATE_{outage_game}"])
+    ttl = fake.expiry[f"GAME_STATE_{outage_game}"] - time.time()
+    assert state['status'] == 'won' and ttl > 3600, (state, ttl)
+    assert f"GAME_{outage_game}" in fake.data
+    assert wordle_cafe.FALLBACK_STORE.get(f"GAME_STATE_{outage_game}") is None
+    report('recovered', timed_views(outage_game))
+    assert client.get(f"/game/{outage_game}/status").get_json()['status'] == 'won'
+
+    # Slow but answering (between FAILOVER_SLOW_CALL and the timeout) also trips it
+    fake.latency = 0.7
+    report('slow (0.7s, under timeout)', timed_views(game_id, 10))
+    fake.latency = 0
+    wait_closed()
+
+    stats = store.stats()
+    print(f"\ntrips {stats['trips']}, fallback calls {stats['fallback_calls']}, "
+          f"reconciled {stats['reconciled']} keys; outage game {outage_game[:8]} restored with "
+          f"{ttl / 3600:.0f}h TTL")
+    fake.stop()
+
+
+if __name__ == "__main__":
+    main()
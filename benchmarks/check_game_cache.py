@@ -0,0 +1,118 @@
+# check_game_cache.py - the per-worker game cache must never serve stale status
+#
+# Run from the repo root:  python benchmarks/check_game_cache.py
+#
+# Starts two worker processes running the real Flask app against one fake
+# Upstash server. For each game both workers load it (so both cache its
+# fields), then one worker submits the guess and the other must report the
+# finished status straight away - from a cache hit, not a refetch. Also checks
+# the cache stays within its size bound and drops expired entries.
+
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('LOG_LEVEL', 'ERROR')  # keep the server's logs out of the report
+
+from fake_upstash import FakeUpstash
+from game_cache import GameCache
+
+GAMES = 50
+
+
+def worker(url, conn):
+    os.environ['UPSTASH_REDIS_URL'] = url
+    os.environ['QR_POOL_SIZE'] = '0'
+    with contextlib.redirect_stdout(io.StringIO()):
+        import wordle_cafe
+        client = wordle_cafe.app.test_client()
+        conn.send('ready')
+        while True:
+            request = conn.recv()
+            if request is None:
+                return
+            method, path, body = request
+            if method == 'STATS':
+                conn.send(wordle_cafe.GAME_CACHE.stats())
+                continue
+            response = client.open(path, method=method, json=body)
+            conn.send((response.status_code, response.get_json(silent=True)))
+
+
+class Worker:
+    def __init__(self, url):
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.get_context('spawn').Process(target=worker, args=(url, child), daemon=True)
+        self.process.start()
+        assert self.conn.recv() == 'ready'
+
+    def call(self, method, path, body=None):
+        self.conn.send((method, path, body))
+        return self.conn.recv()
+
+    def stop(self):
+        self.conn.send(None)
+        self.process.join()
+
+
+def check_cross_worker(fake):
+    a, b = Worker(fake.url), Worker(fake.url)
+    for i in range(GAMES):
+        creator, guesser = (a, b) if i % 2 == 0 else (b, a)
+        game_id = creator.call('POST', '/api/create_game', {})[1]['game_id']
+        # Both workers load the game so both have its fields cached
+        assert creator.call('GET', f'/game/{game_id}')[0] == 200
+        assert guesser.call('GET', f'/game/{game_id}/status')[1]['status'] == 'active'
+
+        hits_before = creator.call('STATS', None)['hits']
+        answer = fake_answer(fake, game_id)
+        body = guesser.call('POST', f'/game/{game_id}/guess', {'guess': answer})[1]
+        assert body['success'] and body['status'] == 'won', body
+
+        status = creator.call('GET', f'/game/{game_id}/status')[1]
+        assert status['status'] == 'won' and not status['valid'], status
+        assert creator.call('STATS', None)['hits'] > hits_before, "status check missed the cache"
+        assert creator.call('GET', f'/game/{game_id}')[0] == 302
+
+    stats = [a.call('STATS', None), b.call('STATS', None)]
+    a.stop()
+    b.stop()
+    return stats
+
+
+def fake_answer(fake, game_id):
+    with fake.lock:
+        return json.loads(fake.data[f"GAME_{game_id}"])['answer']
+
+
+def check_bounds():
+    cache = GameCache(size=100, ttl=3600)
+    for i in range(10000):
+        cache.put(str(i), {'answer': 'CRANE'})
+    assert len(cache.entries) == 100
+    assert cache.get('0') is None and cache.get('9999') is not None
+
+    cache = GameCache(size=100, ttl=0)
+    cache.put('x', {'answer': 'CRANE'})
+    assert cache.get('x') is None and not cache.entries
+
+
+def main():
+    fake = FakeUpstash().start()
+    stats = check_cross_worker(fake)
+    print(f"{GAMES} games guessed through one worker, status read through the other: never stale")
+    for label, s in zip('AB', stats):
+        print(f"  worker {label}: {s['hits']} hits, {s['misses']} misses, {s['entries']} cached")
+    check_bounds()
+    print("cache holds at most max_entries and drops expired entries")
+    fake.stop()
+
+
+if __name__ == "__main__":
+    main()
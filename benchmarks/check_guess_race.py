@@ -0,0 +1,83 @@
+# check_guess_race.py - parallel guesses at one game must produce exactly one result
+#
+# Run from the repo root:  python benchmarks/check_guess_race.py
+#
+# Fires THREADS simultaneous POSTs at /game/<id>/guess (half the right answer,
+# half a wrong but valid word) through the real Flask app, once with the
+# in-memory driver and once against the fake Upstash server, and checks that
+# exactly one request was accepted and the stored game agrees with it.
+
+import contextlib
+import io
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('LOG_LEVEL', 'ERROR')  # keep the server's logs out of the report
+
+from fake_upstash import FakeUpstash
+
+THREADS = 32
+ROUNDS = 20
+
+fake = FakeUpstash(latency=0.002).start()
+os.environ['UPSTASH_REDIS_URL'] = fake.url
+with contextlib.redirect_stdout(io.StringIO()):
+    import wordle_cafe
+from storage import MemoryStore
+
+
+def wrong_word(game):
+    for idx in wordle_cafe.DICTIONARY.matching_words(game['available_letters'], game['featured_letter']):
+        word = wordle_cafe.DICTIONARY.words[idx]
+        if word != game['answer']:
+            return word
+    return None
+
+
+def race(store):
+    wordle_cafe.STORAGE = store
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = wordle_cafe.create_game_instance()
+    wrong = wrong_word(game)
+    guesses = [game['answer'] if i % 2 == 0 or wrong is None else wrong for i in range(THREADS)]
+    barrier = threading.Barrier(THREADS)
+    responses = []
+
+    def player(guess):
+        client = wordle_cafe.app.test_client()
+        barrier.wait()
+        response = client.post(f"/game/{game['id']}/guess", json={'guess': guess})
+        responses.append((guess, response.get_json()))
+
+    # redirect_stdout isn't thread-safe, so silence the server's prints around the whole race
+    threads = [threading.Thread(target=player, args=(g,)) for g in guesses]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    accepted = [(guess, body) for guess, body in responses if body.get('success')]
+    stored = wordle_cafe.get_game_instance(game['id'])
+    assert len(accepted) == 1, f"{len(accepted)} guesses accepted"
+    guess, body = accepted[0]
+    assert stored['guess'] == guess and stored['status'] == body['status']
+    return body['status']
+
+
+def main():
+    for label, make_store in [('memory', MemoryStore),
+                              ('upstash', lambda: wordle_cafe.get_store('upstash', url=fake.url, token='test'))]:
+        store = make_store()
+        outcomes = [race(store) for _ in range(ROUNDS)]
+        print(f"{label:<8} {ROUNDS} rounds x {THREADS} parallel guesses: exactly one accepted every time "
+              f"({outcomes.count('won')} won, {outcomes.count('lost')} lost)")
+    fake.stop()
+
+
+if __name__ == "__main__":
+    main()
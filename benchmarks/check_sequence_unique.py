@@ -0,0 +1,59 @@
+# check_sequence_unique.py - no duplicate game sequence numbers across processes
+#
+# Run from the repo root:  python benchmarks/check_sequence_unique.py
+#
+# PROCESSES worker processes each draw GAMES_PER_PROCESS sequence numbers
+# from a SequenceAllocator, first over a shared file counter, then over the
+# fake Upstash server's INCRBY, and the union is checked for duplicates.
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_upstash import FakeUpstash
+from sequence import FileCounter, SequenceAllocator
+from storage import UpstashClient
+
+PROCESSES = 8
+GAMES_PER_PROCESS = 500
+BLOCK_SIZE = 20
+
+
+def draw(backend, target):
+    if backend == 'file':
+        incr = FileCounter(target).incr
+    else:
+        incr = UpstashClient(target, 'test').incr
+    allocator = SequenceAllocator(incr, block_size=BLOCK_SIZE)
+    return [allocator.next() for _ in range(GAMES_PER_PROCESS)]
+
+
+def run(backend, target, counter_round_trips):
+    start = time.perf_counter()
+    with multiprocessing.Pool(PROCESSES) as pool:
+        results = pool.starmap(draw, [(backend, target)] * PROCESSES)
+    elapsed = time.perf_counter() - start
+
+    numbers = [n for result in results for n in result]
+    assert len(numbers) == len(set(numbers)), f"{len(numbers) - len(set(numbers))} duplicates"
+    assert max(numbers) <= PROCESSES * GAMES_PER_PROCESS
+    print(f"{backend:<8} {len(numbers)} numbers from {PROCESSES} processes, no duplicates, "
+          f"{counter_round_trips() or len(numbers) // BLOCK_SIZE} counter calls, {elapsed:.2f}s")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        run('file', os.path.join(tmp, 'sequence'), lambda: None)
+
+    fake = FakeUpstash().start()
+    run('upstash', fake.url, lambda: fake.commands)
+    fake.stop()
+
+
+if __name__ == "__main__":
+    main()
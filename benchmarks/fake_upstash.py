@@ -0,0 +1,281 @@
+# fake_upstash.py - local stand-in for the Upstash Redis REST API
+#
+#   python benchmarks/fake_upstash.py --port 8079 --latency 0.02
+#
+# Or in-process:
+#   server = FakeUpstash(latency=0.02).start()
+#   os.environ['UPSTASH_REDIS_URL'] = server.url
+#
+# Implements the subset of commands the cafe uses, counts requests and
+# commands, and can inject latency per request to mimic a remote region.
+#
+# Outages on demand: set server.latency (slow) or server.dead (drops every
+# connection without replying), or from another process:
+#   curl -X POST localhost:8079/_fake/latency/10
+#   curl -X POST localhost:8079/_fake/dead/1
+#
+# GET /_fake/stats returns the request, command and connection counts.
+
+import argparse
+import json
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage
+
+
+# The fake has no Lua interpreter: EVAL looks the script text up here and runs
+# a Python equivalent while holding the data lock, which keeps it atomic.
+def _submit_guess(fake, keys, argv):
+    if not fake._alive(keys[0]):
+        return None
+    game = json.loads(fake.data[keys[0]])
+    result = storage.apply_guess(game, argv[0])
+    if result['applied']:
+        fake.data[keys[0]] = json.dumps(game)
+        fake.expiry.pop(keys[0], None)
+        if argv[1]:
+            for key in keys:
+                if fake._alive(key):
+                    fake.expiry[key] = time.time() + int(argv[1])
+    else:
+        del result['answer']
+    return json.dumps(result)
+
+
+SCRIPTS = {
+    storage.SUBMIT_GUESS_SCRIPT: _submit_guess,
+}
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # load tests open hundreds of connections at once
+
+    def handle_error(self, request, client_address):
+        # Clients that time out on a slow fake hang up mid-reply; that's expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeUpstash:
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0):
+        self.latency = latency
+        self.dead = False
+        self.data = {}
+        self.expiry = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.commands = 0
+        self.connections = 0
+        self.subscribers = {}  # channel -> list of queues, one per open /subscribe stream
+        self.server = Server((host, port), self._handler())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_counters(self):
+        self.requests = self.commands = self.connections = 0
+
+    # -- command execution -------------------------------------------------
+
+    def _alive(self, key):
+        deadline = self.expiry.get(key)
+        if deadline is not None and deadline <= time.time():
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+        return key in self.data
+
+    def execute(self, args):
+        name = args[0].upper()
+        args = args[1:]
+        with self.lock:
+            self.commands += 1
+            if name == 'PING':
+                return 'PONG'
+            if name == 'GET':
+                return self.data[args[0]] if self._alive(args[0]) else None
+            if name == 'MGET':
+                return [self.data[k] if self._alive(k) else None for k in args]
+            if name == 'SET':
+                key, value = args[0], args[1]
+                options = [a.upper() for a in args[2:]]
+                if 'NX' in options and self._alive(key):
+                    return None
+                self.data[key] = value
+                self.expiry.pop(key, None)
+                if 'EX' in options:
+                    self.expiry[key] = time.time() + int(args[2 + options.index('EX') + 1])
+                return 'OK'
+            if name == 'SETEX':
+                self.data[args[0]] = args[2]
+                self.expiry[args[0]] = time.time() + int(args[1])
+                return 'OK'
+            if name == 'EXPIRE':
+                if not self._alive(args[0]):
+                    return 0
+                self.expiry[args[0]] = time.time() + int(args[1])
+                return 1
+            if name == 'DEL':
+                removed = sum(1 for k in args if self._alive(k))
+                for k in args:
+                    self.data.pop(k, None)
+                    self.expiry.pop(k, None)
+                return removed
+            if name == 'PUBLISH':
+                listeners = self.subscribers.get(args[0], [])
+                for q in listeners:
+                    q.put(args[1])
+                return len(listeners)
+            if name == 'EVAL':
+                script = SCRIPTS.get(args[0])
+                if script is None:
+                    raise ValueError("ERR fake server has no Python equivalent for this script")
+                numkeys = int(args[1])
+                return script(self, args[2:2 + numkeys], args[2 + numkeys:])
+            if name in ('INCR', 'INCRBY'):
+                amount = int(args[1]) if name == 'INCRBY' else 1
+                value = int(self.data[args[0]]) + amount if self._alive(args[0]) else amount
+                self.data[args[0]] = str(value)
+                return value
+            raise ValueError(f"ERR unknown command '{name}'")
+
+    def _run(self, args):
+        try:
+            return {'result': self.execute(args)}
+        except Exception as e:
+            return {'error': str(e)}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out as separate writes; without this
+                # Nagle + delayed ACK adds ~40 ms to every keep-alive reply
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                fake.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, body, status=200):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _begin(self):
+                """False when the request must go unanswered because the server is 'dead'"""
+                if fake.dead:
+                    self.close_connection = True
+                    return False
+                fake.requests += 1
+                if fake.latency:
+                    time.sleep(fake.latency)
+                return True
+
+            def _control(self, parts):
+                # /_fake/latency/<seconds>, /_fake/dead/<0|1> - answered even while dead
+                setting, value = parts[1], parts[2]
+                if setting == 'latency':
+                    fake.latency = float(value)
+                elif setting == 'dead':
+                    fake.dead = value == '1'
+                self._reply({'result': 'OK'})
+
+            def do_GET(self):
+                if self.path == '/_fake/stats':
+                    # Request counters for load tests; not counted itself
+                    return self._reply({'requests': fake.requests, 'commands': fake.commands,
+                                        'connections': fake.connections})
+                # Path-style commands: /get/KEY, /incr/KEY
+                if not self._begin():
+                    return
+                parts = [p for p in self.path.split('/') if p]
+                self._reply(fake._run(parts) if parts else {'error': 'ERR empty command'})
+
+            def _subscribe(self, channel):
+                q = queue.Queue()
+                with fake.lock:
+                    fake.subscribers.setdefault(channel, []).append(q)
+                try:
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/event-stream')
+                    self.send_header('Connection', 'close')
+                    self.end_headers()
+                    self.close_connection = True
+                    self.wfile.write(f"data: subscribe,{channel},1\n\n".encode())
+                    self.wfile.flush()
+                    while not fake.dead:
+                        try:
+                            message = q.get(timeout=1)
+                        except queue.Empty:
+                            self.wfile.write(b": keep-alive\n\n")
+                        else:
+                            self.wfile.write(f"data: message,{channel},{message}\n\n".encode())
+                        self.wfile.flush()
+                except OSError:
+                    pass
+                finally:
+                    with fake.lock:
+                        fake.subscribers[channel].remove(q)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length).decode()
+                parts = [p for p in self.path.split('/') if p]
+                if len(parts) == 3 and parts[0] == '_fake':
+                    return self._control(parts)
+                if not self._begin():
+                    return
+                if len(parts) == 2 and parts[0] == 'subscribe':
+                    self._subscribe(parts[1])
+                elif parts == ['pipeline']:
+                    self._reply([fake._run(command) for command in json.loads(raw)])
+                elif parts:
+                    # Path-style SET: /set/KEY with the value as the body
+                    self._reply(fake._run(parts + [raw]))
+                else:
+                    self._reply(fake._run(json.loads(raw)))
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Upstash REST stand-in")
+    parser.add_argument('--port', type=int, default=8079)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every request")
+    args = parser.parse_args()
+
+    fake = FakeUpstash(port=args.port, latency=args.latency)
+    print(f"Fake Upstash listening on {fake.url} (latency {args.latency * 1000:.0f} ms)")
+    fake.server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# load_async_vs_sync.py - gunicorn threads vs hypercorn asyncio under slow storage
+#
+# Run from the repo root:  python benchmarks/load_async_vs_sync.py
+#
+# Starts a fake Upstash with injected latency, then serves the cafe both ways
+# and fires CONCURRENCY simultaneous /game/<id>/status requests at each.
+# Every status check is one storage round trip, so the sync server tops out
+# at workers x threads in-flight requests while the async one does not.
+
+import asyncio
+import itertools
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LATENCY = 0.2  # injected per-request storage latency, seconds
+WORKERS = 2
+THREADS = 8  # matches the Procfile
+CONCURRENCY = 200
+REQUESTS = 1000
+FAKE_PORT = 8100
+CLIENT_SHARDS = 8  # one big httpx pool would bottleneck the load generator itself
+
+SERVERS = {
+    'gunicorn sync': ['gunicorn', 'wordle_cafe:app', '--workers', str(WORKERS),
+                      '--threads', str(THREADS), '--bind', '127.0.0.1:{port}'],
+    'hypercorn async': ['hypercorn', 'wordle_cafe_async:application', '--workers', str(WORKERS),
+                        '--bind', '127.0.0.1:{port}'],
+}
+
+
+def start_server(command, port):
+    env = dict(os.environ, UPSTASH_REDIS_URL=f"http://127.0.0.1:{FAKE_PORT}", QR_POOL_SIZE='0')
+    process = subprocess.Popen([arg.format(port=port) for arg in command], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=5).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.kill()
+    raise RuntimeError(f"{command[0]} did not come up")
+
+
+async def load(base_url, game_id):
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    limits = httpx.Limits(max_connections=CONCURRENCY // CLIENT_SHARDS)
+    clients = [httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60)
+               for _ in range(CLIENT_SHARDS)]
+    next_client = itertools.cycle(clients).__next__
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await next_client().get(f"/game/{game_id}/status")
+                ok = response.status_code == 200 and response.json().get('valid')
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(REQUESTS)))
+    elapsed = time.perf_counter() - start
+    for client in clients:
+        await client.aclose()
+
+    latencies.sort()
+    return {
+        'throughput': REQUESTS / elapsed,
+        'p50': latencies[len(latencies) // 2] * 1000,
+        'p99': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        'errors': errors,
+    }
+
+
+def main():
+    # Separate process, so the fake's threads don't share a GIL with the load generator
+    fake = subprocess.Popen([sys.executable, os.path.join(ROOT, 'benchmarks', 'fake_upstash.py'),
+                             '--port', str(FAKE_PORT), '--latency', str(LATENCY)],
+                            stdout=subprocess.DEVNULL)
+    time.sleep(1)
+
+    print(f"{REQUESTS} x GET /game/<id>/status, {CONCURRENCY} concurrent, "
+          f"{LATENCY * 1000:.0f} ms storage latency, {WORKERS} workers")
+    print(f"{'server':<18} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for port, (label, command) in enumerate(SERVERS.items(), start=8101):
+        process, base_url = start_server(command, port)
+        try:
+            game_id = httpx.post(f"{base_url}/api/create_game", json={}, timeout=30).json()['game_id']
+            result = asyncio.run(load(base_url, game_id))
+        finally:
+            process.terminate()
+            process.wait()
+        print(f"{label:<18} {result['throughput']:>8.1f} {result['p50']:>9.0f} "
+              f"{result['p99']:>9.0f} {result['errors']:>7}")
+    fake.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+# load_test.py - the whole cafe flow under load, against the fake store
+#
+# Run from the repo root:
+#   python benchmarks/load_test.py
+#   python benchmarks/load_test.py --counters 8 --customers 64 --duration 30 --latency 0.02
+#   python benchmarks/load_test.py --server hypercorn
+#
+# Serves the real app (gunicorn with the Procfile's threads, or the asyncio
+# app under hypercorn) in front of benchmarks/fake_upstash.py, each in its
+# own process, then runs two phases:
+#
+#   calibration  every logical action alone, repeated, counting the store
+#                round trips (HTTP requests to the fake) and commands it costs
+#   load         counter devices mint games and poll until they are scanned,
+#                customers open them, check status and guess, and an admin
+#                page auto-refreshes, all at once for --duration seconds
+#
+# and reports throughput and p50/p95/p99 latency per action, next to its
+# storage cost. The QR pool is off by default (--qr-pool) so minting a game
+# is paid for by the create_game request that needs it.
+
+import argparse
+import json
+import os
+import queue
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from catalog import load_word_list
+from dictionary import Dictionary
+
+FAKE_PORT = 8110
+SERVER_PORT = 8111
+CALIBRATION_ROUNDS = 20
+ADMIN_PASSWORD = 'load-test'
+ACTIONS = ('create_game', 'counter_poll', 'open_game', 'status', 'guess', 'admin')
+
+SERVERS = {
+    'gunicorn': ['gunicorn', 'wordle_cafe:app', '--workers', '{workers}', '--threads', '8',
+                 '--bind', f'127.0.0.1:{SERVER_PORT}'],
+    'hypercorn': ['hypercorn', 'wordle_cafe_async:application', '--workers', '{workers}',
+                  '--bind', f'127.0.0.1:{SERVER_PORT}'],
+}
+
+GAME_DATA = re.compile(r'const gameData = (\{.*?\});')
+
+
+class Cafe:
+    """HTTP client for one simulated device, timing every action"""
+
+    def __init__(self, base_url, results, words):
+        self.client = httpx.Client(base_url=base_url, timeout=60)
+        self.results = results
+        self.words = words
+
+    def timed(self, action, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.client.request(method, path, **kwargs)
+            ok = response.status_code < 500
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.results[action].append((time.perf_counter() - start, ok))
+        return response
+
+    def create_game(self):
+        response = self.timed('create_game', 'POST', '/api/create_game', json={'format': 'bitmap'})
+        return response.json().get('game_id') if response is not None and response.status_code == 200 else None
+
+    def counter_poll(self, game_id):
+        response = self.timed('counter_poll', 'GET', f'/api/check_game_access/{game_id}')
+        return response is not None and response.status_code == 200 and response.json().get('accessed')
+
+    def open_game(self, game_id):
+        """Letters and featured letter from the game page, or None"""
+        response = self.timed('open_game', 'GET', f'/game/{game_id}', follow_redirects=False)
+        match = GAME_DATA.search(response.text) if response is not None and response.status_code == 200 else None
+        return json.loads(match.group(1)) if match else None
+
+    def status(self, game_id):
+        self.timed('status', 'GET', f'/game/{game_id}/status')
+
+    def guess(self, game_id, game):
+        self.timed('guess', 'POST', f'/game/{game_id}/guess', json={'guess': self.pick_word(game)})
+
+    def admin(self):
+        self.timed('admin', 'GET', '/admin', auth=('admin', ADMIN_PASSWORD))
+
+    def pick_word(self, game):
+        """A valid word from the game's letters, like a customer who knows the rules"""
+        if not game:
+            return 'XXXXX'
+        matches = self.words.matching_words(game['available_letters'], game['featured_letter'])
+        return self.words.words[random.choice(matches)] if len(matches) else 'XXXXX'
+
+
+def fake_stats(fake_url):
+    return httpx.get(f'{fake_url}/_fake/stats', timeout=10).json()
+
+
+def start_processes(args, log_dir):
+    fake = subprocess.Popen([sys.executable, os.path.join(ROOT, 'benchmarks', 'fake_upstash.py'),
+                             '--port', str(FAKE_PORT), '--latency', str(args.latency)],
+                            stdout=subprocess.DEVNULL)
+    env = dict(os.environ, UPSTASH_REDIS_URL=f'http://127.0.0.1:{FAKE_PORT}', QR_POOL_SIZE=str(args.qr_pool),
+               LOG_LEVEL='WARNING', GUESS_LOG_DIR=log_dir, ADMIN_PASSWORD=ADMIN_PASSWORD)
+    command = [arg.format(workers=args.workers) for arg in SERVERS[args.server]]
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{SERVER_PORT}'
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            if httpx.get(f'{base_url}/health', timeout=5).status_code == 200:
+                return fake, server, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    fake.kill()
+    server.kill()
+    raise RuntimeError(f"{args.server} did not come up")
+
+
+def calibrate(base_url, fake_url, words):
+    """{action: (round trips, commands)} averaged over CALIBRATION_ROUNDS sequential runs"""
+    totals = {action: [0, 0] for action in ACTIONS}
+    cafe = Cafe(base_url, {action: [] for action in ACTIONS}, words)
+
+    def measure(action, call, *args):
+        before = fake_stats(fake_url)
+        result = call(*args)
+        after = fake_stats(fake_url)
+        totals[action][0] += after['requests'] - before['requests']
+        totals[action][1] += after['commands'] - before['commands']
+        return result
+
+    for _ in range(CALIBRATION_ROUNDS):
+        game_id = measure('create_game', cafe.create_game)
+        measure('counter_poll', cafe.counter_poll, game_id)
+        game = measure('open_game', cafe.open_game, game_id)
+        measure('status', cafe.status, game_id)
+        measure('guess', cafe.guess, game_id, game)
+        measure('admin', cafe.admin)
+    return {action: (rt / CALIBRATION_ROUNDS, cmds / CALIBRATION_ROUNDS) for action, (rt, cmds) in totals.items()}
+
+
+def run_load(args, base_url, words):
+    results = {action: [] for action in ACTIONS}
+    handoff = queue.Queue(maxsize=args.customers)
+    stop = threading.Event()
+
+    def counter():
+        cafe = Cafe(base_url, results, words)
+        while not stop.is_set():
+            game_id = cafe.create_game()
+            if not game_id:
+                continue
+            handoff.put(game_id)
+            # Poll like the counter page until a customer scans the code
+            while not stop.is_set() and not cafe.counter_poll(game_id):
+                stop.wait(args.poll_interval)
+
+    def customer():
+        cafe = Cafe(base_url, results, words)
+        while not stop.is_set():
+            try:
+                game_id = handoff.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            game = cafe.open_game(game_id)
+            cafe.status(game_id)
+            cafe.guess(game_id, game)
+
+    def admin():
+        cafe = Cafe(base_url, results, words)
+        while not stop.wait(args.admin_interval):
+            cafe.admin()
+
+    threads = ([threading.Thread(target=counter) for _ in range(args.counters)] +
+               [threading.Thread(target=customer) for _ in range(args.customers)] +
+               [threading.Thread(target=admin)])
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(args.duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    return results, time.perf_counter() - start
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test of the full cafe flow")
+    parser.add_argument('--server', choices=SERVERS, default='gunicorn')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--counters', type=int, default=4, help="counter devices minting games")
+    parser.add_argument('--customers', type=int, default=32, help="customers playing")
+    parser.add_argument('--duration', type=float, default=20, help="seconds of load")
+    parser.add_argument('--latency', type=float, default=0.002, help="injected store latency, seconds")
+    parser.add_argument('--poll-interval', type=float, default=0.25, help="counter poll interval, seconds")
+    parser.add_argument('--admin-interval', type=float, default=1.0, help="admin refresh interval, seconds")
+    parser.add_argument('--qr-pool', type=int, default=0, help="QR_POOL_SIZE for the server")
+    parser.add_argument('--json', metavar='FILE', help="also write the results as JSON")
+    args = parser.parse_args()
+
+    words = Dictionary(load_word_list(os.path.join(ROOT, 'words.txt')))
+    fake_url = f'http://127.0.0.1:{FAKE_PORT}'
+    with tempfile.TemporaryDirectory() as log_dir:
+        fake, server, base_url = start_processes(args, log_dir)
+        try:
+            costs = calibrate(base_url, fake_url, words)
+            before = fake_stats(fake_url)
+            results, elapsed = run_load(args, base_url, words)
+            after = fake_stats(fake_url)
+        finally:
+            server.terminate()
+            server.wait()
+            fake.terminate()
+
+    print(f"{args.server}, {args.workers} workers | {args.counters} counters, {args.customers} customers, "
+          f"admin every {args.admin_interval}s | {args.duration:.0f}s, store latency {args.latency * 1000:.0f} ms")
+    print(f"{'action':<13} {'count':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} "
+          f"{'store RT':>9} {'commands':>9}")
+    report = {}
+    for action in ACTIONS:
+        samples = results[action]
+        latencies = sorted(t for t, _ in samples)
+        errors = sum(1 for _, ok in samples if not ok)
+        round_trips, commands = costs[action]
+        report[action] = {'count': len(samples), 'rps': len(samples) / elapsed, 'errors': errors,
+                          'round_trips': round_trips, 'commands': commands}
+        if latencies:
+            report[action].update(p50=percentile(latencies, 0.5), p95=percentile(latencies, 0.95),
+                                  p99=percentile(latencies, 0.99))
+            print(f"{action:<13} {len(samples):>7} {len(samples) / elapsed:>8.1f} {report[action]['p50']:>8.1f} "
+                  f"{report[action]['p95']:>8.1f} {report[action]['p99']:>8.1f} {errors:>7} "
+                  f"{round_trips:>9.2f} {commands:>9.2f}")
+        else:
+            print(f"{action:<13} {0:>7}")
+
+    total = sum(len(results[a]) for a in ACTIONS)
+    games = len(results['guess'])
+    store_requests = after['requests'] - before['requests']
+    print(f"\n{total} requests, {total / elapsed:.1f} req/s; {games} games played, {games / elapsed:.1f}/s")
+    print(f"store: {store_requests} round trips, {store_requests / max(total, 1):.2f} per request, "
+          f"{store_requests / max(games, 1):.1f} per game played (all actions, incl. polling)")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'elapsed': elapsed, 'actions': report,
+                       'store_round_trips': store_requests}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
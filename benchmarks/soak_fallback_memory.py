@@ -0,0 +1,79 @@
+# soak_fallback_memory.py - worker memory while the game store is down
+#
+# Run from the repo root:  python benchmarks/soak_fallback_memory.py [games]
+#
+# Points the cafe at a store that refuses every call, so every game created
+# lands in the in-memory fallback, then creates a million games and samples
+# RSS along the way. The capped fallback (FALLBACK_MAX_KEYS) should stay
+# flat; --uncapped shows the old unbounded growth for comparison.
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('LOG_LEVEL', 'ERROR')  # keep the server's logs out of the report
+
+from storage import GameStore, MemoryStore, StorageError
+
+GAMES = 1_000_000
+SAMPLES = 10
+
+
+class DownStore(GameStore):
+    """A backend in the middle of an outage"""
+
+    name = 'down'
+
+    def _fail(self, *args, **kwargs):
+        raise StorageError("connection refused")
+
+    get = set = delete = expire = submit_guess = incr = publish = listen = get_many = set_many = _fail
+
+
+def rss_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def main():
+    uncapped = '--uncapped' in sys.argv
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    games = int(args[0]) if args else GAMES
+
+    # Keep the sequence counter out of the measured store
+    os.environ['SEQUENCE_FILE'] = os.path.join(tempfile.mkdtemp(), 'sequence')
+    with contextlib.redirect_stdout(io.StringIO()):
+        import wordle_cafe
+    wordle_cafe.STORAGE.primary = DownStore()
+    if uncapped:
+        wordle_cafe.FALLBACK_STORE = wordle_cafe.STORAGE.fallback = MemoryStore()
+
+    label = 'uncapped' if uncapped else f"max_keys={wordle_cafe.FALLBACK_STORE.max_keys}"
+    print(f"{games} games created with the store down, fallback {label}")
+    print(f"{'games':>10} {'RSS MB':>8} {'keys':>8} {'evictions':>10} {'us/game':>8}")
+    start_rss = rss_kb()
+    step = games // SAMPLES
+    sink = io.StringIO()
+    for sample in range(SAMPLES):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(sink):
+            for _ in range(step):
+                wordle_cafe.create_game_instance()
+                sink.seek(0)
+                sink.truncate()
+        elapsed = time.perf_counter() - start
+        stats = wordle_cafe.FALLBACK_STORE.stats()
+        print(f"{(sample + 1) * step:>10} {(rss_kb() - start_rss) / 1024:>8.1f} {stats['keys']:>8} "
+              f"{stats['evictions']:>10} {elapsed / step * 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# store_conformance.py - run the same storage checks against every driver
+#
+# Run from the repo root:  python benchmarks/store_conformance.py
+#
+# memory and upstash (against the local fake) always run; redis runs when
+# REDIS_URL points at a reachable server.
+
+import json
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage
+from fake_upstash import FakeUpstash
+
+GAME = {
+    'id': 'conformance', 'type': 'letter_puzzle',
+    'available_letters': list('LSUHTEWYWHED'), 'featured_letter': 'S',
+    'answer': 'DUSTY', 'guess': None, 'status': 'active',
+    'created_at': '2025-06-10T06:21:15.000000', 'accessed': False,
+    'redemption_code': None, 'max_attempts': 1, 'puzzle_number': 1,
+    'answer_number': 1, 'total_answers': 12, 'game_sequence': 1
+}
+
+
+def check_round_trip(store, prefix):
+    key = f"{prefix}_game"
+    assert store.set(key, GAME)
+    assert store.get(key) == GAME
+
+
+def check_missing_key(store, prefix):
+    assert store.get(f"{prefix}_missing") is None
+
+
+def check_returned_value_is_a_copy(store, prefix):
+    key = f"{prefix}_copy"
+    store.set(key, GAME)
+    value = store.get(key)
+    value['status'] = 'won'
+    assert store.get(key)['status'] == 'active'
+
+
+def check_overwrite(store, prefix):
+    key = f"{prefix}_overwrite"
+    store.set(key, GAME)
+    store.set(key, dict(GAME, status='lost', guess='STUDY'))
+    assert store.get(key)['guess'] == 'STUDY'
+
+
+def check_delete(store, prefix):
+    key = f"{prefix}_delete"
+    store.set(key, GAME)
+    assert store.delete(key)
+    assert store.get(key) is None
+    assert not store.delete(key)
+
+
+def check_many(store, prefix):
+    items = {f"{prefix}_many_{i}": dict(GAME, game_sequence=i) for i in range(5)}
+    assert store.set_many(items)
+    keys = list(items) + [f"{prefix}_many_missing"]
+    assert store.get_many(keys) == list(items.values()) + [None]
+
+
+def expected_guess(game, guess):
+    """What apply_guess makes of a guess on game: (result, game afterwards)"""
+    game = json.loads(json.dumps(game))
+    return storage.apply_guess(game, guess), game
+
+
+def check_submit_guess(store, prefix):
+    # Letter puzzle: the one guess wins or loses, and a second guess is rejected
+    for name, guess in (('won', 'DUSTY'), ('lost', 'STUDY')):
+        key = f"{prefix}_guess_{name}"
+        store.set(key, GAME)
+        result, game = expected_guess(GAME, guess)
+        assert store.submit_guess(key, guess) == result, name
+        assert store.get(key) == game, name
+        rejected, _ = expected_guess(game, 'DUSTY')
+        assert store.submit_guess(key, 'DUSTY') == rejected, name
+        assert store.get(key) == game, name
+    assert store.submit_guess(f"{prefix}_guess_missing", 'DUSTY') is None
+
+
+def check_submit_guess_attempts(store, prefix):
+    # Classic Wordle: guesses pile up in attempts until a hit or max_attempts misses
+    wordle = dict(GAME, type='wordle', attempts=[], max_attempts=3)
+    for name, guesses in (('won', ['STUDY', 'DUSTY']), ('lost', ['STUDY', 'TRUST', 'MUSTY', 'DUSTY'])):
+        key = f"{prefix}_attempts_{name}"
+        store.set(key, wordle)
+        game = wordle
+        for guess in guesses:
+            result, game = expected_guess(game, guess)
+            assert store.submit_guess(key, guess) == result, (name, guess)
+            assert store.get(key) == game, (name, guess)
+        assert game['status'] == name
+
+
+def check_counters(store, prefix):
+    key = f"{prefix}_count"
+    assert store.incr(key) == 1
+    assert store.incr(key, 4) == 5
+    assert store.incr(key, 0) == 5
+    keys = [key, f"{prefix}_count_a", f"{prefix}_count_b"]
+    assert store.incr_many({keys[1]: 2, key: 1, keys[2]: 3}) == [2, 6, 3]
+    assert store.incr_many({}) == []
+    assert store.get_counts(keys + [f"{prefix}_count_missing"]) == [6, 2, 3, 0]
+    assert store.get_counts([]) == []
+
+
+def check_publish_listen(store, prefix):
+    channel = f"{prefix}_channel"
+    messages = store.listen(channel)
+    try:
+        assert next(messages) is None  # subscribed
+        assert store.publish(channel, 'game_1') == 1
+        assert store.publish(channel, 'game 2, with a comma') == 1
+        assert next(messages) == 'game_1'
+        assert next(messages) == 'game 2, with a comma'
+    finally:
+        messages.close()
+
+
+def check_expiry(store, prefix):
+    # One sleep covers set/set_many with a ttl, EXPIRE, and the TTLs submit_guess and incr_many apply
+    assert store.set(f"{prefix}_ttl", GAME, ttl=1)
+    assert store.set_many({f"{prefix}_ttl_many": GAME}, ttl=1)
+    store.set(f"{prefix}_many_fields", GAME)
+    assert store.set_many({f"{prefix}_many_state": GAME}, ttl=1, expire_keys=[f"{prefix}_many_fields"])
+    store.set(f"{prefix}_expire", GAME)
+    assert store.expire(f"{prefix}_expire", 1)
+    assert not store.expire(f"{prefix}_expire_missing", 1)
+    store.set(f"{prefix}_state", GAME)
+    store.set(f"{prefix}_fields", GAME)
+    assert store.submit_guess(f"{prefix}_state", 'DUSTY', ttl=1, expire_keys=[f"{prefix}_fields"])['applied']
+    store.set(f"{prefix}_done", dict(GAME, status='won'))
+    store.set(f"{prefix}_done_fields", GAME)
+    assert not store.submit_guess(f"{prefix}_done", 'DUSTY', ttl=1, expire_keys=[f"{prefix}_done_fields"])['applied']
+    assert store.incr_many({f"{prefix}_count_ttl": 1, f"{prefix}_count_kept": 1}, {f"{prefix}_count_ttl": 1}) == [1, 1]
+    store.set(f"{prefix}_keep", GAME, ttl=1)
+    store.set(f"{prefix}_keep", GAME)  # a plain SET clears the expiry
+    assert store.get(f"{prefix}_ttl") == GAME
+    time.sleep(1.5)
+    for suffix in ('ttl', 'ttl_many', 'many_state', 'many_fields', 'expire', 'state', 'fields'):
+        assert store.get(f"{prefix}_{suffix}") is None, suffix
+    assert store.get(f"{prefix}_keep") == GAME
+    # A rejected guess leaves expiries alone
+    assert store.get(f"{prefix}_done")['status'] == 'won'
+    assert store.get(f"{prefix}_done_fields") == GAME
+    assert store.get_counts([f"{prefix}_count_ttl", f"{prefix}_count_kept"]) == [0, 1]
+
+
+CHECKS = [check_round_trip, check_missing_key, check_returned_value_is_a_copy,
+          check_overwrite, check_delete, check_many, check_submit_guess,
+          check_submit_guess_attempts, check_counters, check_publish_listen, check_expiry]
+
+
+def drivers():
+    yield storage.MemoryStore()
+
+    fake = FakeUpstash().start()
+    yield storage.UpstashClient(fake.url, 'test')
+
+    try:
+        store = storage.RedisStore(storage.REDIS_URL)
+        store.client.ping()
+        yield store
+    except Exception as e:
+        print(f"redis    skipped ({e})")
+
+
+def main():
+    failures = 0
+    for store in drivers():
+        prefix = f"CONFORMANCE_{uuid.uuid4().hex[:8]}"
+        for check in CHECKS:
+            try:
+                check(store, prefix)
+            except Exception as e:
+                failures += 1
+                print(f"{store.name:<8} FAIL {check.__name__}: {e!r}")
+        print(f"{store.name:<8} ran {len(CHECKS)} checks")
+
+    print(f"\nGame record size: json {len(json.dumps(GAME))} bytes", end='')
+    if storage.msgpack is not None:
+        print(f", msgpack {len(storage.RedisStore.encode(GAME))} bytes")
+    else:
+        print()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
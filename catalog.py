@@ -0,0 +1,400 @@
+# catalog.py - Build the binary game catalog that wordle_cafe.py mmaps at startup
+#
+#   python catalog.py                 # words.txt + letter_puzzles.txt -> catalog.bin
+#   python catalog.py -o other.bin
+#
+# Layout (little-endian, every section 4-byte aligned):
+#   header   magic, word count, puzzle count, game count
+#   words    5 ASCII bytes per word
+#   puzzles  first game index, answer count, featured letter, answer, 12 letters
+#   games    (puzzle index, word index) uint32 pairs, grouped by puzzle
+#
+# The server builds the same bytes in memory when catalog.bin is absent, so
+# EXPANDED_GAMES is always a puzzle table plus a flat index of pairs.
+
+import argparse
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from dictionary import Dictionary, can_form, letter_vector
+
+CATALOG_FILE = 'catalog.bin'
+MAGIC = b'QWCAT001'
+HEADER = struct.Struct('<8sIII')
+PUZZLE = struct.Struct('<II1s5s12s2x')
+WORD_SIZE = 5
+
+log = logging.getLogger('cafe.catalog')
+
+
+def _align(n):
+    return (n + 3) & ~3
+
+
+def load_word_list(file_path='words.txt'):
+    try:
+        with open(file_path, 'r') as f:
+            words = [line.strip().upper() for line in f if len(line.strip()) == 5 and line.strip().isalpha()]
+            log.info("Loaded valid words", extra={'words': len(words), 'path': file_path})
+            return words
+    except FileNotFoundError:
+        log.error("File not found", extra={'path': file_path})
+        return []
+    except Exception as e:
+        log.error("Error loading word file", extra={'path': file_path, 'error': str(e)})
+        return []
+
+def load_answers(file_path='answers.txt'):
+    try:
+        with open(file_path, 'r') as f:
+            answers = [line.strip().upper() for line in f if len(line.strip()) == 5 and line.strip().isalpha()]
+            log.info("Loaded answer words", extra={'answers': len(answers), 'path': file_path})
+            return answers
+    except FileNotFoundError:
+        log.error("File not found", extra={'path': file_path})
+        return []
+    except Exception as e:
+        log.error("Error loading word file", extra={'path': file_path, 'error': str(e)})
+        return []
+
+def load_letter_puzzles(file_path='letter_puzzles.txt'):
+    """Load letter puzzles from text file"""
+    puzzles = []
+    try:
+        with open(file_path, 'r') as f:
+            for line_num, line in enumerate(f, 1):
+                line = line.strip()
+                
+                # Skip empty lines and comments
+                if not line or line.startswith('#'):
+                    continue
+                
+                try:
+                    # Parse format: FEATURED_LETTER|ANSWER|AVAILABLE_LETTERS
+                    parts = line.split('|')
+                    if len(parts) != 3:
+                        log.warning("Invalid puzzle line", extra={'line': line_num, 'text': line})
+                        continue
+                    
+                    featured_letter = parts[0].strip().upper()
+                    answer = parts[1].strip().upper()
+                    available_letters = [letter.strip().upper() for letter in parts[2].split(',')]
+                    
+                    # Basic validation
+                    if len(answer) != 5 or len(available_letters) != 12:
+                        log.warning("Invalid puzzle format", extra={'line': line_num})
+                        continue
+                    
+                    puzzle = {
+                        "available_letters": available_letters,
+                        "featured_letter": featured_letter,
+                        "answer": answer
+                    }
+                    puzzles.append(puzzle)
+                    
+                except Exception as e:
+                    log.error("Error parsing puzzle line", extra={'line': line_num, 'text': line, 'error': str(e)})
+                    continue
+        
+        log.info("Loaded base puzzles", extra={'puzzles': len(puzzles), 'path': file_path})
+        return puzzles
+        
+    except FileNotFoundError:
+        log.error("File not found", extra={'path': file_path})
+        return []
+    except Exception as e:
+        log.error("Error loading puzzles", extra={'path': file_path, 'error': str(e)})
+        return []
+
+
+def encode_catalog(words, puzzles):
+    """Expand puzzles against the word list and pack the result into catalog bytes"""
+    dictionary = words if isinstance(words, Dictionary) else Dictionary(words)
+    matches = dictionary.expand(puzzles)
+
+    word_table = b''.join(word.encode('ascii') for word in dictionary.words)
+    puzzle_table = bytearray()
+    game_pairs = array('I')
+    first_game = 0
+    for puzzle_idx, (puzzle, word_indices) in enumerate(zip(puzzles, matches)):
+        puzzle_table += PUZZLE.pack(
+            first_game, len(word_indices),
+            puzzle['featured_letter'].encode('ascii'),
+            puzzle['answer'].encode('ascii'),
+            ''.join(puzzle['available_letters']).encode('ascii'))
+        for word_idx in word_indices:
+            game_pairs.append(puzzle_idx)
+            game_pairs.append(word_idx)
+        first_game += len(word_indices)
+    if sys.byteorder == 'big':
+        game_pairs.byteswap()
+
+    return b''.join([
+        HEADER.pack(MAGIC, len(dictionary), len(puzzles), first_game),
+        word_table.ljust(_align(len(word_table)), b'\0'),
+        bytes(puzzle_table),
+        game_pairs.tobytes(),
+    ])
+
+
+def _pool_key(featured, letters):
+    """Featured letter + sorted pool, as bytes - what a puzzle's expansion depends on"""
+    return featured + bytes(sorted(letters))
+
+
+def update_catalog(old, dictionary, puzzles):
+    """Catalog bytes for puzzles, expanding only the pools old doesn't already cover
+
+    Puzzles whose featured letter and pool appear in old reuse old's matches,
+    and a leading run of unchanged puzzles (new puzzles appended to the file)
+    is copied across as raw bytes. When the word list changed, old matches
+    are kept minus the removed words, and only the added words are checked
+    against each pool. Returns (data, stats).
+    """
+    old_words = old.words()
+    same_words = old_words == dictionary.words
+    stats = {'puzzles': len(puzzles), 'copied': 0, 'reused': 0, 'expanded': 0,
+             'words_added': 0, 'words_removed': 0}
+
+    if same_words:
+        remap = added = None
+        prefix = 0
+        for puzzle in puzzles[:old.puzzle_count]:
+            _, _, featured, answer, letters = old.puzzle_record(prefix)
+            if (featured.decode('ascii') != puzzle['featured_letter'] or answer.decode('ascii') != puzzle['answer']
+                    or letters.decode('ascii') != ''.join(puzzle['available_letters'])):
+                break
+            prefix += 1
+    else:
+        remap = [dictionary.index.get(word, -1) for word in old_words]
+        old_set = set(old_words)
+        added = [idx for idx, word in enumerate(dictionary.words) if word not in old_set]
+        stats['words_added'] = len(added)
+        stats['words_removed'] = remap.count(-1)
+        prefix = 0
+
+    first_game = old.puzzle_record(prefix)[0] if prefix < old.puzzle_count else old.game_count
+    puzzle_table = bytearray(old.puzzle_bytes[:prefix * PUZZLE.size])
+    pair_bytes = bytearray(old.game_pairs[:first_game * 2].cast('B'))
+    stats['copied'] = prefix
+
+    old_pools = {}
+    if prefix < len(puzzles):
+        for idx, (_, _, featured, _, letters) in enumerate(PUZZLE.iter_unpack(old.puzzle_bytes)):
+            old_pools.setdefault(_pool_key(featured, letters), idx)
+
+    expansions = {}
+    for puzzle_idx in range(prefix, len(puzzles)):
+        puzzle = puzzles[puzzle_idx]
+        featured = puzzle['featured_letter'].encode('ascii')
+        letters = ''.join(puzzle['available_letters']).encode('ascii')
+        key = _pool_key(featured, letters)
+        matches = expansions.get(key)
+        if matches is None:
+            old_idx = old_pools.get(key)
+            if old_idx is None:
+                matches = dictionary.matching_words(puzzle['available_letters'], puzzle['featured_letter'])
+                stats['expanded'] += 1
+            else:
+                start, count = old.puzzle_record(old_idx)[:2]
+                matches = old.game_pairs[start * 2 + 1:(start + count) * 2:2]
+                if remap is not None:
+                    pool = letter_vector(puzzle['available_letters'])
+                    matches = sorted([remap[i] for i in matches if remap[i] >= 0] +
+                                     [i for i in added if featured.decode('ascii') in dictionary.words[i]
+                                      and can_form(dictionary.vectors[i], pool)])
+                stats['reused'] += 1
+            expansions[key] = matches = array('I', matches)
+        else:
+            stats['reused'] += 1
+
+        puzzle_table += PUZZLE.pack(first_game, len(matches), featured, puzzle['answer'].encode('ascii'), letters)
+        pairs = array('I', [puzzle_idx]) * (len(matches) * 2)
+        pairs[1::2] = matches
+        if sys.byteorder == 'big':
+            pairs.byteswap()
+        pair_bytes += pairs.tobytes()
+        first_game += len(matches)
+
+    word_table = b''.join(word.encode('ascii') for word in dictionary.words)
+    data = b''.join([
+        HEADER.pack(MAGIC, len(dictionary), len(puzzles), first_game),
+        word_table.ljust(_align(len(word_table)), b'\0'),
+        bytes(puzzle_table),
+        bytes(pair_bytes),
+    ])
+    stats['games'] = first_game
+    return data, stats
+
+
+def build_catalog(words, puzzles, path=CATALOG_FILE):
+    """Write the catalog file atomically, returning its word/puzzle/game counts"""
+    data = encode_catalog(words, puzzles)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    _, word_count, puzzle_count, game_count = HEADER.unpack_from(data, 0)
+    return word_count, puzzle_count, game_count
+
+
+class Records:
+    """Read-only sequence that decodes catalog records on access"""
+
+    __slots__ = ('count', 'decode')
+
+    def __init__(self, count, decode):
+        self.count = count
+        self.decode = decode
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not -self.count <= index < self.count:
+            raise IndexError(index)
+        return self.decode(index % self.count)
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.decode(index)
+
+
+class GameView:
+    """One expanded game: a (catalog, index) pair that reads fields on demand"""
+
+    __slots__ = ('catalog', 'index')
+
+    def __init__(self, catalog, index):
+        self.catalog = catalog
+        self.index = index
+
+    @property
+    def puzzle_index(self):
+        return self.catalog.game_pairs[self.index * 2]
+
+    @property
+    def puzzle_number(self):
+        return self.puzzle_index + 1
+
+    @property
+    def answer_number(self):
+        return self.index - self.catalog.puzzle_record(self.puzzle_index)[0] + 1
+
+    @property
+    def total_answers_in_puzzle(self):
+        return self.catalog.puzzle_record(self.puzzle_index)[1]
+
+    @property
+    def featured_letter(self):
+        return self.catalog.puzzle_record(self.puzzle_index)[2].decode('ascii')
+
+    @property
+    def available_letters(self):
+        return list(self.catalog.puzzle_record(self.puzzle_index)[4].decode('ascii'))
+
+    @property
+    def answer(self):
+        return self.catalog.word(self.catalog.game_pairs[self.index * 2 + 1])
+
+    @property
+    def original_answer(self):
+        return self.catalog.puzzle_record(self.puzzle_index)[3].decode('ascii')
+
+
+class Catalog:
+    """Puzzle table plus a flat (puzzle, word) index over catalog bytes
+
+    Backed by an mmapped file (pages shared between workers) or by bytes
+    encoded in-process when only the text files are available.
+    """
+
+    def __init__(self, path=CATALOG_FILE, data=None):
+        if data is None:
+            with open(path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buffer = data
+        magic, self.word_count, self.puzzle_count, self.game_count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a game catalog")
+
+        view = memoryview(data)
+        offset = HEADER.size
+        self.word_bytes = view[offset:offset + self.word_count * WORD_SIZE]
+        offset += _align(self.word_count * WORD_SIZE)
+        self.puzzle_bytes = view[offset:offset + self.puzzle_count * PUZZLE.size]
+        offset += self.puzzle_count * PUZZLE.size
+        self.game_pairs = view[offset:offset + self.game_count * 8].cast('I')
+
+        self.puzzles = Records(self.puzzle_count, self.puzzle)
+        self.games = Records(self.game_count, lambda index: GameView(self, index))
+
+    def word(self, index):
+        start = index * WORD_SIZE
+        return bytes(self.word_bytes[start:start + WORD_SIZE]).decode('ascii')
+
+    def words(self):
+        return [self.word(i) for i in range(self.word_count)]
+
+    def puzzle_record(self, index):
+        """Raw (first game, answer count, featured, answer, letters) tuple"""
+        return PUZZLE.unpack_from(self.puzzle_bytes, index * PUZZLE.size)
+
+    def puzzle(self, index):
+        """Puzzle dict in the same shape as LETTER_PUZZLES entries"""
+        _, _, featured, answer, letters = self.puzzle_record(index)
+        return {
+            'available_letters': list(letters.decode('ascii')),
+            'featured_letter': featured.decode('ascii'),
+            'answer': answer.decode('ascii')
+        }
+
+    def answer_count(self, puzzle_index):
+        return self.puzzle_record(puzzle_index)[1]
+
+
+def load_catalog(path=CATALOG_FILE, sources=()):
+    """Open the catalog unless it is missing or older than any source file"""
+    try:
+        built = os.path.getmtime(path)
+    except OSError:
+        return None
+    for source in sources:
+        if os.path.exists(source) and os.path.getmtime(source) > built:
+            log.warning("Catalog is older than its source - rebuild with 'python catalog.py'",
+                        extra={'path': path, 'source': source})
+            return None
+    try:
+        return Catalog(path)
+    except Exception as e:
+        log.error("Error loading catalog", extra={'path': path, 'error': str(e)})
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the binary game catalog")
+    parser.add_argument('--words', default='words.txt')
+    parser.add_argument('--puzzles', default='letter_puzzles.txt')
+    parser.add_argument('-o', '--output', default=CATALOG_FILE)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    start = time.perf_counter()
+    words = load_word_list(args.words)
+    puzzles = load_letter_puzzles(args.puzzles)
+    if not words or not puzzles:
+        raise SystemExit("❌ Nothing to build - check the word and puzzle files")
+
+    word_count, puzzle_count, game_count = build_catalog(words, puzzles, args.output)
+    size = os.path.getsize(args.output)
+    print(f"✅ Wrote {args.output}: {word_count} words, {puzzle_count} puzzles, "
+          f"{game_count} games ({size / 1024:.1f} KB) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Dashboard counters, kept in the game store and bumped as events happen.
+
+Each event increments, in one pipelined round trip:
+
+    STATS_<event>                  all-time total
+    STATS_<event>_H<YYYYMMDDHH>    that hour (expires after COUNTER_HOURLY_TTL)
+    STATS_<event>_P<puzzle>        that puzzle, for game events
+
+so /admin and /health read a handful of pre-aggregated keys with one MGET
+instead of scanning games, and the numbers are shared by every worker and
+survive restarts.
+"""
+
+import datetime
+import os
+
+EVENTS = ('scans', 'accesses', 'wins', 'losses', 'ad_clicks')
+COUNTER_HOURLY_TTL = int(os.getenv('COUNTER_HOURLY_TTL', str(8 * 24 * 60 * 60)))
+
+
+def counter_key(event, hour=None, puzzle_number=None):
+    if hour is not None:
+        return f"STATS_{event}_H{hour:%Y%m%d%H}"
+    if puzzle_number is not None:
+        return f"STATS_{event}_P{puzzle_number}"
+    return f"STATS_{event}"
+
+
+def event_increments(event, puzzle_number=None, when=None):
+    """({key: 1}, {key: ttl}) for incr_many when event happens"""
+    if event not in EVENTS:
+        raise ValueError(f"Unknown counter event: {event!r}")
+    hour_key = counter_key(event, hour=when or datetime.datetime.now())
+    amounts = {counter_key(event): 1, hour_key: 1}
+    if puzzle_number is not None:
+        amounts[counter_key(event, puzzle_number=puzzle_number)] = 1
+    return amounts, {hour_key: COUNTER_HOURLY_TTL}
+
+
+def last_hours(hours, now=None):
+    """The last `hours` hour buckets, oldest first"""
+    now = (now or datetime.datetime.now()).replace(minute=0, second=0, microsecond=0)
+    return [now - datetime.timedelta(hours=i) for i in range(hours - 1, -1, -1)]
+
+
+def read_totals(get_counts, events=EVENTS):
+    """{event: all-time total} with one get_counts call"""
+    return dict(zip(events, get_counts([counter_key(e) for e in events])))
+
+
+def read_hourly(get_counts, hours=24, events=EVENTS, now=None):
+    """{event: [(hour iso, count), ...]} for the last `hours` hours, with one get_counts call"""
+    buckets = last_hours(hours, now)
+    keys = [counter_key(e, hour=h) for e in events for h in buckets]
+    values = iter(get_counts(keys))
+    return {e: [(h.isoformat(), next(values)) for h in buckets] for e in events}
+
+
+def read_puzzles(get_counts, puzzle_numbers, events=('scans', 'accesses', 'wins', 'losses')):
+    """{puzzle number: {event: count}} with one get_counts call"""
+    keys = [counter_key(e, puzzle_number=p) for p in puzzle_numbers for e in events]
+    values = iter(get_counts(keys))
+    return {p: {e: next(values) for e in events} for p in puzzle_numbers}
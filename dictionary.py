@@ -0,0 +1,132 @@
+"""Word dictionary with precomputed letter-count vectors.
+
+Every word is stored once with a 26-slot letter-count vector packed into a
+single int (5 bits per letter), so checking whether a word can be formed from
+a pool of letters is one subtraction and one mask instead of building Counter
+objects on every call.
+"""
+
+ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+# Each letter count lives in a 5-bit field: 4 bits of count (up to 15 copies)
+# plus a guard bit that absorbs the borrow when a word needs more copies of a
+# letter than the pool has.
+FIELD_BITS = 5
+FIELD_MAX = (1 << (FIELD_BITS - 1)) - 1
+GUARD_MASK = sum(1 << (i * FIELD_BITS + FIELD_BITS - 1) for i in range(26))
+
+
+def letter_vector(letters):
+    """Pack the letter counts of a word or letter pool into one int"""
+    vector = 0
+    for letter in letters:
+        slot = ord(letter.upper()) - 65
+        if not 0 <= slot < 26:
+            raise ValueError(f"Not a letter: {letter!r}")
+        vector += 1 << (slot * FIELD_BITS)
+    return vector
+
+
+def letter_count(vector, letter):
+    """Read the count of a single letter back out of a packed vector"""
+    slot = ord(letter.upper()) - 65
+    return (vector >> (slot * FIELD_BITS)) & FIELD_MAX
+
+
+def letter_mask(letters):
+    """26-bit mask of which letters appear at all"""
+    mask = 0
+    for letter in letters:
+        mask |= 1 << (ord(letter.upper()) - 65)
+    return mask
+
+
+def can_form(word_vector, pool_vector):
+    """Check if a word vector fits inside a pool vector"""
+    return ((pool_vector | GUARD_MASK) - word_vector) & GUARD_MASK == GUARD_MASK
+
+
+class Dictionary:
+    """Immutable word list with O(1) membership and letter-pool checks"""
+
+    def __init__(self, words):
+        self.words = []
+        self.vectors = []
+        self.masks = []
+        self.index = {}
+        for word in words:
+            word = word.strip().upper()
+            if word in self.index or not word.isalpha():
+                continue
+            self.index[word] = len(self.words)
+            self.words.append(word)
+            self.vectors.append(letter_vector(word))
+            self.masks.append(letter_mask(word))
+        self.word_set = frozenset(self.words)
+
+        # Word indices grouped by each letter they contain, for featured-letter lookups
+        self.by_letter = {letter: [] for letter in ALPHABET}
+        for idx, word in enumerate(self.words):
+            for letter in set(word):
+                self.by_letter[letter].append(idx)
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        return word in self.word_set
+
+    def vector(self, word):
+        """Letter vector for a word, from the table when it is known"""
+        idx = self.index.get(word)
+        if idx is not None:
+            return self.vectors[idx]
+        return letter_vector(word)
+
+    def can_form(self, word, pool_vector):
+        """Check if a word can be made from a packed letter pool"""
+        return can_form(self.vector(word.upper()), pool_vector)
+
+    def matching_words(self, available_letters, featured_letter):
+        """Indices of words that use the featured letter and fit the pool"""
+        pool = letter_vector(available_letters)
+        pool_mask = letter_mask(available_letters)
+        guarded = pool | GUARD_MASK
+        vectors, masks = self.vectors, self.masks
+        return [idx for idx in self.by_letter.get(featured_letter.upper(), ())
+                if not masks[idx] & ~pool_mask
+                and (guarded - vectors[idx]) & GUARD_MASK == GUARD_MASK]
+
+    def count_matching(self, available_letters, featured_letter, limit=None):
+        """How many words matching_words would return, stopping early once past limit
+
+        Lets a generator throw away a candidate pool as soon as it is known to
+        be too easy, without building the word list.
+        """
+        pool = letter_vector(available_letters)
+        pool_mask = letter_mask(available_letters)
+        guarded = pool | GUARD_MASK
+        vectors, masks = self.vectors, self.masks
+        count = 0
+        for idx in self.by_letter.get(featured_letter.upper(), ()):
+            if not masks[idx] & ~pool_mask and (guarded - vectors[idx]) & GUARD_MASK == GUARD_MASK:
+                count += 1
+                if limit is not None and count > limit:
+                    break
+        return count
+
+    def expand(self, puzzles):
+        """Matching word indices for every puzzle in one batched pass
+
+        Puzzles sharing the same letter pool and featured letter are only
+        evaluated once.
+        """
+        seen = {}
+        results = []
+        for puzzle in puzzles:
+            featured = puzzle['featured_letter']
+            key = (letter_vector(puzzle['available_letters']), featured)
+            if key not in seen:
+                seen[key] = self.matching_words(puzzle['available_letters'], featured)
+            results.append(seen[key])
+        return results
@@ -0,0 +1,256 @@
+"""Circuit breaker between the game store and the in-memory fallback.
+
+FailoverStore wraps the real store. After FAILOVER_THRESHOLD consecutive
+failed (or slower than FAILOVER_SLOW_CALL) calls the circuit opens and
+every call goes straight to the fallback store instead of waiting on
+timeouts. While open, a background thread probes the real store every
+FAILOVER_PROBE_INTERVAL seconds (half-open). Once a probe succeeds, keys
+written to the fallback during the outage are copied back, with their
+remaining TTL, counts made with incr_many are added onto the real
+counters, and the circuit closes.
+
+Plain incr (the game sequence counter) never falls back: a per-process
+counter would hand out numbers the real one already issued, so it raises
+StorageError while the circuit is open and callers keep whatever numbers
+they hold. Pub/sub is not reconciled - scan notifications are transient.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+
+from metrics import STORAGE_LATENCY
+from storage import GameStore, StorageError
+
+log = logging.getLogger('cafe.storage')
+
+FAILOVER_THRESHOLD = int(os.getenv('FAILOVER_THRESHOLD', '3'))
+FAILOVER_SLOW_CALL = float(os.getenv('FAILOVER_SLOW_CALL', '2'))
+FAILOVER_PROBE_INTERVAL = float(os.getenv('FAILOVER_PROBE_INTERVAL', '5'))
+
+PROBE_KEY = 'FAILOVER_PROBE'
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+def written_keys(method, args):
+    """Keys a storage call writes, so fallback writes can be reconciled later"""
+    if method in ('set', 'expire'):
+        return [args[0]]
+    if method == 'set_many':
+        return list(args[0]) + list(args[2] if len(args) > 2 else ())
+    if method == 'submit_guess':
+        return [args[0]] + list(args[3] if len(args) > 3 else ())
+    return []
+
+
+class FailoverStore(GameStore):
+    def __init__(self, primary, fallback, threshold=FAILOVER_THRESHOLD,
+                 slow_call=FAILOVER_SLOW_CALL, probe_interval=FAILOVER_PROBE_INTERVAL):
+        self.primary = primary
+        self.fallback = fallback
+        self.threshold = threshold
+        self.slow_call = slow_call
+        self.probe_interval = probe_interval
+
+        self.state = CLOSED
+        self.failures = 0  # consecutive
+        self.pending = {}  # keys written to the fallback while open, in write order
+        self.pending_counts = {}  # counter key -> ttl for counts made in the fallback while open
+        self.lock = threading.Lock()
+        self.thread = None
+
+        self.trips = 0
+        self.fallback_calls = 0
+        self.reconciled = 0
+        self.last_error = None
+
+    @property
+    def name(self):
+        return self.primary.name if self.state == CLOSED else f"{self.fallback.name} (failover)"
+
+    @property
+    def closed(self):
+        return self.state == CLOSED
+
+    def record_success(self, elapsed):
+        if elapsed > self.slow_call:
+            self.record_failure(f"slow call ({elapsed:.1f}s)")
+            return
+        with self.lock:
+            self.failures = 0
+
+    def record_failure(self, error):
+        with self.lock:
+            self.failures += 1
+            self.last_error = str(error)
+            if self.state != CLOSED or self.failures < self.threshold:
+                return
+            self.state = OPEN
+            self.trips += 1
+        log.warning("Storage circuit OPEN - using memory storage",
+                    extra={'failures': self.failures, 'error': str(error), 'probe_interval': self.probe_interval})
+        self._start_probe()
+
+    def run_fallback(self, method, *args):
+        """Run a call on the fallback store, remembering what it wrote"""
+        with self.lock:
+            self.fallback_calls += 1
+            for key in written_keys(method, args):
+                self.pending.pop(key, None)
+                self.pending[key] = True
+            # Keys older than the fallback's own capacity have been evicted from it anyway
+            max_keys = getattr(self.fallback, 'max_keys', None)
+            while max_keys is not None and len(self.pending) > max_keys:
+                del self.pending[next(iter(self.pending))]
+            if method == 'incr_many':
+                ttls = (args[1] if len(args) > 1 else None) or {}
+                for key in args[0]:
+                    self.pending_counts[key] = ttls.get(key)
+        with STORAGE_LATENCY.time(self.fallback.name, method, 'fallback'):
+            return getattr(self.fallback, method)(*args)
+
+    def _call(self, method, *args, fallback=True):
+        if self.state == CLOSED:
+            start = time.perf_counter()
+            try:
+                result = getattr(self.primary, method)(*args)
+            except Exception as e:
+                STORAGE_LATENCY.observe((self.primary.name, method, 'error'), time.perf_counter() - start)
+                self.record_failure(e)
+                if not fallback:
+                    raise
+                log.warning("Storage call failed - using memory storage", extra={'method': method, 'error': str(e)})
+            else:
+                elapsed = time.perf_counter() - start
+                STORAGE_LATENCY.observe((self.primary.name, method, 'ok'), elapsed)
+                self.record_success(elapsed)
+                return result
+        if not fallback:
+            raise StorageError(f"{self.primary.name} unavailable (circuit {self.state}) - no fallback for {method}")
+        return self.run_fallback(method, *args)
+
+    # -- half-open probing and reconciliation -------------------------------
+
+    def _start_probe(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._probe_loop, name='storage-probe', daemon=True)
+                self.thread.start()
+
+    def _probe_loop(self):
+        while self.state != CLOSED:
+            time.sleep(self.probe_interval)
+            self.state = HALF_OPEN
+            start = time.perf_counter()
+            try:
+                self.primary.get(PROBE_KEY)
+                if time.perf_counter() - start > self.slow_call:
+                    raise TimeoutError(f"probe took {time.perf_counter() - start:.1f}s")
+                self._reconcile()
+            except Exception as e:
+                self.last_error = str(e)
+                self.state = OPEN
+                continue
+            log.warning("Storage circuit CLOSED", extra={'store': self.primary.name, 'reconciled': self.reconciled})
+
+    def _reconcile_counts(self):
+        with self.lock:
+            counters, self.pending_counts = self.pending_counts, {}
+        keys = list(counters)
+        amounts = {k: v for k, v in zip(keys, self.fallback.get_counts(keys)) if v}
+        try:
+            self.primary.incr_many(amounts, {k: counters[k] for k in amounts if counters[k]})
+        except Exception:
+            with self.lock:
+                for k, ttl in counters.items():
+                    self.pending_counts.setdefault(k, ttl)
+            raise
+        # Subtract rather than delete, keeping anything counted meanwhile
+        self.fallback.incr_many({k: -v for k, v in amounts.items()})
+        self.reconciled += len(amounts)
+
+    def _reconcile(self):
+        # Requests keep going to the fallback until the backlog is copied, then the circuit closes
+        while True:
+            if self.pending_counts:
+                self._reconcile_counts()
+            with self.lock:
+                if not self.pending and not self.pending_counts:
+                    self.state = CLOSED
+                    self.failures = 0
+                    return
+                keys = list(self.pending)
+                self.pending.clear()
+            for i, key in enumerate(keys):
+                value = self.fallback.get(key)
+                if value is None:
+                    continue  # expired or evicted meanwhile
+                try:
+                    ttl = self.fallback.ttl(key)
+                    self.primary.set(key, value, math.ceil(ttl) if ttl else None)
+                except Exception:
+                    with self.lock:
+                        for k in keys[i:]:
+                            self.pending.setdefault(k, True)
+                    raise
+                with self.lock:
+                    # Written again since it was copied: leave it for the next pass
+                    if key not in self.pending:
+                        self.fallback.delete(key)
+                self.reconciled += 1
+
+    def stats(self):
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'trips': self.trips,
+            'fallback_calls': self.fallback_calls,
+            'pending_reconcile': len(self.pending) + len(self.pending_counts),
+            'reconciled': self.reconciled,
+            'last_error': self.last_error
+        }
+
+    # -- GameStore ------------------------------------------------------------
+
+    def get(self, key):
+        return self._call('get', key)
+
+    def set(self, key, value, ttl=None):
+        return self._call('set', key, value, ttl)
+
+    def delete(self, key):
+        return self._call('delete', key)
+
+    def expire(self, key, ttl):
+        return self._call('expire', key, ttl)
+
+    def submit_guess(self, key, guess, ttl=None, expire_keys=()):
+        return self._call('submit_guess', key, guess, ttl, expire_keys)
+
+    def incr(self, key, amount=1):
+        return self._call('incr', key, amount, fallback=False)
+
+    def incr_many(self, amounts, ttls=None):
+        return self._call('incr_many', amounts, ttls)
+
+    def get_counts(self, keys):
+        return self._call('get_counts', keys)
+
+    def publish(self, channel, message):
+        return self._call('publish', channel, message)
+
+    def listen(self, channel):
+        # The access listener reconnects with backoff on its own
+        return self.primary.listen(channel)
+
+    def get_many(self, keys):
+        return self._call('get_many', keys)
+
+    def set_many(self, items, ttl=None, expire_keys=(), fallback=True):
+        # fallback=False for records that must outlive this process (minted games)
+        return self._call('set_many', items, ttl, expire_keys, fallback=fallback)
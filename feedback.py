@@ -0,0 +1,218 @@
+# feedback.py - Precompute classic-Wordle feedback for every answer x guess pair
+#
+#   python feedback.py                # answers.txt x words.txt -> feedback.bin
+#   python feedback.py --workers 4 -o other.bin
+#
+# A feedback is five marks - grey 0, yellow 1, green 2 - packed base 3 with the
+# first letter least significant, so every code fits in a byte and 242 means
+# solved. The file holds one byte per (answer, guess) pair, a row per answer:
+#
+#   header   magic, answer count, guess count
+#   answers  5 ASCII bytes per answer
+#   guesses  5 ASCII bytes per guess (section 4-byte aligned)
+#   matrix   answer count x guess count codes
+#
+# Scoring a guess is one index, and the column for a guess (its feedback
+# against every answer) is a strided slice of the mmap, which is all the hint
+# and difficulty numbers need. Without the file, the server scores directly.
+
+import argparse
+import logging
+import mmap
+import os
+import struct
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog import load_answers, load_word_list
+
+FEEDBACK_FILE = 'feedback.bin'
+MAGIC = b'QWFDB001'
+HEADER = struct.Struct('<8sII')
+WORD_SIZE = 5
+POWERS = (1, 3, 9, 27, 81)
+SOLVED = 242
+MARKS = ('gray', 'yellow', 'green')  # CSS classes in cafe_wordle.html
+
+log = logging.getLogger('cafe.feedback')
+
+
+def _align(n):
+    return (n + 3) & ~3
+
+
+def score(guess, answer):
+    """Feedback code for guess against answer; a letter is yellow only while unmatched copies remain"""
+    if guess == answer:
+        return SOLVED
+    code = 0
+    spare = []
+    for i in range(5):
+        if guess[i] == answer[i]:
+            code += 2 * POWERS[i]
+        else:
+            spare.append(answer[i])
+    for i in range(5):
+        letter = guess[i]
+        if letter != answer[i] and letter in spare:
+            code += POWERS[i]
+            spare.remove(letter)
+    return code
+
+
+# Mark names for each of the 243 codes
+DECODED = [[MARKS[code // p % 3] for p in POWERS] for code in range(SOLVED + 1)]
+
+
+def marks(code):
+    """['green', 'gray', ...] for a feedback code"""
+    return DECODED[code]
+
+
+def count_remaining(answers, guesses, codes):
+    """How many answers would have given these codes for these guesses - the direct, slow way"""
+    return sum(1 for answer in answers if all(score(g, answer) == c for g, c in zip(guesses, codes)))
+
+
+_GUESSES = []
+
+def _init_worker(guesses):
+    _GUESSES[:] = guesses
+
+def _rows(answers):
+    return b''.join(bytes(score(guess, answer) for guess in _GUESSES) for answer in answers)
+
+
+def encode_feedback(answers, guesses, workers=None):
+    """Feedback file bytes for answers x guesses, rows scored across a process pool"""
+    chunks = [answers[i:i + 64] for i in range(0, len(answers), 64)]
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(guesses,)) as pool:
+        matrix = b''.join(pool.map(_rows, chunks))
+    answer_table = b''.join(word.encode('ascii') for word in answers)
+    guess_table = b''.join(word.encode('ascii') for word in guesses)
+    return b''.join([
+        HEADER.pack(MAGIC, len(answers), len(guesses)),
+        answer_table.ljust(_align(len(answer_table)), b'\0'),
+        guess_table.ljust(_align(len(guess_table)), b'\0'),
+        matrix,
+    ])
+
+
+def build_feedback(answers, guesses, path=FEEDBACK_FILE, workers=None):
+    """Write the feedback file atomically, returning its size in bytes"""
+    data = encode_feedback(answers, guesses, workers)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+class FeedbackMatrix:
+    """Answers x guesses feedback codes over an mmapped feedback file"""
+
+    def __init__(self, path=FEEDBACK_FILE, data=None):
+        if data is None:
+            with open(path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buffer = data
+        magic, self.answer_count, self.guess_count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a feedback file")
+
+        view = memoryview(data)
+        offset = HEADER.size
+        answer_bytes = bytes(view[offset:offset + self.answer_count * WORD_SIZE])
+        offset += _align(self.answer_count * WORD_SIZE)
+        guess_bytes = bytes(view[offset:offset + self.guess_count * WORD_SIZE])
+        offset += _align(self.guess_count * WORD_SIZE)
+        self.matrix = view[offset:offset + self.answer_count * self.guess_count]
+
+        self.answers = [answer_bytes[i:i + WORD_SIZE].decode('ascii') for i in range(0, len(answer_bytes), WORD_SIZE)]
+        self.guesses = [guess_bytes[i:i + WORD_SIZE].decode('ascii') for i in range(0, len(guess_bytes), WORD_SIZE)]
+        self.answer_index = {word: i for i, word in enumerate(self.answers)}
+        self.guess_index = {word: i for i, word in enumerate(self.guesses)}
+        self._openers = None
+
+    def code(self, guess, answer):
+        """Feedback code, or None when either word isn't in the table"""
+        a = self.answer_index.get(answer)
+        g = self.guess_index.get(guess)
+        if a is None or g is None:
+            return None
+        return self.matrix[a * self.guess_count + g]
+
+    def column(self, guess_idx):
+        """This guess's feedback against every answer, as bytes in answer order"""
+        return bytes(self.matrix[guess_idx::self.guess_count])
+
+    def remaining(self, guesses, codes):
+        """How many answers are consistent with these guesses and codes, or None for unknown guesses"""
+        indices = [self.guess_index.get(g) for g in guesses]
+        if None in indices:
+            return None
+        columns = [self.column(g) for g in indices]
+        if len(columns) == 1:
+            return columns[0].count(codes[0])
+        return sum(1 for row in zip(*columns) if list(row) == codes)
+
+    def openers(self):
+        """[(expected answers left, guess), ...] for every guess, best first - computed once"""
+        if self._openers is None:
+            total = self.answer_count
+            table = []
+            for g in range(self.guess_count):
+                buckets = Counter(self.column(g)).values()
+                table.append((sum(n * n for n in buckets) / total, self.guesses[g]))
+            table.sort()
+            self._openers = table
+        return self._openers
+
+    def answer_difficulty(self, opener):
+        """{answer: answers still possible after opener} - how much the opener leaves to guess"""
+        column = self.column(self.guess_index[opener])
+        sizes = Counter(column)
+        return {answer: sizes[code] for answer, code in zip(self.answers, column)}
+
+
+def load_feedback(path=FEEDBACK_FILE, sources=()):
+    """Open the feedback file unless it is missing or older than any source file"""
+    try:
+        built = os.path.getmtime(path)
+    except OSError:
+        return None
+    for source in sources:
+        if os.path.exists(source) and os.path.getmtime(source) > built:
+            log.warning("Feedback file is older than its source - rebuild with 'python feedback.py'",
+                        extra={'path': path, 'source': source})
+            return None
+    try:
+        return FeedbackMatrix(path)
+    except Exception as e:
+        log.error("Error loading feedback file", extra={'path': path, 'error': str(e)})
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the classic-Wordle feedback table")
+    parser.add_argument('--answers', default='answers.txt')
+    parser.add_argument('--words', default='words.txt')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('-o', '--output', default=FEEDBACK_FILE)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    start = time.perf_counter()
+    answers = list(dict.fromkeys(load_answers(args.answers)))
+    guesses = list(dict.fromkeys(load_word_list(args.words) + answers))
+    if not answers:
+        raise SystemExit("❌ Nothing to build - check the answer file")
+
+    size = build_feedback(answers, guesses, args.output, args.workers)
+    print(f"✅ Wrote {args.output}: {len(answers)} answers x {len(guesses)} guesses "
+          f"({size / 1024:.1f} KB) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
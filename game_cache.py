@@ -0,0 +1,104 @@
+"""Per-worker cache of the immutable part of each game.
+
+A game is stored as two records:
+
+    GAME_<id>        fields fixed at creation (letters, answer, puzzle numbers...)
+    GAME_STATE_<id>  the small mutable state: status, accessed, accessed_at, guess
+                     (plus attempts and max_attempts for a classic Wordle game)
+
+Workers cache the first record in a bounded LRU with a TTL and read only
+the state record from the store on every request. Status is never cached,
+so a guess submitted through one worker is seen by every other worker on
+its next request.
+
+Both records expire in the store: GAME_TTL_ACTIVE seconds after the game is
+created or scanned, reset to GAME_TTL_FINISHED once it has been played.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+GAME_CACHE_SIZE = int(os.getenv('GAME_CACHE_SIZE', '10000'))
+GAME_CACHE_TTL = float(os.getenv('GAME_CACHE_TTL', '3600'))
+GAME_TTL_ACTIVE = int(os.getenv('GAME_TTL_ACTIVE', str(30 * 60)))
+GAME_TTL_FINISHED = int(os.getenv('GAME_TTL_FINISHED', str(24 * 60 * 60)))
+
+STATE_FIELDS = ('status', 'accessed', 'accessed_at', 'guess')
+# Only in multi-guess (classic Wordle) games; submit_guess counts attempts on the state record
+TURN_FIELDS = ('attempts', 'max_attempts')
+
+
+def game_key(game_id):
+    return f"GAME_{game_id}"
+
+
+def state_key(game_id):
+    return f"GAME_STATE_{game_id}"
+
+
+def split_game(game):
+    """Storage records for a game: {game key: immutable fields, state key: state}"""
+    fields = {k: v for k, v in game.items() if k not in STATE_FIELDS and k != 'attempts'}
+    state = {k: game.get(k) for k in STATE_FIELDS}
+    # submit_guess decides the win on the state record alone, so it carries a copy of the answer
+    state['answer'] = game['answer']
+    if 'attempts' in game:
+        for k in TURN_FIELDS:
+            state[k] = game[k]
+    return {game_key(game['id']): fields, state_key(game['id']): state}
+
+
+def merge_game(fields, state):
+    """Full game dict from its immutable fields and current state"""
+    game = dict(fields)
+    for k in STATE_FIELDS:
+        game[k] = state.get(k)
+    if 'attempts' in state:
+        game['attempts'] = state['attempts']
+    return game
+
+
+class GameCache:
+    """Bounded LRU of immutable game fields, with entries expiring after ttl seconds"""
+
+    def __init__(self, size=GAME_CACHE_SIZE, ttl=GAME_CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self.entries = OrderedDict()  # game id -> (expires_at, fields), least recently used first
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, game_id):
+        """Cached fields for game_id, or None"""
+        with self.lock:
+            entry = self.entries.get(game_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(game_id)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self.entries[game_id]
+            self.misses += 1
+            return None
+
+    def put(self, game_id, fields):
+        if self.size <= 0:
+            return
+        with self.lock:
+            self.entries[game_id] = (time.monotonic() + self.ttl, fields)
+            self.entries.move_to_end(game_id)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'max_entries': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+        }
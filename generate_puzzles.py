@@ -1,13 +1,49 @@
-# generate_puzzles.py - Save this as ONE file and run it!
+# generate_puzzles.py - Generate letter_puzzles.txt in parallel, to difficulty targets
+#
+#   python generate_puzzles.py -n 100000
+#   python generate_puzzles.py -n 5000 --bands 4-10:1,11-25:2,26-80:1 --featured uniform
+#   python generate_puzzles.py -n 2000 --featured E=3,S=2,T=1 --max-per-answer 2 \
+#       --exclude letter_puzzles.txt -o new_puzzles.txt
+#
+# Difficulty is the number of valid words that use the featured letter and fit
+# the 12-letter pool. Every puzzle gets a difficulty band and (unless
+# --featured answer) a featured letter up front from the requested shares, so
+# the output is balanced by construction. Worker processes then build
+# candidate pools for their targets and throw away the ones out of band with
+# Dictionary.count_matching, which stops counting as soon as a pool is too
+# easy. Padding letters are drawn with weight frequency**alpha, and each band
+# nudges alpha towards common letters (more words) or rare ones (fewer words)
+# whenever a candidate misses, so most targets land within a few tries.
+#
+# De-duplication: no two puzzles share a letter pool and featured letter (nor
+# repeat one from the --exclude files), and --max-per-answer caps how often an
+# answer word is used. For a given --seed the output is the same whatever
+# --workers is. Rebuild catalog.bin afterwards with 'python catalog.py'.
 
+import argparse
+import os
 import random
+import time
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog import load_letter_puzzles
+from dictionary import ALPHABET, Dictionary
+
+PUZZLE_LETTERS = 12
+MAX_COPIES = 3  # of any one letter in a pool
+DEFAULT_BANDS = '4-10,11-25,26-80'
+CHUNK_SIZE = 500  # targets per worker task
+MAX_TRIES = 200  # candidates per target before giving up on it for this round
+MAX_ROUNDS = 5  # passes over targets that were missed or collided
+ALPHA_STEP = 0.15
+ALPHA_RANGE = (-2.0, 3.0)
 
 def load_words(filename='words.txt'):
     """Load words from file"""
     try:
         with open(filename, 'r') as f:
-            words = [line.strip().upper() for line in f 
+            words = [line.strip().upper() for line in f
                     if len(line.strip()) == 5 and line.strip().isalpha()]
         print(f"✅ Loaded {len(words)} words from {filename}")
         return words
@@ -15,104 +51,227 @@ def load_words(filename='words.txt'):
         print(f"❌ {filename} not found, using fallback words")
         return ["STORE", "STARE", "STEAM", "STEAL", "TIGER", "CHAIR", "HOUSE", "BREAD", "MAGIC"]
 
-def can_make_word(word, available_letters):
-    """Check if word can be made from available letters"""
-    available_count = Counter(available_letters)
-    word_count = Counter(word)
-    
-    for letter, needed in word_count.items():
-        if available_count.get(letter, 0) < needed:
-            return False
-    return True
-
-def generate_puzzle(answer_word, all_words):
-    """Generate one puzzle"""
-    
-    answer_word = answer_word.upper()
-    featured_letter = random.choice(answer_word)  # Pick random letter as featured
-    
-    # Start with answer word letters
-    letter_pool = list(answer_word)
-    
-    # Add random common letters to reach 12
-    common_letters = ['E', 'A', 'R', 'I', 'O', 'T', 'N', 'S', 'L', 'C', 'U', 'D', 'P', 'M', 'H', 'G', 'B', 'F', 'Y', 'W']
-    
-    while len(letter_pool) < 12:
-        letter = random.choice(common_letters)
-        if letter_pool.count(letter) < 3:  # Max 3 of any letter
-            letter_pool.append(letter)
-    
-    # Scramble completely
-    random.shuffle(letter_pool)
-    
-    # Find valid words that use featured letter
-    valid_words = []
-    for word in all_words:
-        if featured_letter in word and can_make_word(word, letter_pool):
-            valid_words.append(word)
-    
-    return {
-        'featured_letter': featured_letter,
-        'answer': answer_word,
-        'available_letters': letter_pool,
-        'valid_words': valid_words,
-        'difficulty': len(valid_words)
-    }
+# -- targets -------------------------------------------------------------------
 
-def main():
-    """Main function - does everything"""
-    
-    print("🧩 Letter Puzzle Generator for Cafe Game")
-    print("=" * 50)
-    
-    # Load words
-    words = load_words()
-    
-    # Ask how many puzzles
-    try:
-        count = int(input("How many puzzles? (default 100): ") or "100")
-    except ValueError:
-        count = 100
-    
-    # Generate puzzles
-    puzzles = []
-    print(f"Generating {count} puzzles...")
-    
-    for i in range(count):
-        answer_word = random.choice(words)
-        puzzle = generate_puzzle(answer_word, words)
-        puzzles.append(puzzle)
-        
-        if (i + 1) % 20 == 0:
-            print(f"Generated {i + 1}/{count} puzzles...")
-    
-    # Save to file
-    with open('letter_puzzles.txt', 'w') as f:
+def parse_bands(spec):
+    """[(low, high, weight), ...] from "4-10:1,11-25:2" (weights default to 1)"""
+    bands = []
+    for part in spec.split(','):
+        span, _, weight = part.partition(':')
+        low, _, high = span.partition('-')
+        low, high = int(low), int(high or low)
+        if low < 1 or high < low:
+            raise ValueError(f"Bad difficulty band: {part!r}")
+        bands.append((low, high, float(weight or 1)))
+    return bands
+
+def parse_featured(spec, answers):
+    """None for 'answer' (any letter of the answer), else {letter: weight}"""
+    if spec == 'answer':
+        return None
+    usable = {letter for answer in answers for letter in answer}
+    if spec == 'uniform':
+        return {letter: 1.0 for letter in ALPHABET if letter in usable}
+    weights = {}
+    for part in spec.split(','):
+        letter, _, weight = part.partition('=')
+        letter = letter.strip().upper()
+        if letter not in usable:
+            raise ValueError(f"No answer word contains featured letter {letter!r}")
+        weights[letter] = float(weight or 1)
+    return weights
+
+def quotas(total, weights):
+    """Split total into integer shares proportional to weights (largest remainder)"""
+    scale = total / sum(weights)
+    shares = [w * scale for w in weights]
+    counts = [int(s) for s in shares]
+    by_remainder = sorted(range(len(weights)), key=lambda i: counts[i] - shares[i])
+    for i in by_remainder[:total - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+def plan_targets(count, bands, featured, rng):
+    """[(band index, featured letter or None), ...] meeting both distributions exactly"""
+    band_slots = [i for i, n in enumerate(quotas(count, [b[2] for b in bands])) for _ in range(n)]
+    if featured is None:
+        letter_slots = [None] * count
+    else:
+        letters = sorted(featured)
+        letter_slots = [letters[i] for i, n in enumerate(quotas(count, [featured[l] for l in letters]))
+                        for _ in range(n)]
+    rng.shuffle(band_slots)
+    rng.shuffle(letter_slots)
+    return list(zip(band_slots, letter_slots))
+
+def puzzle_key(featured_letter, letters):
+    return featured_letter, ''.join(sorted(letters))
+
+# -- workers -------------------------------------------------------------------
+
+_WORKER = {}
+
+def _init_worker(words, answers, bands):
+    dictionary = Dictionary(words)
+    frequency = Counter(letter for word in dictionary.words for letter in word)
+    _WORKER.update(
+        dictionary=dictionary,
+        answers=answers,
+        answers_by_letter={letter: [a for a in answers if letter in a] for letter in ALPHABET},
+        bands=bands,
+        letters=[letter for letter in ALPHABET if frequency[letter]],
+        frequency=frequency,
+        cum_weights={}
+    )
+
+def _padding_weights(alpha):
+    """Cumulative padding-letter weights for frequency**alpha, cached per rounded alpha"""
+    alpha = round(alpha, 2)
+    weights = _WORKER['cum_weights'].get(alpha)
+    if weights is None:
+        total, weights = 0.0, []
+        for letter in _WORKER['letters']:
+            total += _WORKER['frequency'][letter] ** alpha
+            weights.append(total)
+        _WORKER['cum_weights'][alpha] = weights
+    return weights
+
+def _candidate(answer, alpha, rng):
+    pool = list(answer)
+    letters, weights = _WORKER['letters'], _padding_weights(alpha)
+    while len(pool) < PUZZLE_LETTERS:
+        for letter in rng.choices(letters, cum_weights=weights, k=PUZZLE_LETTERS - len(pool)):
+            if pool.count(letter) < MAX_COPIES and len(pool) < PUZZLE_LETTERS:
+                pool.append(letter)
+    return pool
+
+def _generate_chunk(task):
+    """Puzzles for a list of targets: ([(target, puzzle), ...], missed targets, candidates tried)"""
+    seed, targets, skip_answers = task
+    rng = random.Random(seed)
+    dictionary, bands = _WORKER['dictionary'], _WORKER['bands']
+    alphas = [1.0] * len(bands)
+    made, missed, tries, seen = [], [], 0, set()
+    for target in targets:
+        band, featured = target
+        low, high, _ = bands[band]
+        answers = _WORKER['answers_by_letter'][featured] if featured else _WORKER['answers']
+        answers = [a for a in answers if a not in skip_answers] if skip_answers else answers
+        for _ in range(MAX_TRIES if answers else 0):
+            tries += 1
+            answer = rng.choice(answers)
+            letter = featured or rng.choice(answer)
+            pool = _candidate(answer, alphas[band], rng)
+            count = dictionary.count_matching(pool, letter, limit=high)
+            if count > high:
+                alphas[band] = max(ALPHA_RANGE[0], alphas[band] - ALPHA_STEP)
+                continue
+            if count < low:
+                alphas[band] = min(ALPHA_RANGE[1], alphas[band] + ALPHA_STEP)
+                continue
+            key = puzzle_key(letter, pool)
+            if key in seen:
+                continue
+            seen.add(key)
+            rng.shuffle(pool)
+            examples = [dictionary.words[i] for i in dictionary.matching_words(pool, letter)[:5]]
+            made.append((target, {'featured_letter': letter, 'answer': answer, 'available_letters': pool,
+                                  'difficulty': count, 'examples': examples}))
+            break
+        else:
+            missed.append(target)
+    return made, missed, tries
+
+# -- driver --------------------------------------------------------------------
+
+def generate(count, bands, featured, words, answers, workers=None, seed=0, max_per_answer=None, exclude=()):
+    """Generate count puzzles across a process pool; returns (puzzles, unfilled targets, candidates tried)"""
+    rng = random.Random(seed)
+    pending = plan_targets(count, bands, featured, rng)
+    keys = set(exclude)
+    per_answer = Counter()
+    puzzles, tries = [], 0
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(words, answers, bands)) as pool:
+        for round_number in range(MAX_ROUNDS):
+            if not pending:
+                break
+            skip = frozenset(a for a, n in per_answer.items() if max_per_answer and n >= max_per_answer)
+            chunks = [pending[i:i + CHUNK_SIZE] for i in range(0, len(pending), CHUNK_SIZE)]
+            tasks = [(seed * 1_000_003 + round_number * 100_003 + i, chunk, skip) for i, chunk in enumerate(chunks)]
+            pending = []
+            # map keeps chunk order, so acceptance (and the output) doesn't depend on worker timing
+            for made, missed, chunk_tries in pool.map(_generate_chunk, tasks):
+                tries += chunk_tries
+                pending += missed
+                for target, puzzle in made:
+                    key = puzzle_key(puzzle['featured_letter'], puzzle['available_letters'])
+                    if key in keys or (max_per_answer and per_answer[puzzle['answer']] >= max_per_answer):
+                        pending.append(target)
+                        continue
+                    keys.add(key)
+                    per_answer[puzzle['answer']] += 1
+                    puzzle['band'] = target[0]
+                    puzzles.append(puzzle)
+    return puzzles, pending, tries
+
+def write_puzzles(puzzles, path):
+    with open(path, 'w') as f:
         f.write("# Generated Letter Puzzle Variations - FULLY SCRAMBLED\n")
         f.write("# Format: FEATURED_LETTER|ANSWER|AVAILABLE_LETTERS\n\n")
-        
         for i, puzzle in enumerate(puzzles, 1):
-            examples = puzzle['valid_words'][:5] if puzzle['valid_words'] else [puzzle['answer']]
             f.write(f"# Puzzle {i}: {puzzle['difficulty']} words with '{puzzle['featured_letter']}'\n")
-            f.write(f"# Examples: {', '.join(examples)}\n")
-            
-            letters_str = ','.join(puzzle['available_letters'])
-            f.write(f"{puzzle['featured_letter']}|{puzzle['answer']}|{letters_str}\n\n")
-    
-    # Show results
-    difficulties = [p['difficulty'] for p in puzzles]
-    print(f"\n✅ SUCCESS!")
-    print(f"📁 Generated {len(puzzles)} puzzles in 'letter_puzzles.txt'")
-    print(f"📊 Average difficulty: {sum(difficulties) / len(difficulties):.1f} words")
-    print(f"📊 Range: {min(difficulties)} - {max(difficulties)} words")
-    
-    # Show sample
-    sample = puzzles[0]
-    print(f"\n📋 SAMPLE PUZZLE:")
-    print(f"   Featured: {sample['featured_letter']}")
-    print(f"   Answer: {sample['answer']}")
-    print(f"   Letters: {', '.join(sample['available_letters'])}")
-    print(f"   Valid words: {', '.join(sample['valid_words'][:3])}...")
+            f.write(f"# Examples: {', '.join(puzzle['examples'])}\n")
+            f.write(f"{puzzle['featured_letter']}|{puzzle['answer']}|{','.join(puzzle['available_letters'])}\n\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate letter puzzles to difficulty targets")
+    parser.add_argument('-n', '--count', type=int, default=100, help="puzzles to generate")
+    parser.add_argument('--bands', default=DEFAULT_BANDS,
+                        help="difficulty bands as LOW-HIGH[:WEIGHT],... (valid words per puzzle)")
+    parser.add_argument('--featured', default='answer',
+                        help="'answer' (any letter of the answer), 'uniform', or LETTER=WEIGHT,...")
+    parser.add_argument('--max-per-answer', type=int, help="use each answer word at most this often")
+    parser.add_argument('--exclude', action='append', default=[], help="puzzle file(s) not to repeat")
+    parser.add_argument('--words', default='words.txt')
+    parser.add_argument('--answers', help="answer word file (default: the word list)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default='letter_puzzles.txt')
+    args = parser.parse_args()
+
+    print("🧩 Letter Puzzle Generator for Cafe Game")
+    print("=" * 50)
+    words = load_words(args.words)
+    answers = sorted(set(load_words(args.answers))) if args.answers else sorted(set(words))
+    try:
+        bands = parse_bands(args.bands)
+        featured = parse_featured(args.featured, answers)
+    except ValueError as e:
+        parser.error(str(e))
+    exclude = [puzzle_key(p['featured_letter'], p['available_letters'])
+               for path in args.exclude for p in load_letter_puzzles(path)]
+
+    print(f"Generating {args.count} puzzles on {args.workers} workers...")
+    start = time.perf_counter()
+    puzzles, unfilled, tries = generate(args.count, bands, featured, words, answers, args.workers,
+                                        args.seed, args.max_per_answer, exclude)
+    elapsed = time.perf_counter() - start
+    write_puzzles(puzzles, args.output)
+
+    print(f"\n✅ Generated {len(puzzles)} puzzles in {elapsed:.1f}s ({len(puzzles) / elapsed:,.0f}/s, "
+          f"{tries / max(len(puzzles), 1):.1f} candidates per puzzle) -> '{args.output}'")
+    band_counts = Counter(p['band'] for p in puzzles)
+    for i, (low, high, _) in enumerate(bands):
+        difficulties = [p['difficulty'] for p in puzzles if p['band'] == i]
+        average = sum(difficulties) / len(difficulties) if difficulties else 0
+        print(f"📊 {low:>3}-{high:<3} words: {band_counts[i]:>7} puzzles, average {average:.1f}")
+    top = Counter(p['featured_letter'] for p in puzzles).most_common(5)
+    print(f"🔤 Featured letters: {len(set(p['featured_letter'] for p in puzzles))} used, most common "
+          f"{', '.join(f'{letter} {n}' for letter, n in top)}")
+    if unfilled:
+        print(f"⚠️  {len(unfilled)} targets could not be met (band too tight for the featured letter?)")
+    print("Rebuild the catalog with 'python catalog.py'")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,109 @@
+"""Append-only log of submitted guesses, for offline puzzle analytics.
+
+Every applied guess appends one JSON line to a per-day file in
+GUESS_LOG_DIR (guesses-YYYYMMDD.jsonl):
+
+    {"ts": 1760000123.456, "game": "<id>", "puzzle": 12, "answer": 3,
+     "guess": "CRANE", "outcome": "lost", "created": 1760000001.0,
+     "opened": 1760000100.2}
+
+ts, created and opened are epoch seconds (opened is null for games played
+before accessed_at was recorded). Each line goes out in a single write on
+an O_APPEND descriptor, so several gunicorn workers can share one
+directory without interleaving lines, and new files start at midnight
+without any rotation coordination between them.
+
+Set GUESS_LOG_DIR to an empty string to turn logging off. guess_stats.py
+aggregates the files.
+"""
+
+import datetime
+import json
+import logging
+import os
+import threading
+
+GUESS_LOG_DIR = os.getenv('GUESS_LOG_DIR', 'guess_log')
+GUESS_LOG_PREFIX = 'guesses-'
+
+log = logging.getLogger('cafe.guess_log')
+
+
+def epoch(iso_time):
+    """Epoch seconds from an isoformat() timestamp, or None"""
+    if not iso_time:
+        return None
+    try:
+        return round(datetime.datetime.fromisoformat(iso_time).timestamp(), 3)
+    except (TypeError, ValueError):
+        return None
+
+
+def guess_event(game, guess, outcome, when=None):
+    """The log record for an applied guess on game (the merged game dict)"""
+    when = when or datetime.datetime.now()
+    return {
+        'ts': round(when.timestamp(), 3),
+        'game': game['id'],
+        'puzzle': game['puzzle_number'],
+        'answer': game['answer_number'],
+        'guess': guess,
+        'outcome': outcome,
+        'created': epoch(game.get('created_at')),
+        'opened': epoch(game.get('accessed_at'))
+    }
+
+
+class GuessLog:
+    """Appends guess events to per-day files in directory (a no-op when directory is empty)"""
+
+    def __init__(self, directory=GUESS_LOG_DIR):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.fd = None
+        self.day = None
+        self.written = 0
+        self.errors = 0
+
+    def path(self, day):
+        return os.path.join(self.directory, f"{GUESS_LOG_PREFIX}{day}.jsonl")
+
+    def _fd_for(self, day):
+        if day != self.day:
+            if self.fd is not None:
+                os.close(self.fd)
+                self.fd = None
+            os.makedirs(self.directory, exist_ok=True)
+            self.fd = os.open(self.path(day), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            self.day = day
+        return self.fd
+
+    def append(self, event):
+        """Write one event; logging problems are reported, never raised to the request"""
+        if not self.directory:
+            return False
+        line = (json.dumps(event, separators=(',', ':')) + '\n').encode()
+        day = datetime.datetime.fromtimestamp(event['ts']).strftime('%Y%m%d')
+        try:
+            with self.lock:
+                os.write(self._fd_for(day), line)
+                self.written += 1
+            return True
+        except OSError as e:
+            self.errors += 1
+            log.error("Guess log error", extra={'error': str(e)})
+            return False
+
+    def close(self):
+        with self.lock:
+            if self.fd is not None:
+                os.close(self.fd)
+            self.fd = None
+            self.day = None
+
+    def stats(self):
+        return {
+            'directory': self.directory or None,
+            'written': self.written,
+            'errors': self.errors
+        }
@@ -0,0 +1,203 @@
+"""Per-puzzle win rate, time to guess and common wrong guesses from the guess log.
+
+    python guess_stats.py                          # fold new lines from GUESS_LOG_DIR into GUESS_STATS_FILE
+    python guess_stats.py --log-dir DIR --out FILE
+    zcat old/*.jsonl.gz | python guess_stats.py -  # stream events from stdin
+    python guess_stats.py --report 20              # print the 20 hardest puzzle/answer pairs
+
+Runs are incremental: the output file keeps the aggregates plus how far each
+log file has been read, so a cron job only parses lines appended since the
+last run (a half-written last line is left for next time).
+
+Memory stays bounded however many events go through:
+  - one small record per puzzle/answer pair (bounded by the catalog)
+  - time to guess as counts in fixed log-spaced buckets, so medians are
+    bucket-accurate
+  - wrong guesses per puzzle with the Space-Saving top-k sketch:
+    WRONG_GUESS_SLOTS counters per puzzle, where any guess made more than
+    1/WRONG_GUESS_SLOTS of the time is guaranteed to be kept
+
+The admin game sequence page reads the output file with read_stats().
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+
+from guess_log import GUESS_LOG_DIR, GUESS_LOG_PREFIX
+
+GUESS_STATS_FILE = os.getenv('GUESS_STATS_FILE', 'guess_stats.json')
+WRONG_GUESS_SLOTS = 64
+# Upper bounds (seconds) of the time-to-guess buckets; the last bucket is everything slower
+TTG_BUCKETS = (5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300, 600, 1800)
+
+
+def empty_stats():
+    return {'events': 0, 'skipped': 0, 'files': {}, 'pairs': {}, 'puzzles': {}}
+
+
+def ttg_bucket(seconds):
+    for i, bound in enumerate(TTG_BUCKETS):
+        if seconds <= bound:
+            return i
+    return len(TTG_BUCKETS)
+
+
+def count_wrong_guess(slots, guess, size=WRONG_GUESS_SLOTS):
+    """Space-Saving update: slots is {guess: [count, overestimate]}"""
+    if guess in slots:
+        slots[guess][0] += 1
+    elif len(slots) < size:
+        slots[guess] = [1, 0]
+    else:
+        # Evict the smallest counter; the newcomer inherits its count as possible overestimate
+        smallest = min(slots, key=lambda g: slots[g][0])
+        floor = slots.pop(smallest)[0]
+        slots[guess] = [floor + 1, floor]
+
+
+def add_event(stats, event):
+    """Fold one guess event into stats"""
+    pair = stats['pairs'].setdefault(f"{event['puzzle']}.{event['answer']}", {
+        'games': 0, 'wins': 0, 'ttg': [0] * (len(TTG_BUCKETS) + 1)})
+    pair['games'] += 1
+    if event['outcome'] == 'won':
+        pair['wins'] += 1
+    else:
+        puzzle = stats['puzzles'].setdefault(str(event['puzzle']), {'wrong': {}})
+        count_wrong_guess(puzzle['wrong'], event['guess'])
+    if event.get('opened'):
+        pair['ttg'][ttg_bucket(max(0, event['ts'] - event['opened']))] += 1
+    stats['events'] += 1
+
+
+def add_lines(stats, lines):
+    for line in lines:
+        try:
+            add_event(stats, json.loads(line))
+        except (ValueError, KeyError, TypeError):
+            stats['skipped'] += 1
+
+
+def read_new_lines(path, offset):
+    """Complete lines appended to path since offset, and the offset after them"""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b'\n'):
+                break  # still being written
+            offset += len(line)
+            yield line, offset
+
+
+def update_from_dir(stats, log_dir):
+    """Fold lines appended to the log files since the last run; returns events added"""
+    before = stats['events']
+    seen = {}
+    for path in sorted(glob.glob(os.path.join(log_dir, f"{GUESS_LOG_PREFIX}*.jsonl"))):
+        name = os.path.basename(path)
+        offset = stats['files'].get(name, 0)
+        if offset > os.path.getsize(path):
+            offset = 0  # replaced since the last run
+        for line, offset in read_new_lines(path, offset):
+            add_lines(stats, (line,))
+        seen[name] = offset
+    stats['files'] = seen
+    return stats['events'] - before
+
+
+def median_ttg(ttg):
+    """Upper bound of the bucket holding the median time to guess, or None"""
+    total = sum(ttg)
+    if not total:
+        return None
+    running = 0
+    for i, count in enumerate(ttg):
+        running += count
+        if running * 2 >= total:
+            return TTG_BUCKETS[i] if i < len(TTG_BUCKETS) else float('inf')
+
+
+def pair_summary(pair):
+    return {
+        'games': pair['games'],
+        'wins': pair['wins'],
+        'win_rate': round(pair['wins'] / pair['games'], 3) if pair['games'] else None,
+        'median_ttg': median_ttg(pair['ttg'])
+    }
+
+
+def top_wrong_guesses(puzzle, n=5):
+    """[(guess, count), ...] most common first; counts may be overestimated by the sketch"""
+    slots = puzzle['wrong'] if puzzle else {}
+    # Rank by the guaranteed part of each count, so recent evictees don't outrank real favourites
+    ranked = sorted(slots.items(), key=lambda kv: kv[1][1] - kv[1][0])
+    return [(g, c[0]) for g, c in ranked[:n]]
+
+
+def load_stats(path=GUESS_STATS_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return empty_stats()
+
+
+def save_stats(stats, path=GUESS_STATS_FILE):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(stats, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+_cached = {'path': None, 'mtime': None, 'stats': None}
+
+
+def read_stats(path=GUESS_STATS_FILE):
+    """Aggregated stats for the app, re-read only when the file changes"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return empty_stats()
+    if _cached['path'] != path or _cached['mtime'] != mtime:
+        _cached.update(path=path, mtime=mtime, stats=load_stats(path))
+    return _cached['stats']
+
+
+def print_report(stats, limit):
+    pairs = sorted(stats['pairs'].items(), key=lambda kv: (kv[1]['wins'] / kv[1]['games'], -kv[1]['games']))
+    print(f"{stats['events']} events ({stats['skipped']} skipped), {len(stats['pairs'])} puzzle/answer pairs")
+    print(f"{'pair':<8} {'games':>7} {'win %':>6} {'median':>7}  common wrong guesses")
+    for key, pair in pairs[:limit]:
+        summary = pair_summary(pair)
+        wrong = ', '.join(f"{g} {c}" for g, c in top_wrong_guesses(stats['puzzles'].get(key.split('.')[0]), 3))
+        ttg = f"<={summary['median_ttg']}s" if summary['median_ttg'] is not None else '-'
+        print(f"{key:<8} {summary['games']:>7} {summary['win_rate'] * 100:>5.0f}% {ttg:>7}  {wrong}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate the guess log into per-puzzle stats")
+    parser.add_argument('source', nargs='?', help="'-' to read events from stdin instead of the log directory")
+    parser.add_argument('--log-dir', default=GUESS_LOG_DIR)
+    parser.add_argument('--out', default=GUESS_STATS_FILE)
+    parser.add_argument('--report', type=int, metavar='N', help="print the N hardest pairs")
+    args = parser.parse_args()
+
+    stats = load_stats(args.out)
+    before = stats['events']
+    if args.source == '-':
+        add_lines(stats, sys.stdin.buffer)
+    elif args.source:
+        parser.error("source must be '-' (use --log-dir for log files)")
+    else:
+        update_from_dir(stats, args.log_dir)
+    save_stats(stats, args.out)
+    print(f"Added {stats['events'] - before} events, {stats['events']} total -> {args.out}")
+    if args.report:
+        print_report(stats, args.report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Structured, non-blocking logging for the cafe server.
+
+Modules log through child loggers of 'cafe' (cafe.games, cafe.storage...)
+with structured fields passed as extra:
+
+    log.info("Game created", extra={'game_id': game_id, 'puzzle': 12})
+
+Records are put on a bounded in-memory queue by a QueueHandler and written
+to stdout by one QueueListener thread, so a request never waits on the
+terminal or a log pipe. When the queue is full (stdout stalled) records are
+dropped and counted rather than blocking the request.
+
+    LOG_LEVEL   DEBUG / INFO / WARNING...            (default INFO)
+    LOG_FORMAT  'text' or 'json' (one object per line) (default text)
+    LOG_SAMPLE  keep only a fraction of chatty below-WARNING records, per
+                logger prefix, e.g. "cafe.games=0.1,cafe.storage=0.01"
+    LOG_QUEUE_SIZE                                   (default 10000)
+
+Warnings and errors are never sampled out.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_SAMPLE = os.getenv('LOG_SAMPLE', '')
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+
+ROOT_LOGGER = 'cafe'
+
+# LogRecord attributes that are not user-supplied fields
+_STANDARD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+_listener = None
+_queue_handler = None
+_sample_filter = None
+
+
+def parse_sample_rates(spec):
+    """{'cafe.games': 0.1, ...} from "cafe.games=0.1,..." (malformed entries are ignored)"""
+    rates = {}
+    for part in spec.split(','):
+        name, _, rate = part.partition('=')
+        try:
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+def fields(record):
+    """The structured fields passed to a log call via extra"""
+    return {k: v for k, v in vars(record).items() if k not in _STANDARD_ATTRS and not k.startswith('_')}
+
+
+class SampleFilter(logging.Filter):
+    """Keeps a fraction of below-WARNING records for loggers matching a configured prefix"""
+
+    def __init__(self, rates):
+        super().__init__()
+        # Longest prefix first, so cafe.storage.redis can override cafe.storage
+        self.rates = sorted(rates.items(), key=lambda kv: -len(kv[0]))
+        self.sampled_out = 0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        for prefix, rate in self.rates:
+            if record.name == prefix or record.name.startswith(prefix + '.'):
+                if random.random() < rate:
+                    return True
+                self.sampled_out += 1
+                return False
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # The listener runs in this process, so formatting (and rendering any traceback)
+        # is left to its thread instead of being done on the request
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        entry.update(fields(record))
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s: %(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        extra = fields(record)
+        if extra:
+            line += ' ' + ' '.join(f"{k}={v}" for k, v in extra.items())
+        return line
+
+
+def setup_logging(level=LOG_LEVEL, fmt=LOG_FORMAT, sample=LOG_SAMPLE, queue_size=LOG_QUEUE_SIZE, stream=None):
+    """Route the 'cafe' loggers through a bounded queue to stdout; safe to call more than once"""
+    global _listener, _queue_handler, _sample_filter
+    if _listener is not None:
+        return logging.getLogger(ROOT_LOGGER)
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+
+    _queue_handler = DroppingQueueHandler(queue.Queue(queue_size))
+    _sample_filter = SampleFilter(parse_sample_rates(sample))
+    _queue_handler.addFilter(_sample_filter)
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, output)
+    _listener.start()
+    atexit.register(stop_logging)
+    # The writer thread doesn't survive a fork (gunicorn --preload): give each child its own
+    os.register_at_fork(after_in_child=_restart_after_fork)
+    return root
+
+
+def _restart_after_fork():
+    global _listener
+    if _listener is None:
+        return
+    _queue_handler.queue = queue.Queue(_queue_handler.queue.maxsize)
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, *_listener.handlers)
+    _listener.start()
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    _listener.stop()
+    logging.getLogger(ROOT_LOGGER).removeHandler(_queue_handler)
+    _listener = None
+    _queue_handler = None
+
+
+def log_stats():
+    if _queue_handler is None:
+        return {'enabled': False}
+    return {
+        'enabled': True,
+        'queued': _queue_handler.queue.qsize(),
+        'dropped': _queue_handler.dropped,
+        'sampled_out': _sample_filter.sampled_out
+    }
+
+
+def elapsed_ms(start):
+    """Milliseconds since a time.perf_counter() start, for log fields"""
+    return round((time.perf_counter() - start) * 1000, 2)
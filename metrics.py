@@ -0,0 +1,146 @@
+"""Latency histograms exposed in the Prometheus text format on /metrics.
+
+    cafe_request_seconds{route, method, status}    per Flask/Quart route rule
+    cafe_storage_seconds{backend, method, outcome} per GameStore call
+    cafe_stage_seconds{stage}                      CPU-heavy steps (QR render, word check)
+
+Routes are labelled by their rule (/game/<game_id>/guess), never the raw
+path, so label cardinality stays fixed. Observing is a dict lookup and a
+few integer increments under a lock.
+
+Each gunicorn worker keeps its own histograms. With several workers set
+METRICS_DIR to a directory they share: every worker writes its snapshot
+there every METRICS_FLUSH_INTERVAL seconds, and /metrics adds up all the
+snapshots, whichever worker answers the scrape.
+"""
+
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '10'))
+
+# Seconds; from a local memory hit up to a storage timeout
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram keyed by a tuple of label values"""
+
+    def __init__(self, name, help_text, label_names, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self.series = {}  # label values -> [count per bucket..., +Inf count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, labels, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += seconds
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(labels, time.perf_counter() - start)
+
+    def snapshot(self):
+        with self.lock:
+            return {'\x1f'.join(map(str, labels)): list(series) for labels, series in self.series.items()}
+
+    def render(self, snapshots):
+        """Prometheus text lines for this histogram, summing the given snapshots"""
+        merged = {}
+        for snapshot in snapshots:
+            for key, series in snapshot.items():
+                total = merged.setdefault(key, [0] * len(series))
+                for i, value in enumerate(series):
+                    total[i] += value
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key in sorted(merged):
+            series = merged[key]
+            labels = ','.join(f'{n}="{v}"' for n, v in zip(self.label_names, key.split('\x1f')))
+            sep = ',' if labels else ''
+            running = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series[:-1]):
+                running += count
+                lines.append(f'{self.name}_bucket{{{labels}{sep}le="{bound}"}} {running}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {running}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram('cafe_request_seconds', 'Request latency by route', ('route', 'method', 'status'))
+STORAGE_LATENCY = Histogram('cafe_storage_seconds', 'Game store call latency', ('backend', 'method', 'outcome'))
+STAGE_LATENCY = Histogram('cafe_stage_seconds', 'Latency of CPU-heavy request steps', ('stage',))
+HISTOGRAMS = (REQUEST_LATENCY, STORAGE_LATENCY, STAGE_LATENCY)
+
+
+def snapshot():
+    return {h.name: h.snapshot() for h in HISTOGRAMS}
+
+
+def write_snapshot(directory=METRICS_DIR):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"metrics-{os.getpid()}.json")
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(snapshot(), f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _flush_loop(directory):
+    while True:
+        time.sleep(METRICS_FLUSH_INTERVAL)
+        try:
+            write_snapshot(directory)
+        except OSError:
+            pass
+
+
+_flusher = {'pid': None}
+
+
+def start_flusher(directory=METRICS_DIR):
+    """Start this worker's snapshot thread (once per process) when METRICS_DIR is set
+
+    Called on every request; after the first it is a pid comparison.
+    """
+    if not directory or _flusher['pid'] == os.getpid():
+        return
+    _flusher['pid'] = os.getpid()
+    threading.Thread(target=_flush_loop, args=(directory,), name='metrics-flush', daemon=True).start()
+
+
+def render(gauges=None, directory=METRICS_DIR):
+    """The /metrics body: every histogram (all workers' when directory is set) plus gauges {name: value}"""
+    if directory:
+        start_flusher(directory)
+        write_snapshot(directory)
+        snapshots = []
+        for path in glob.glob(os.path.join(directory, 'metrics-*.json')):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    else:
+        snapshots = [snapshot()]
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines += histogram.render(s.get(histogram.name, {}) for s in snapshots)
+    for name, value in (gauges or {}).items():
+        lines += [f"# TYPE {name} gauge", f"{name} {value}"]
+    return '\n'.join(lines) + '\n'
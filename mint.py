@@ -0,0 +1,256 @@
+# mint.py - Mint games in bulk and render their QR codes onto print sheets
+#
+#   python mint.py -n 2000 --base-url https://cafe.example.com -o cards.pdf
+#   python mint.py -n 500 --base-url https://cafe.example.com -o sheets/ \
+#       --grid 4x5 --paper letter --title "Scan to play!"
+#   python mint.py --from-csv games.csv -o cards.pdf   # games minted via POST /api/mint_games
+#       (an admin-only endpoint: curl -u admin:$ADMIN_PASSWORD -H "Content-Type: application/json" \
+#        -d '{"count": 2000}' https://.../api/mint_games -o games.csv)
+#
+# Minting reserves every sequence number with one counter round trip and
+# saves the records in pipelined batches (wordle_cafe.mint_games), straight to
+# the configured store - the same UPSTASH_REDIS_URL / GAME_STORE settings as
+# the server. Pages are rendered in a process pool, a few pages ahead of the
+# writer, and written in order as they finish: a PDF is streamed out a page
+# at a time (each page one 1-bit image), a directory gets one PNG per page.
+# Memory stays flat however many games are minted.
+
+import argparse
+import csv
+import io
+import os
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import qrcode
+from PIL import Image, ImageDraw, ImageFont
+
+PAPER_MM = {'a4': (210, 297), 'letter': (216, 279)}
+
+
+def page_size(paper, dpi):
+    width_mm, height_mm = PAPER_MM[paper]
+    return round(width_mm / 25.4 * dpi), round(height_mm / 25.4 * dpi)
+
+
+def render_page(task):
+    """One sheet of cards - a QR code and caption per cell, with cut lines - encoded for the writer
+
+    Returns (PNG bytes, or zlib-compressed 1-bit rows for a PDF, card count).
+    """
+    cards, (width, height), (cols, rows), title, pdf = task
+    page = Image.new('1', (width, height), 1)
+    draw = ImageDraw.Draw(page)
+    margin = width // 20
+    cell_w, cell_h = (width - 2 * margin) // cols, (height - 2 * margin) // rows
+    font = ImageFont.load_default(size=max(12, cell_h // 16))
+    line = font.size + font.size // 2
+    text_lines = 2 if title else 1
+    side = min(cell_w, cell_h - text_lines * line) * 9 // 10
+
+    for i, (sequence, url) in enumerate(cards):
+        left = margin + (i % cols) * cell_w
+        top = margin + (i // cols) * cell_h
+        # Dotted cut lines along each card's right and bottom edges
+        for x in range(left, left + cell_w, 12):
+            draw.line([(x, top + cell_h), (x + 4, top + cell_h)], fill=0)
+        for y in range(top, top + cell_h, 12):
+            draw.line([(left + cell_w, y), (left + cell_w, y + 4)], fill=0)
+
+        qr = qrcode.QRCode(border=2)
+        qr.add_data(url)
+        qr.make(fit=True)
+        matrix = qr.get_matrix()
+        modules = Image.new('1', (len(matrix), len(matrix)), 1)
+        modules.putdata([0 if dark else 1 for row in matrix for dark in row])
+        page.paste(modules.resize((side, side), Image.NEAREST), (left + (cell_w - side) // 2, top + line // 2))
+
+        text_top = top + line // 2 + side + line // 4
+        for text in ([title] if title else []) + [f"Game #{sequence}"]:
+            text_width = draw.textlength(text, font=font)
+            draw.text((left + (cell_w - text_width) / 2, text_top), text, font=font, fill=0)
+            text_top += line
+
+    if pdf:
+        return zlib.compress(page.tobytes()), len(cards)
+    buffer = io.BytesIO()
+    page.save(buffer, format='PNG')
+    return buffer.getvalue(), len(cards)
+
+
+def in_order(pool, fn, tasks, ahead):
+    """Like pool.map, but with at most `ahead` tasks in flight, so results never pile up"""
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.submit(fn, task))
+        if len(pending) >= ahead:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def pages(cards, per_page):
+    page = []
+    for card in cards:
+        page.append(card)
+        if len(page) == per_page:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def minted_cards(count, base_url, ttl, stats):
+    """(sequence, url) for each newly minted game, as its batch is saved"""
+    import wordle_cafe  # only needed (and its storage configured) when minting here
+    batches = wordle_cafe.mint_games(count, ttl)
+    while True:
+        # Time the minting alone - the generator is paused while sheets catch up
+        start = time.perf_counter()
+        batch = next(batches, None)
+        stats['mint_seconds'] += time.perf_counter() - start
+        if batch is None:
+            return
+        stats['minted'] += len(batch)
+        for game in batch:
+            yield game['game_sequence'], f"{base_url}/game/{game['id']}"
+
+
+def check_csv(path):
+    """Exit unless a /api/mint_games CSV ends with its #complete line and has that many games"""
+    with open(path, newline='') as f:
+        rows = list(csv.reader(f))
+    trailer = rows[-1] if len(rows) > 1 else ['']
+    if trailer[0] == '#error':
+        raise SystemExit(f"❌ {path}: minting failed after {trailer[1]} games: {','.join(trailer[2:])}")
+    if trailer[0] != '#complete' or int(trailer[1]) != len(rows) - 2:
+        raise SystemExit(f"❌ {path} is incomplete (no #complete line, or games missing) - mint again")
+
+
+def csv_cards(path):
+    """(sequence, url) rows from a /api/mint_games CSV"""
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            if not row['sequence'].startswith('#'):
+                yield row['sequence'], row['url']
+
+
+class PdfStream:
+    """Minimal PDF writer: each page is one full-page 1-bit image, written as it arrives
+
+    Objects 1 and 2 (catalog and page tree) are written last, once every page
+    is known, so nothing already written is ever revisited.
+    """
+
+    def __init__(self, path, size, dpi):
+        self.file = open(path, 'wb')
+        self.width, self.height = size
+        self.points = b'%.2f %.2f' % (self.width * 72 / dpi, self.height * 72 / dpi)
+        self.offsets = {}
+        self.pages = []
+        self.next_object = 3
+        self.file.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def _object(self, number, body, stream=None):
+        self.offsets[number] = self.file.tell()
+        self.file.write(b'%d 0 obj\n' % number + body)
+        if stream is not None:
+            self.file.write(b'\nstream\n' + stream + b'\nendstream')
+        self.file.write(b'\nendobj\n')
+
+    def add_page(self, bits):
+        """bits: zlib-compressed rows of a size[0] x size[1] 1-bit image (1 = white)"""
+        image, content, page = range(self.next_object, self.next_object + 3)
+        self.next_object += 3
+        self._object(image, b'<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray '
+                            b'/BitsPerComponent 1 /Filter /FlateDecode /Length %d >>'
+                     % (self.width, self.height, len(bits)), bits)
+        draw = b'q %s 0 0 %s 0 0 cm /Im Do Q' % tuple(self.points.split())
+        self._object(content, b'<< /Length %d >>' % len(draw), draw)
+        self._object(page, b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %s] /Resources << /XObject << /Im %d 0 R >> >> '
+                           b'/Contents %d 0 R >>' % (self.points, image, content))
+        self.pages.append(page)
+
+    def close(self):
+        kids = b' '.join(b'%d 0 R' % page for page in self.pages)
+        self._object(2, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(self.pages)))
+        self._object(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+        xref = self.file.tell()
+        self.file.write(b'xref\n0 %d\n0000000000 65535 f \n' % self.next_object)
+        for number in range(1, self.next_object):
+            self.file.write(b'%010d 00000 n \n' % self.offsets[number])
+        self.file.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (self.next_object, xref))
+        self.file.close()
+
+
+class SheetWriter:
+    """Writes rendered pages as they arrive: streamed into one PDF, or numbered PNGs in a directory"""
+
+    def __init__(self, output, size, dpi):
+        self.output = output
+        self.pdf = PdfStream(output, size, dpi) if output.lower().endswith('.pdf') else None
+        self.count = 0
+        self.cards = 0
+        if not self.pdf:
+            os.makedirs(output, exist_ok=True)
+
+    def write(self, data, cards):
+        self.count += 1
+        self.cards += cards
+        if self.pdf:
+            self.pdf.add_page(data)
+        else:
+            with open(os.path.join(self.output, f"sheet-{self.count:04d}.png"), 'wb') as f:
+                f.write(data)
+
+    def close(self):
+        if self.pdf:
+            self.pdf.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mint games in bulk and render printable QR sheets")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('-n', '--count', type=int, help="games to mint")
+    source.add_argument('--from-csv', help="render sheets for games already minted (/api/mint_games CSV)")
+    parser.add_argument('-o', '--output', default='cards.pdf', help="a .pdf file, or a directory for PNG sheets")
+    parser.add_argument('--base-url', help="server the QR codes point at, e.g. https://cafe.example.com (needed with -n)")
+    parser.add_argument('--ttl-days', type=float, default=30, help="how long unplayed minted games live")
+    parser.add_argument('--grid', default='3x4', help="cards per sheet, COLSxROWS")
+    parser.add_argument('--paper', choices=PAPER_MM, default='a4')
+    parser.add_argument('--dpi', type=int, default=300)
+    parser.add_argument('--title', default='Scan to play QWORD!', help="caption above each game number")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    cols, rows = (int(n) for n in args.grid.lower().split('x'))
+    size = page_size(args.paper, args.dpi)
+    stats = {'minted': 0, 'mint_seconds': 0.0}
+    if args.count:
+        if not args.base_url:
+            parser.error("--base-url is required when minting: it goes into every printed QR code")
+        cards = minted_cards(args.count, args.base_url.rstrip('/'), int(args.ttl_days * 86400), stats)
+    else:
+        check_csv(args.from_csv)
+        cards = csv_cards(args.from_csv)
+
+    start = time.perf_counter()
+    writer = SheetWriter(args.output, size, args.dpi)
+    tasks = ((page, size, (cols, rows), args.title, bool(writer.pdf)) for page in pages(cards, cols * rows))
+    with ProcessPoolExecutor(args.workers) as pool:
+        for data, count in in_order(pool, render_page, tasks, ahead=2 * (args.workers or 1)):
+            writer.write(data, count)
+    writer.close()
+    elapsed = time.perf_counter() - start
+
+    if stats['minted']:
+        print(f"✅ Minted {stats['minted']} games in {stats['mint_seconds']:.1f}s "
+              f"({stats['minted'] / max(stats['mint_seconds'], 1e-9):,.0f} games/s)")
+    print(f"🖨️  {writer.cards} cards on {writer.count} sheets ({cols}x{rows}, {args.paper}, {args.dpi} dpi) "
+          f"-> {args.output} in {elapsed:.1f}s ({writer.cards / elapsed:,.0f} games/s end to end)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Background pool of pre-created games with their QR codes already rendered.
+
+/api/create_game pops a ready entry instead of creating the game and
+rendering the QR image on the request thread. A daemon thread refills the
+pool back to QR_POOL_SIZE after every pop. The thread starts lazily on the
+first pop, so it is started after gunicorn forks, not before. Entries older
+than max_age seconds are replaced, since their games expire.
+"""
+
+import os
+import queue
+import threading
+import time
+
+QR_POOL_SIZE = int(os.getenv('QR_POOL_SIZE', '5'))
+
+
+class QRPool:
+    def __init__(self, make_entry, size=QR_POOL_SIZE, max_age=None):
+        self.make_entry = make_entry  # make_entry(base_url) -> entry or None
+        self.size = size
+        self.max_age = max_age
+        self.entries = queue.Queue()  # (created, entry) pairs, oldest first
+        self.wakeup = threading.Event()
+        self.lock = threading.Lock()
+        self.base_url = None
+        self.thread = None
+
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.refill_failures = 0
+        self.expired = 0
+        self.last_refill_ms = 0.0
+        self.total_refill_ms = 0.0
+
+    def pop(self, base_url):
+        """A ready entry for base_url, or None when the pool is empty"""
+        if self.size <= 0:
+            return None
+        self._ensure_started(base_url)
+        entry = None
+        while entry is None:
+            try:
+                created, entry = self.entries.get_nowait()
+            except queue.Empty:
+                break
+            if self.max_age is not None and time.monotonic() - created > self.max_age:
+                self.expired += 1
+                entry = None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        self.wakeup.set()
+        return entry
+
+    def _ensure_started(self, base_url):
+        with self.lock:
+            if base_url != self.base_url:
+                # Entries embed the game URL, so a new host invalidates them
+                self.base_url = base_url
+                self._drain()
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._refill_loop, name='qr-pool', daemon=True)
+                self.thread.start()
+
+    def _drain(self):
+        while True:
+            try:
+                self.entries.get_nowait()
+            except queue.Empty:
+                return
+
+    def _drop_expired(self):
+        if self.max_age is None:
+            return
+        for _ in range(self.entries.qsize()):
+            try:
+                created, entry = self.entries.get_nowait()
+            except queue.Empty:
+                return
+            if time.monotonic() - created > self.max_age:
+                self.expired += 1
+            else:
+                self.entries.put((created, entry))
+
+    def _refill_loop(self):
+        while True:
+            self._drop_expired()
+            while self.entries.qsize() < self.size:
+                base_url = self.base_url
+                start = time.perf_counter()
+                entry = self.make_entry(base_url)
+                elapsed = (time.perf_counter() - start) * 1000
+                if entry is None:
+                    self.refill_failures += 1
+                    time.sleep(1)
+                    continue
+                if base_url == self.base_url:
+                    self.entries.put((time.monotonic(), entry))
+                self.refills += 1
+                self.last_refill_ms = elapsed
+                self.total_refill_ms += elapsed
+            # Wake up by max_age at the latest to replace entries that went stale while idle
+            self.wakeup.wait(self.max_age)
+            self.wakeup.clear()
+
+    def stats(self):
+        return {
+            'depth': self.entries.qsize(),
+            'target_depth': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'refills': self.refills,
+            'refill_failures': self.refill_failures,
+            'expired': self.expired,
+            'last_refill_ms': round(self.last_refill_ms, 2),
+            'avg_refill_ms': round(self.total_refill_ms / self.refills, 2) if self.refills else 0.0
+        }
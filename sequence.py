@@ -0,0 +1,70 @@
+"""Game sequence numbers shared by every gunicorn worker.
+
+Sequence numbers come from one atomic counter: INCRBY in the game store,
+or a lock-protected file when SEQUENCE_FILE is set (single-host
+deployments). Each worker reserves SEQUENCE_BLOCK_SIZE numbers at a time,
+so creating a game only costs a counter round trip once per block.
+Numbers are never handed out twice, and rotation continues across restarts.
+"""
+
+import fcntl
+import os
+import threading
+
+SEQUENCE_KEY = 'GAME_SEQUENCE'
+SEQUENCE_BLOCK_SIZE = int(os.getenv('SEQUENCE_BLOCK_SIZE', '20'))
+SEQUENCE_FILE = os.getenv('SEQUENCE_FILE')
+
+
+class FileCounter:
+    """Integer counter in a file, incremented under an exclusive flock"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def incr(self, key, amount=1):
+        # key is accepted for GameStore.incr compatibility; the file holds one counter
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.read(fd, 32).strip()
+            value = (int(raw) if raw else 0) + amount
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, str(value).encode())
+            os.fsync(fd)
+            return value
+        finally:
+            os.close(fd)
+
+
+class SequenceAllocator:
+    """Hands out 1-based sequence numbers from blocks reserved on a shared counter
+
+    incr is any callable with GameStore.incr's (key, amount) signature.
+    """
+
+    def __init__(self, incr, key=SEQUENCE_KEY, block_size=SEQUENCE_BLOCK_SIZE):
+        self.incr = incr
+        self.key = key
+        self.block_size = max(1, block_size)
+        self.lock = threading.Lock()
+        self.next_value = 1
+        self.block_end = 0
+
+    def next(self):
+        with self.lock:
+            if self.next_value > self.block_end:
+                self.block_end = self.incr(self.key, self.block_size)
+                self.next_value = self.block_end - self.block_size + 1
+            value = self.next_value
+            self.next_value += 1
+            return value
+
+    def reserve(self, count):
+        """Take count consecutive numbers straight from the counter (bulk minting); returns the first"""
+        return self.incr(self.key, count) - count + 1
+
+    def reserved(self):
+        """Highest sequence number reserved by any worker (one counter round trip)"""
+        return self.incr(self.key, 0)
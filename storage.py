@@ -0,0 +1,560 @@
+"""Game storage drivers.
+
+Every driver implements the GameStore interface, and get_store() picks one
+from the GAME_STORE setting:
+
+    memory   in-process dict (tests, single-worker dev, and the outage fallback)
+    redis    native Redis protocol, e.g. a local redis-server (REDIS_URL)
+    upstash  Upstash REST API over a pooled keep-alive session (default)
+
+Values are JSON-compatible dicts. The native driver stores them as msgpack
+rather than JSON text, so records are smaller and cheaper to encode.
+"""
+
+import copy
+import json
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import redis
+except ImportError:  # only needed for GAME_STORE=redis
+    redis = None
+
+try:
+    import msgpack
+except ImportError:  # only needed for GAME_STORE=redis
+    msgpack = None
+
+GAME_STORE = os.getenv('GAME_STORE', 'upstash')
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+STORAGE_POOL_SIZE = int(os.getenv('STORAGE_POOL_SIZE', '10'))
+STORAGE_TIMEOUT = float(os.getenv('STORAGE_TIMEOUT', '5'))
+
+
+class StorageError(Exception):
+    """Raised when a storage backend returns an error instead of a result"""
+
+
+def apply_guess(game, guess):
+    """Record a guess on an active game in place; shared by every driver
+
+    Returns the submit_guess result dict.
+    """
+    if game.get('status') != 'active':
+        return {'applied': False, 'status': game.get('status'), 'answer': None}
+    game['guess'] = guess
+    attempts = game.get('attempts')
+    if attempts is None:
+        # Letter puzzle: the one guess decides it
+        game['status'] = 'won' if guess == game['answer'] else 'lost'
+        return {'applied': True, 'status': game['status'], 'answer': game['answer']}
+    # Classic Wordle: lost once max_attempts guesses have missed
+    attempts.append(guess)
+    if guess == game['answer']:
+        game['status'] = 'won'
+    elif len(attempts) >= game['max_attempts']:
+        game['status'] = 'lost'
+    return {'applied': True, 'status': game['status'], 'answer': game['answer'], 'attempts': list(attempts)}
+
+
+# Server-side equivalent of apply_guess for the REST driver: one EVAL round trip.
+# ARGV[2] is the new TTL for KEYS[1] and any other KEYS ('' for no expiry).
+SUBMIT_GUESS_SCRIPT = """
+local raw = redis.call('GET', KEYS[1])
+if not raw then return nil end
+local game = cjson.decode(raw)
+if game['status'] ~= 'active' then
+    return cjson.encode({applied = false, status = game['status']})
+end
+game['guess'] = ARGV[1]
+if game['attempts'] then
+    table.insert(game['attempts'], ARGV[1])
+    if ARGV[1] == game['answer'] then game['status'] = 'won'
+    elseif #game['attempts'] >= tonumber(game['max_attempts']) then game['status'] = 'lost' end
+elseif ARGV[1] == game['answer'] then game['status'] = 'won' else game['status'] = 'lost' end
+if ARGV[2] ~= '' then
+    redis.call('SET', KEYS[1], cjson.encode(game), 'EX', ARGV[2])
+    for i = 2, #KEYS do redis.call('EXPIRE', KEYS[i], ARGV[2]) end
+else
+    redis.call('SET', KEYS[1], cjson.encode(game))
+end
+return cjson.encode({applied = true, status = game['status'], answer = game['answer'], attempts = game['attempts']})
+"""
+
+
+class GameStore(ABC):
+    """Interface shared by every storage driver - a driver missing a method can't be created"""
+
+    name = 'base'
+
+    @abstractmethod
+    def get(self, key):
+        """Stored value for key, or None"""
+
+    @abstractmethod
+    def set(self, key, value, ttl=None):
+        """Store value under key, expiring after ttl seconds if given; True on success"""
+
+    @abstractmethod
+    def delete(self, key):
+        """Remove key, returning True if it existed"""
+
+    @abstractmethod
+    def expire(self, key, ttl):
+        """Expire key after ttl seconds, returning False if it doesn't exist"""
+
+    @abstractmethod
+    def submit_guess(self, key, guess, ttl=None, expire_keys=()):
+        """Atomically record a guess if the game is still active
+
+        When applied, key and expire_keys are set to expire after ttl seconds.
+        Returns None for a missing game, otherwise a dict with 'applied',
+        'status' and (when applied) the 'answer'.
+        """
+
+    @abstractmethod
+    def incr(self, key, amount=1):
+        """Atomically add amount to an integer counter, returning the new value"""
+
+    def incr_many(self, amounts, ttls=None):
+        """Add to several counters ({key: amount}) in as few round trips as possible
+
+        Keys listed in ttls ({key: seconds}) are set to expire after that long.
+        Returns the new values in order.
+        """
+        values = [self.incr(key, amount) for key, amount in amounts.items()]
+        for key, ttl in (ttls or {}).items():
+            self.expire(key, ttl)
+        return values
+
+    def get_counts(self, keys):
+        """Current values of several counters, 0 for missing ones"""
+        return [int(self.incr(key, 0)) for key in keys]
+
+    @abstractmethod
+    def publish(self, channel, message):
+        """Broadcast a string message to every listener on channel"""
+
+    @abstractmethod
+    def listen(self, channel):
+        """Blocking generator of messages published on channel
+
+        Yields None once the subscription is live, then each message string.
+        Raises when the connection drops; callers reconnect.
+        """
+
+    def get_many(self, keys):
+        """Values for several keys, in order, in as few round trips as possible"""
+        return [self.get(key) for key in keys]
+
+    def set_many(self, items, ttl=None, expire_keys=()):
+        """Store a {key: value} mapping in as few round trips as possible
+
+        With a ttl, expire_keys (already stored, left unchanged) are also set
+        to expire after ttl seconds, in the same round trip.
+        """
+        saved = all(self.set(key, value, ttl) for key, value in items.items())
+        for key in expire_keys if ttl else ():
+            self.expire(key, ttl)
+        return saved
+
+
+class MemoryStore(GameStore):
+    """Dict-backed store; values are copied in and out like a real backend
+
+    Keys set with a ttl expire as they would in Redis. With max_keys set, the
+    least recently used keys are evicted beyond that many, so the store stays
+    bounded however long it is written to.
+    """
+
+    name = 'memory'
+
+    def __init__(self, max_keys=None):
+        self.data = OrderedDict()  # least recently used first
+        self.expiry = {}  # key -> time.monotonic() deadline
+        self.max_keys = max_keys
+        self.evictions = 0
+        self.writes = 0
+        self.lock = threading.Lock()
+        self.listeners = {}  # channel -> list of queues, in-process only
+
+    # The helpers below expect self.lock to be held
+    def _live(self, key):
+        """Value for key if present and unexpired, marking it recently used"""
+        deadline = self.expiry.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            del self.data[key]
+            del self.expiry[key]
+            return None
+        if key in self.data:
+            self.data.move_to_end(key)
+        return self.data.get(key)
+
+    def _store(self, key, value, ttl=None):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if ttl:
+            self.expiry[key] = time.monotonic() + ttl
+        else:
+            self.expiry.pop(key, None)
+        self.writes += 1
+        if self.writes % 1000 == 0:
+            self._purge_expired()
+        while self.max_keys is not None and len(self.data) > self.max_keys:
+            evicted, _ = self.data.popitem(last=False)
+            self.expiry.pop(evicted, None)
+            self.evictions += 1
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        for key in [k for k, deadline in self.expiry.items() if deadline <= now]:
+            del self.data[key]
+            del self.expiry[key]
+
+    def get(self, key):
+        with self.lock:
+            value = self._live(key)
+        return copy.deepcopy(value)
+
+    def set(self, key, value, ttl=None):
+        value = copy.deepcopy(value)
+        with self.lock:
+            self._store(key, value, ttl)
+        return True
+
+    def delete(self, key):
+        with self.lock:
+            present = self._live(key) is not None
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+            return present
+
+    def expire(self, key, ttl):
+        with self.lock:
+            if self._live(key) is None:
+                return False
+            self.expiry[key] = time.monotonic() + ttl
+            return True
+
+    def ttl(self, key):
+        """Seconds until key expires, or None if it has no expiry or doesn't exist"""
+        with self.lock:
+            if self._live(key) is None or key not in self.expiry:
+                return None
+            return max(0.0, self.expiry[key] - time.monotonic())
+
+    def submit_guess(self, key, guess, ttl=None, expire_keys=()):
+        with self.lock:
+            game = self._live(key)
+            if game is None:
+                return None
+            result = apply_guess(game, guess)
+            if result['applied']:
+                self._store(key, game, ttl)
+                for other in expire_keys:
+                    if ttl and self._live(other) is not None:
+                        self.expiry[other] = time.monotonic() + ttl
+            return result
+
+    def incr(self, key, amount=1):
+        # Like Redis INCR, keeps any expiry already on the key
+        with self.lock:
+            value = int(self._live(key) or 0) + amount
+            deadline = self.expiry.get(key)
+            self._store(key, value)
+            if deadline is not None:
+                self.expiry[key] = deadline
+            return value
+
+    def incr_many(self, amounts, ttls=None):
+        values = [self.incr(key, amount) for key, amount in amounts.items()]
+        for key, ttl in (ttls or {}).items():
+            self.expire(key, ttl)
+        return values
+
+    def get_counts(self, keys):
+        with self.lock:
+            return [int(self._live(key) or 0) for key in keys]
+
+    def publish(self, channel, message):
+        with self.lock:
+            listeners = list(self.listeners.get(channel, ()))
+        for q in listeners:
+            q.put(message)
+        return len(listeners)
+
+    def listen(self, channel):
+        q = queue.Queue()
+        with self.lock:
+            self.listeners.setdefault(channel, []).append(q)
+        try:
+            yield None
+            while True:
+                yield q.get()
+        finally:
+            with self.lock:
+                self.listeners[channel].remove(q)
+
+    def values(self, prefix=''):
+        """Snapshot of unexpired values whose key starts with prefix"""
+        now = time.monotonic()
+        with self.lock:
+            return [v for k, v in self.data.items()
+                    if k.startswith(prefix) and self.expiry.get(k, now + 1) > now]
+
+    def stats(self):
+        return {'keys': len(self.data), 'max_keys': self.max_keys, 'evictions': self.evictions}
+
+
+class RedisStore(GameStore):
+    """Native-protocol Redis driver with msgpack-encoded values"""
+
+    name = 'redis'
+
+    def __init__(self, url=REDIS_URL, pool_size=STORAGE_POOL_SIZE, timeout=STORAGE_TIMEOUT):
+        if redis is None or msgpack is None:
+            raise StorageError("GAME_STORE=redis needs the 'redis' and 'msgpack' packages")
+        self.client = redis.Redis.from_url(
+            url, max_connections=pool_size,
+            socket_timeout=timeout, socket_connect_timeout=timeout)
+
+    @staticmethod
+    def encode(value):
+        return msgpack.packb(value, use_bin_type=True)
+
+    @staticmethod
+    def decode(raw):
+        return msgpack.unpackb(raw, raw=False) if raw is not None else None
+
+    def get(self, key):
+        return self.decode(self.client.get(key))
+
+    def set(self, key, value, ttl=None):
+        return bool(self.client.set(key, self.encode(value), ex=ttl))
+
+    def delete(self, key):
+        return bool(self.client.delete(key))
+
+    def expire(self, key, ttl):
+        return bool(self.client.expire(key, ttl))
+
+    def submit_guess(self, key, guess, ttl=None, expire_keys=()):
+        # WATCH/MULTI: redis-py retries the transaction if another guess lands first
+        def transaction(pipe):
+            game = self.decode(pipe.get(key))
+            if game is None:
+                return None
+            result = apply_guess(game, guess)
+            if result['applied']:
+                pipe.multi()
+                pipe.set(key, self.encode(game), ex=ttl)
+                for other in expire_keys if ttl else ():
+                    pipe.expire(other, ttl)
+            return result
+
+        return self.client.transaction(transaction, key, value_from_callable=True)
+
+    def incr(self, key, amount=1):
+        return int(self.client.incrby(key, amount))
+
+    def incr_many(self, amounts, ttls=None):
+        pipe = self.client.pipeline(transaction=False)
+        for key, amount in amounts.items():
+            pipe.incrby(key, amount)
+        for key, ttl in (ttls or {}).items():
+            pipe.expire(key, ttl)
+        return [int(v) for v in pipe.execute()[:len(amounts)]]
+
+    def get_counts(self, keys):
+        # Counters hold plain integers, not msgpack
+        if not keys:
+            return []
+        return [int(raw or 0) for raw in self.client.mget(keys)]
+
+    def publish(self, channel, message):
+        return self.client.publish(channel, message)
+
+    def listen(self, channel):
+        pubsub = self.client.pubsub()
+        pubsub.subscribe(channel)
+        try:
+            for item in pubsub.listen():
+                if item['type'] == 'subscribe':
+                    yield None
+                elif item['type'] == 'message':
+                    yield item['data'].decode()
+        finally:
+            pubsub.close()
+
+    def get_many(self, keys):
+        if not keys:
+            return []
+        return [self.decode(raw) for raw in self.client.mget(keys)]
+
+    def set_many(self, items, ttl=None, expire_keys=()):
+        if not items:
+            return True
+        if ttl is None:
+            return bool(self.client.mset({k: self.encode(v) for k, v in items.items()}))
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(key, self.encode(value), ex=ttl)
+        for key in expire_keys:
+            pipe.expire(key, ttl)
+        return all(pipe.execute()[:len(items)])
+
+
+class Pipeline:
+    """Collects commands and sends them to Upstash in one request"""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def command(self, *args):
+        self.commands.append([str(arg) for arg in args])
+        return self
+
+    def get(self, key):
+        return self.command('GET', key)
+
+    def set(self, key, value, ttl=None):
+        if ttl:
+            return self.command('SET', key, json.dumps(value), 'EX', int(ttl))
+        return self.command('SET', key, json.dumps(value))
+
+    def execute(self):
+        """Run every queued command, returning their results in order"""
+        if not self.commands:
+            return []
+        results = self.client.post('/pipeline', self.commands)
+        self.commands = []
+        errors = [r['error'] for r in results if 'error' in r]
+        if errors:
+            raise StorageError(errors[0])
+        return [r.get('result') for r in results]
+
+
+class UpstashClient(GameStore):
+    """Upstash REST driver over a keep-alive session; safe to share between threads"""
+
+    name = 'upstash'
+
+    def __init__(self, url, token, pool_size=STORAGE_POOL_SIZE, timeout=STORAGE_TIMEOUT):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f"Bearer {token}"
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def post(self, path, body):
+        response = self.session.post(f"{self.url}{path}", json=body, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def command(self, *args):
+        """Run a single Redis command, e.g. command('INCR', 'counter')"""
+        result = self.post('', [str(arg) for arg in args])
+        if 'error' in result:
+            raise StorageError(result['error'])
+        return result.get('result')
+
+    def pipeline(self):
+        return Pipeline(self)
+
+    def get(self, key):
+        result = self.command('GET', key)
+        return json.loads(result) if result else None
+
+    def set(self, key, value, ttl=None):
+        if ttl:
+            return self.command('SET', key, json.dumps(value), 'EX', int(ttl)) == 'OK'
+        return self.command('SET', key, json.dumps(value)) == 'OK'
+
+    def delete(self, key):
+        return bool(self.command('DEL', key))
+
+    def expire(self, key, ttl):
+        return bool(self.command('EXPIRE', key, int(ttl)))
+
+    def submit_guess(self, key, guess, ttl=None, expire_keys=()):
+        result = self.command('EVAL', SUBMIT_GUESS_SCRIPT, 1 + len(expire_keys), key, *expire_keys,
+                              guess, int(ttl) if ttl else '')
+        if result is None:
+            return None
+        result = json.loads(result)
+        result.setdefault('answer', None)
+        return result
+
+    def incr(self, key, amount=1):
+        return int(self.command('INCRBY', key, amount))
+
+    def incr_many(self, amounts, ttls=None):
+        pipe = self.pipeline()
+        for key, amount in amounts.items():
+            pipe.command('INCRBY', key, amount)
+        for key, ttl in (ttls or {}).items():
+            pipe.command('EXPIRE', key, int(ttl))
+        return [int(v) for v in pipe.execute()[:len(amounts)]]
+
+    def get_counts(self, keys):
+        if not keys:
+            return []
+        return [int(raw or 0) for raw in self.command('MGET', *keys)]
+
+    def publish(self, channel, message):
+        return self.command('PUBLISH', channel, message)
+
+    def listen(self, channel):
+        # Upstash streams subscriptions as server-sent events:
+        #   data: subscribe,<channel>,1
+        #   data: message,<channel>,<payload>
+        response = self.session.post(
+            f"{self.url}/subscribe/{channel}", headers={'Accept': 'text/event-stream'},
+            stream=True, timeout=(self.timeout, None))
+        response.raise_for_status()
+        with response:
+            # chunk_size=1 so each event is handled as it arrives, not once 512 bytes buffer up
+            for line in response.iter_lines(chunk_size=1, decode_unicode=True):
+                if not line or not line.startswith('data: '):
+                    continue
+                kind, _, payload = line[len('data: '):].split(',', 2)
+                if kind == 'subscribe':
+                    yield None
+                elif kind == 'message':
+                    yield payload
+        raise StorageError(f"Subscription to {channel} closed")
+
+    def get_many(self, keys):
+        if not keys:
+            return []
+        return [json.loads(raw) if raw else None for raw in self.command('MGET', *keys)]
+
+    def set_many(self, items, ttl=None, expire_keys=()):
+        pipe = self.pipeline()
+        for key, value in items.items():
+            pipe.set(key, value, ttl)
+        for key in expire_keys if ttl else ():
+            pipe.command('EXPIRE', key, int(ttl))
+        return all(result == 'OK' for result in pipe.execute()[:len(items)])
+
+
+def get_store(driver=GAME_STORE, **options):
+    """Build the storage driver named by GAME_STORE"""
+    if driver == 'memory':
+        return MemoryStore()
+    if driver == 'redis':
+        return RedisStore(options.get('url', REDIS_URL))
+    if driver == 'upstash':
+        return UpstashClient(options['url'], options['token'])
+    raise StorageError(f"Unknown GAME_STORE driver: {driver!r}")
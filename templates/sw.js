@@ -0,0 +1,72 @@
+// Service worker for the customer game pages, served by /sw.js so its scope is the whole site.
+// Fingerprinted images under /static/dist never change, so they are served from the cache
+// after the first visit; the game page itself is per game and always comes from the network
+// (navigation preload starts that request while the worker boots), with the last copy kept
+// for when the connection drops.
+const ASSET_CACHE = 'qword-assets-{{ version }}';
+const PAGE_CACHE = 'qword-pages';
+const DIST_PREFIX = '{{ dist_prefix }}';
+
+self.addEventListener('install', () => self.skipWaiting());
+
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        // Images from an older build are never requested again
+        for (const name of await caches.keys()) {
+            if (name.startsWith('qword-assets-') && name !== ASSET_CACHE) {
+                await caches.delete(name);
+            }
+        }
+        if (self.registration.navigationPreload) {
+            await self.registration.navigationPreload.enable();
+        }
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') {
+        return;
+    }
+    const url = new URL(request.url);
+    if (url.origin === location.origin && url.pathname.startsWith(DIST_PREFIX)) {
+        event.respondWith(cacheFirst(request));
+    } else if (request.mode === 'navigate' && url.pathname.startsWith('/game/')) {
+        event.respondWith(networkFirst(event));
+    }
+});
+
+async function cacheFirst(request) {
+    const cache = await caches.open(ASSET_CACHE);
+    const cached = await cache.match(request);
+    if (cached) {
+        return cached;
+    }
+    const response = await fetch(request);
+    if (response.ok) {
+        cache.put(request, response.clone());
+    }
+    return response;
+}
+
+async function networkFirst(event) {
+    const cache = await caches.open(PAGE_CACHE);
+    try {
+        const response = (await event.preloadResponse) || await fetch(event.request);
+        if (response.ok) {
+            // One page is enough to open offline - keep only the latest game
+            for (const key of await cache.keys()) {
+                await cache.delete(key);
+            }
+            await cache.put(event.request, response.clone());
+        }
+        return response;
+    } catch (error) {
+        const cached = await cache.match(event.request);
+        if (cached) {
+            return cached;
+        }
+        throw error;
+    }
+}
@@ -1,190 +1,195 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify
+from flask import Flask, render_template, request, redirect, url_for, jsonify, g, Response
 import datetime
+import logging
 import os
-import traceback
+import threading
+import time
 import random
-import requests
-import json
 import uuid
 import qrcode
 import io
 import base64
-from collections import Counter
+import hashlib
+import hmac
+import itertools
+from functools import lru_cache, wraps
+from dictionary import Dictionary, letter_vector, letter_count
+from storage import MemoryStore, StorageError, get_store
+from failover import FailoverStore
+from qr_pool import QRPool
+from access_notifier import AccessNotifier
+from counters import event_increments, read_totals, read_hourly, read_puzzles
+from game_cache import (GameCache, game_key, state_key, split_game, merge_game,
+                        GAME_TTL_ACTIVE, GAME_TTL_FINISHED)
+from guess_log import GuessLog, guess_event
+from guess_stats import read_stats, pair_summary, top_wrong_guesses
+from sequence import FileCounter, SequenceAllocator, SEQUENCE_FILE
+from assets import DIST_DIR, load_manifest
+from catalog import Catalog, encode_catalog, load_word_list, load_answers, load_letter_puzzles, load_catalog, update_catalog
+from feedback import load_feedback, score as wordle_score, marks, count_remaining
+from logs import setup_logging, log_stats
+from metrics import REQUEST_LATENCY, STAGE_LATENCY, render as render_metrics, start_flusher as start_metrics_flusher
+
+# Queued, levelled logging instead of print() on the request path (LOG_LEVEL, LOG_FORMAT, LOG_SAMPLE)
+setup_logging()
+log = logging.getLogger('cafe.app')
+game_log = logging.getLogger('cafe.games')
+storage_log = logging.getLogger('cafe.storage')
 
 # Initialize the Flask app
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
 
+@app.before_request
+def start_request_timer():
+    start_metrics_flusher()
+    check_catalog_sources()
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def observe_request_latency(response):
+    # Labelled by route rule, not path, so game ids don't become label values
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_LATENCY.observe((route, request.method, response.status_code), time.perf_counter() - start)
+    return response
+
+# Display-sized, fingerprinted images built by 'python assets.py' - the originals are served until then
+ASSETS = load_manifest(app.static_folder, app.static_url_path)
+app.add_template_global(ASSETS.picture, 'asset')
+
+@app.after_request
+def cache_static_assets(response):
+    # A fingerprinted file's name changes with its content, so browsers never need to revalidate it
+    if request.endpoint == 'static' and response.status_code == 200 and \
+            request.view_args.get('filename', '').startswith(f'{DIST_DIR}/'):
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+# Admin pages use HTTP basic auth - they stay locked until ADMIN_PASSWORD is set
+ADMIN_USER = os.getenv('ADMIN_USER', 'admin')
+ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD', '')
+
+def require_admin(view):
+    """Decorator: answer 401 unless the request carries the admin credentials"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        auth = request.authorization
+        if not (ADMIN_PASSWORD and auth and
+                hmac.compare_digest((auth.username or '').encode(), ADMIN_USER.encode()) and
+                hmac.compare_digest((auth.password or '').encode(), ADMIN_PASSWORD.encode())):
+            return Response("Admin login required", 401, {'WWW-Authenticate': 'Basic realm="QWord admin"'})
+        return view(*args, **kwargs)
+    return wrapper
+
 # Load word lists at startup
 WORD_LIST = []
 ANSWER_LIST = []
 
 # Upstash Redis configuration
-UPSTASH_REDIS_URL = "https://ample-chamois-15026.upstash.io"
-UPSTASH_REDIS_TOKEN = "ATqyAAIjcDFhZjU5NjI5NDdhZjA0ZDE5YjIwM2RiMTNjM2Q5M2VjN7AxMA"
+UPSTASH_REDIS_URL = os.getenv('UPSTASH_REDIS_URL', "https://ample-chamois-15026.upstash.io")
+UPSTASH_REDIS_TOKEN = os.getenv('UPSTASH_REDIS_TOKEN', "ATqyAAIjcDFhZjU5NjI5NDdhZjA0ZDE5YjIwM2RiMTNjM2Q5M2VjN7AxMA")
+
+# In-memory storage as fallback - capped, so a long outage can't exhaust worker memory
+FALLBACK_MAX_KEYS = int(os.getenv('FALLBACK_MAX_KEYS', '10000'))
+FALLBACK_STORE = MemoryStore(max_keys=FALLBACK_MAX_KEYS)
 
-# In-memory storage as fallback
-GAMES_STORAGE = {}
-REDEMPTION_STORAGE = {}
+# Storage driver chosen by GAME_STORE (upstash, redis or memory) - one connection pool per worker.
+# The circuit breaker switches to FALLBACK_STORE as soon as it is failing instead of waiting on timeouts.
+STORAGE = FailoverStore(get_store(url=UPSTASH_REDIS_URL, token=UPSTASH_REDIS_TOKEN), FALLBACK_STORE)
 
 # Puzzle system variables
 LETTER_PUZZLES = []
+CATALOG = None  # Puzzle table + flat (puzzle, answer) index behind EXPANDED_GAMES
 EXPANDED_GAMES = []  # Will hold all possible games from all puzzles
-CURRENT_GAME_INDEX = 0
 
-def load_word_list(file_path='words.txt'):
-    try:
-        with open(file_path, 'r') as f:
-            words = [line.strip().upper() for line in f if len(line.strip()) == 5 and line.strip().isalpha()]
-            print(f"Loaded {len(words)} valid words from {file_path}")
-            return words
-    except FileNotFoundError:
-        print(f"ERROR: {file_path} not found!")
-        return []
-    except Exception as e:
-        print(f"ERROR loading {file_path}: {str(e)}")
-        return []
-
-def load_answers(file_path='answers.txt'):
-    try:
-        with open(file_path, 'r') as f:
-            answers = [line.strip().upper() for line in f if len(line.strip()) == 5 and line.strip().isalpha()]
-            print(f"Loaded {len(answers)} answer words from {file_path}")
-            return answers
-    except FileNotFoundError:
-        print(f"ERROR: {file_path} not found!")
-        return []
-    except Exception as e:
-        print(f"ERROR loading {file_path}: {str(e)}")
-        return []
-
-def load_letter_puzzles(file_path='letter_puzzles.txt'):
-    """Load letter puzzles from text file"""
-    puzzles = []
-    try:
-        with open(file_path, 'r') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                
-                # Skip empty lines and comments
-                if not line or line.startswith('#'):
-                    continue
-                
-                try:
-                    # Parse format: FEATURED_LETTER|ANSWER|AVAILABLE_LETTERS
-                    parts = line.split('|')
-                    if len(parts) != 3:
-                        print(f"WARNING: Invalid format on line {line_num}: {line}")
-                        continue
-                    
-                    featured_letter = parts[0].strip().upper()
-                    answer = parts[1].strip().upper()
-                    available_letters = [letter.strip().upper() for letter in parts[2].split(',')]
-                    
-                    # Basic validation
-                    if len(answer) != 5 or len(available_letters) != 12:
-                        print(f"WARNING: Invalid puzzle format on line {line_num}")
-                        continue
-                    
-                    puzzle = {
-                        "available_letters": available_letters,
-                        "featured_letter": featured_letter,
-                        "answer": answer
-                    }
-                    puzzles.append(puzzle)
-                    
-                except Exception as e:
-                    print(f"ERROR parsing line {line_num}: {line} - {str(e)}")
-                    continue
-        
-        print(f"Loaded {len(puzzles)} base puzzles from {file_path}")
-        return puzzles
-        
-    except FileNotFoundError:
-        print(f"ERROR: {file_path} not found!")
-        return []
-    except Exception as e:
-        print(f"ERROR loading puzzles: {str(e)}")
-        return []
+@lru_cache(maxsize=4096)
+def pool_vector(available_letters):
+    """Packed letter-count vector for a tuple of available letters"""
+    return letter_vector(available_letters)
 
 def can_make_word_from_letters(word, available_letters):
     """Check if word can be made from available letters"""
-    available_count = Counter(available_letters)
-    word_count = Counter(word.upper())
-    
-    for letter, needed in word_count.items():
-        if available_count.get(letter, 0) < needed:
-            return False
-    return True
+    return DICTIONARY.can_form(word, pool_vector(tuple(available_letters)))
+
+@lru_cache(maxsize=4096)
+def valid_guesses(dictionary, available_letters, featured_letter):
+    """Every valid guess for a letter pool (a tuple) and featured letter
+
+    Keyed on the dictionary too, so a request racing a reload can't leave
+    old-dictionary results behind for the new one.
+    """
+    return [dictionary.words[i] for i in dictionary.matching_words(available_letters, featured_letter)]
+
+def guess_hash(salt, word):
+    """32-bit FNV-1a of salt + word - the page's guessHash() must match it"""
+    h = 0x811c9dc5
+    for byte in (salt + word).encode():
+        h = ((h ^ byte) * 0x01000193) & 0xffffffff
+    return h
+
+def guess_bundle(game_id, game_data):
+    """Salted hashes of every valid guess, so the page can turn away non-words locally
+
+    The answer is one hash among all the valid words, so the bundle says
+    nothing about it; the server still validates the real submission.
+    """
+    words = valid_guesses(DICTIONARY, tuple(game_data['available_letters']), game_data['featured_letter'])
+    return {'salt': game_id, 'hashes': sorted({guess_hash(game_id, word) for word in words})}
+
+def client_game_data(game_data):
+    """The game fields the play page needs - never the answer"""
+    return {field: game_data[field] for field in ('status', 'available_letters', 'featured_letter')}
 
 def expand_puzzles_to_all_answers():
     """Convert each puzzle into multiple games - one for each valid answer"""
-    global EXPANDED_GAMES
+    global CATALOG, EXPANDED_GAMES
     
     if not LETTER_PUZZLES or not WORD_LIST:
-        print("ERROR: Puzzles or word list not loaded!")
+        log.error("Puzzles or word list not loaded")
         return
     
-    EXPANDED_GAMES = []
+    log.info("Expanding puzzles to find all valid answers")
     
-    print("Expanding puzzles to find all valid answers...")
+    # Same puzzle table + (puzzle, answer) index as catalog.bin, built in memory
+    CATALOG = Catalog(data=encode_catalog(DICTIONARY, LETTER_PUZZLES))
+    EXPANDED_GAMES = CATALOG.games
     
-    for puzzle_num, puzzle in enumerate(LETTER_PUZZLES, 1):
-        featured_letter = puzzle['featured_letter']
-        available_letters = puzzle['available_letters']
-        original_answer = puzzle['answer']
-        
-        # Find ALL valid words that can be made with featured letter
-        valid_answers = []
-        
-        for word in WORD_LIST:
-            word = word.upper()
-            # Must use featured letter and be makeable from available letters
-            if (featured_letter in word and 
-                can_make_word_from_letters(word, available_letters)):
-                valid_answers.append(word)
-        
-        # Create a game for each valid answer
-        for answer_num, answer in enumerate(valid_answers, 1):
-            game = {
-                'puzzle_number': puzzle_num,
-                'answer_number': answer_num,
-                'total_answers_in_puzzle': len(valid_answers),
-                'featured_letter': featured_letter,
-                'available_letters': available_letters,
-                'answer': answer,
-                'original_answer': original_answer  # Keep track of original
-            }
-            EXPANDED_GAMES.append(game)
-        
-        print(f"Puzzle {puzzle_num}: Found {len(valid_answers)} valid answers")
-        if len(valid_answers) > 0:
-            print(f"  Featured '{featured_letter}': {', '.join(valid_answers[:5])}{'...' if len(valid_answers) > 5 else ''}")
+    for puzzle_idx in range(CATALOG.puzzle_count):
+        _, answer_count, featured, _, _ = CATALOG.puzzle_record(puzzle_idx)
+        log.debug("Puzzle expanded", extra={'puzzle': puzzle_idx + 1, 'answers': answer_count,
+                                            'featured': featured.decode()})
     
-    print(f"\n✅ EXPANDED TO {len(EXPANDED_GAMES)} TOTAL GAMES!")
-    print(f"🎯 From {len(LETTER_PUZZLES)} puzzles to {len(EXPANDED_GAMES)} unique games")
+    log.info("Expanded puzzles", extra={'puzzles': len(LETTER_PUZZLES), 'games': len(EXPANDED_GAMES)})
+
+# Prefer the prebuilt catalog (python catalog.py); the text files are the fallback
+CATALOG = load_catalog(sources=['words.txt', 'letter_puzzles.txt'])
+if CATALOG:
+    log.info("Loaded catalog", extra={'words': CATALOG.word_count, 'puzzles': CATALOG.puzzle_count,
+                                      'games': CATALOG.game_count})
 
 # Load word lists once at startup
-print("Loading word lists...")
-WORD_LIST = load_word_list()
+WORD_LIST = CATALOG.words() if CATALOG else load_word_list()
 ANSWER_LIST = load_answers()
 
 if not WORD_LIST:
-    print("WARNING: No valid words loaded - using fallback words")
+    log.warning("No valid words loaded - using fallback words")
     WORD_LIST = ["HELLO", "WORLD", "FLASK", "GAMES", "WORDS", "QUICK", "BROWN", "JUMPS", "STORE", "STARE", "STEAM", "STEAL", "TIGER", "CHAIR", "HOUSE", "BREAD", "MAGIC", "PLANT", "LIGHT", "SMILE"]
 
 if not ANSWER_LIST:
-    print("WARNING: No answer words loaded - using fallback answers")
+    log.warning("No answer words loaded - using fallback answers")
     ANSWER_LIST = ["HELLO", "WORLD", "FLASK", "GAMES", "COFFEE"]
 
-print(f"System ready: {len(WORD_LIST)} words, {len(ANSWER_LIST)} answers")
+DICTIONARY = Dictionary(WORD_LIST)
+
+log.info("Word lists ready", extra={'words': len(WORD_LIST), 'answers': len(ANSWER_LIST)})
 
 # Load letter puzzles
-print("Loading letter puzzles...")
-LETTER_PUZZLES = load_letter_puzzles()
+LETTER_PUZZLES = CATALOG.puzzles if CATALOG else load_letter_puzzles()
 
 if not LETTER_PUZZLES:
-    print("WARNING: No puzzles loaded - using fallback puzzles")
+    log.warning("No puzzles loaded - using fallback puzzles")
     LETTER_PUZZLES = [
         {
             "available_letters": ["T", "W", "N", "S", "I", "A", "W", "M", "N", "X", "R", "E"],
@@ -203,131 +208,378 @@ if not LETTER_PUZZLES:
         }
     ]
 
-# Expand puzzles to all possible answers
-expand_puzzles_to_all_answers()
+# Expand puzzles to all possible answers (already done offline when the catalog is present)
+if CATALOG:
+    EXPANDED_GAMES = CATALOG.games
+else:
+    expand_puzzles_to_all_answers()
+
+log.info("Games ready", extra={'puzzles': len(LETTER_PUZZLES), 'games': len(EXPANDED_GAMES)})
+
+# Hot reload: each worker re-reads the word and puzzle files when they change
+# (checked at most every CATALOG_CHECK_INTERVAL seconds, 0 to disable) or on
+# POST /admin/reload, and swaps in the new catalog without a restart
+CATALOG_SOURCES = ('words.txt', 'answers.txt', 'letter_puzzles.txt')
+CATALOG_CHECK_INTERVAL = float(os.getenv('CATALOG_CHECK_INTERVAL', '30'))
+RELOAD_LOCK = threading.Lock()
 
-print(f"Ready with {len(LETTER_PUZZLES)} base puzzles expanded to {len(EXPANDED_GAMES)} total games!")
+def source_mtimes():
+    return {path: os.path.getmtime(path) if os.path.exists(path) else None for path in CATALOG_SOURCES}
 
-# Redis helper functions with fallback to memory
+CATALOG_STATE = {'mtimes': source_mtimes(), 'checked': time.monotonic(), 'last_reload': None}
+
+def reload_catalog(force=False):
+    """Re-read the source files and swap in a catalog that re-expands only what changed
+
+    Requests already holding the old catalog, dictionary or game views finish
+    with them; the next request sees the new ones. The game sequence carries
+    on where it was. Returns the reload stats, or None if nothing changed.
+    """
+    global CATALOG, EXPANDED_GAMES, LETTER_PUZZLES, WORD_LIST, ANSWER_LIST, DICTIONARY, FEEDBACK
+    with RELOAD_LOCK:
+        mtimes = source_mtimes()
+        if not force and mtimes == CATALOG_STATE['mtimes']:
+            return None
+        start = time.perf_counter()
+        words = load_word_list() or WORD_LIST
+        answers = load_answers() or ANSWER_LIST
+        puzzles = load_letter_puzzles()
+        if not puzzles:
+            raise ValueError("letter_puzzles.txt has no puzzles - keeping the current catalog")
+        loaded = time.perf_counter()
+
+        dictionary = DICTIONARY if words == WORD_LIST else Dictionary(words)
+        data, stats = update_catalog(CATALOG, dictionary, puzzles)
+        catalog = Catalog(data=data)
+
+        feedback = FEEDBACK
+        if words != WORD_LIST or answers != ANSWER_LIST:
+            # A stale feedback.bin is not loaded, so Wordle games fall back to direct scoring until it's rebuilt
+            feedback = load_feedback(sources=['answers.txt', 'words.txt'])
+
+        old_dictionary = DICTIONARY
+        CATALOG, EXPANDED_GAMES, LETTER_PUZZLES = catalog, catalog.games, catalog.puzzles
+        WORD_LIST, ANSWER_LIST, DICTIONARY, FEEDBACK = words, answers, dictionary, feedback
+        if dictionary is not old_dictionary:
+            valid_guesses.cache_clear()  # drop the old dictionary's entries (and the references keeping it alive)
+        CATALOG_STATE['mtimes'] = mtimes
+
+        stats.update(answers=len(answers), load_ms=round((loaded - start) * 1000, 1),
+                     rebuild_ms=round((time.perf_counter() - loaded) * 1000, 1),
+                     at=datetime.datetime.now().isoformat())
+        CATALOG_STATE['last_reload'] = stats
+        log.info("Catalog reloaded", extra=stats)
+        return stats
+
+# Classic Wordle mode: feedback for every answer x guess pair, precomputed by 'python feedback.py'.
+# Without a fresh feedback.bin guesses are scored directly - the same results, just slower.
+WORDLE_MAX_ATTEMPTS = int(os.getenv('WORDLE_MAX_ATTEMPTS', '2'))
+FEEDBACK = load_feedback(sources=['answers.txt', 'words.txt'])
+if FEEDBACK:
+    log.info("Loaded feedback table", extra={'answers': FEEDBACK.answer_count, 'guesses': FEEDBACK.guess_count})
+
+def check_catalog_sources():
+    """Start a background reload if a source file changed - a clock read on most requests"""
+    now = time.monotonic()
+    if not CATALOG_CHECK_INTERVAL or now - CATALOG_STATE['checked'] < CATALOG_CHECK_INTERVAL:
+        return
+    CATALOG_STATE['checked'] = now
+    if source_mtimes() != CATALOG_STATE['mtimes'] and not RELOAD_LOCK.locked():
+        threading.Thread(target=reload_catalog_quietly, name='catalog-reload', daemon=True).start()
+
+def reload_catalog_quietly():
+    try:
+        reload_catalog()
+    except Exception as e:
+        log.error("Catalog reload failed", extra={'error': str(e)})
+
+# Storage helper functions with fallback to memory
 def redis_get(key):
     try:
-        response = requests.get(
-            f"{UPSTASH_REDIS_URL}/get/{key}",
-            headers={"Authorization": f"Bearer {UPSTASH_REDIS_TOKEN}"},
-            timeout=5
-        )
-        response.raise_for_status()
-        result = response.json()
-        return json.loads(result["result"]) if result["result"] else None
+        return STORAGE.get(key)
     except Exception as e:
-        print(f"Redis GET error for key {key}: {str(e)} - using memory storage")
-        return GAMES_STORAGE.get(key) or REDEMPTION_STORAGE.get(key)
-
-def redis_set(key, value):
-    try:
-        response = requests.post(
-            f"{UPSTASH_REDIS_URL}/set/{key}",
-            headers={"Authorization": f"Bearer {UPSTASH_REDIS_TOKEN}"},
-            data=json.dumps(value),
-            timeout=5
-        )
-        response.raise_for_status()
-        success = response.json().get("result") == "OK"
+        storage_log.warning("Storage GET failed - using memory storage", extra={'key': key, 'error': str(e)})
+        return FALLBACK_STORE.get(key)
+
+def redis_set(key, value, ttl=None):
+    try:
+        success = STORAGE.set(key, value, ttl)
+        if success:
+            storage_log.debug("Saved", extra={'key': key, 'store': STORAGE.name})
+        return success
+    except Exception as e:
+        storage_log.warning("Storage SET failed - saving to memory", extra={'key': key, 'error': str(e)})
+        return FALLBACK_STORE.set(key, value, ttl)
+
+def redis_get_many(keys):
+    try:
+        return STORAGE.get_many(keys)
+    except Exception as e:
+        storage_log.warning("Storage MGET failed - using memory storage", extra={'keys': keys, 'error': str(e)})
+        return FALLBACK_STORE.get_many(keys)
+
+def redis_set_many(items, ttl=None, expire_keys=()):
+    try:
+        success = STORAGE.set_many(items, ttl, expire_keys)
         if success:
-            print(f"Saved {key} to Redis")
+            storage_log.debug("Saved", extra={'keys': list(items), 'store': STORAGE.name})
         return success
     except Exception as e:
-        print(f"Redis SET error for key {key}: {str(e)} - saving to memory")
-        if key.startswith("GAME_"):
-            GAMES_STORAGE[key] = value
-        elif key.startswith("REDEMPTION_"):
-            REDEMPTION_STORAGE[key] = value
-        return True
-
-def generate_qr_code(data):
-    """Generate QR code and return as base64 encoded image"""
-    try:
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        qr.add_data(data)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-        
-        return base64.b64encode(buffer.getvalue()).decode()
+        storage_log.warning("Storage SET failed - saving to memory", extra={'keys': list(items), 'error': str(e)})
+        return FALLBACK_STORE.set_many(items, ttl, expire_keys)
+
+def redis_submit_guess(key, guess, ttl=None, expire_keys=()):
+    """Atomically record a guess - one round trip, and only one guess can ever win"""
+    try:
+        return STORAGE.submit_guess(key, guess, ttl, expire_keys)
+    except Exception as e:
+        storage_log.warning("Storage submit_guess failed - using memory storage", extra={'key': key, 'error': str(e)})
+        return FALLBACK_STORE.submit_guess(key, guess, ttl, expire_keys)
+
+def redis_incr(key, amount=1):
+    """Atomically bump a shared counter - in the primary store only, so raises while it is down
+
+    A memory fallback counter would start again from 0 and reissue sequence
+    numbers. SEQUENCE serves out its current block instead, and new_game_data
+    then picks numberless random games until the store is back.
+    """
+    try:
+        return STORAGE.incr(key, amount)
+    except Exception as e:
+        storage_log.warning("Storage INCR failed", extra={'key': key, 'error': str(e)})
+        raise
+
+def redis_incr_many(amounts, ttls=None):
+    try:
+        return STORAGE.incr_many(amounts, ttls)
+    except Exception as e:
+        storage_log.warning("Storage INCR failed - using memory storage", extra={'keys': list(amounts), 'error': str(e)})
+        return FALLBACK_STORE.incr_many(amounts, ttls)
+
+def redis_get_counts(keys):
+    try:
+        return STORAGE.get_counts(keys)
+    except Exception as e:
+        storage_log.warning("Storage counter MGET failed - using memory storage", extra={'error': str(e)})
+        return FALLBACK_STORE.get_counts(keys)
+
+def record_event(event, puzzle_number=None):
+    """Count a dashboard event (scans, accesses, wins, losses, ad_clicks) - one round trip"""
+    try:
+        redis_incr_many(*event_increments(event, puzzle_number))
+    except Exception as e:
+        log.error("Error recording event", extra={'event': event, 'error': str(e)})
+
+# Immutable game fields cached per worker; status is always read from storage
+GAME_CACHE = GameCache()
+
+# Append-only guess events for offline per-puzzle analytics (guess_stats.py)
+GUESS_LOG = GuessLog()
+
+# Scan notifications pushed between workers over the store's pub/sub channel
+ACCESS_NOTIFIER = AccessNotifier(STORAGE)
+ACCESS_WAIT_TIMEOUT = 25  # seconds a counter's long-poll is held open
+ACCESS_FALLBACK_POLL = 3  # seconds between storage checks while pub/sub is down
+
+# Game rotation shared by all workers - each worker reserves a block of sequence numbers at a time
+SEQUENCE = SequenceAllocator(FileCounter(SEQUENCE_FILE).incr if SEQUENCE_FILE else redis_incr)
+
+QR_FORMATS = ('png', 'svg', 'bitmap')
+
+# Format the counter device asks for, so the QR pool pre-renders that one
+QR_POOL_FORMAT = os.getenv('QR_POOL_FORMAT', 'bitmap')
+
+def make_qr(data):
+    """Build the QR code for data (version/box/border shared by every output format)"""
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr
+
+def qr_svg(matrix):
+    """Minimal SVG: one stroked path, a relative horizontal segment per run of dark modules"""
+    path = []
+    for y, row in enumerate(matrix):
+        x = 0
+        pen = None  # where the previous segment on this row ended
+        while x < len(row):
+            if row[x]:
+                start = x
+                while x < len(row) and row[x]:
+                    x += 1
+                if pen is None:
+                    path.append(f"M{start} {y}.5h{x - start}")
+                else:
+                    path.append(f"m{start - pen} 0h{x - start}")
+                pen = x
+            else:
+                x += 1
+    size = len(matrix)
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" class="qr-code" '
+            f'shape-rendering="crispEdges"><rect width="{size}" height="{size}" fill="#fff"/>'
+            f'<path stroke="#000" d="{"".join(path)}"/></svg>')
+
+def qr_bitmap(matrix):
+    """Raw module bitmap as 'SIZE:BASE64' - rows packed MSB-first, 1 = dark"""
+    size = len(matrix)
+    bits = bytearray((size * size + 7) // 8)
+    for i, dark in enumerate(cell for row in matrix for cell in row):
+        if dark:
+            bits[i >> 3] |= 0x80 >> (i & 7)
+    return f"{size}:{base64.b64encode(bytes(bits)).decode()}"
+
+def generate_qr_code(data, fmt='png'):
+    """Generate QR code as base64 PNG, SVG markup or a packed module bitmap"""
+    try:
+        with STAGE_LATENCY.time(f"qr_{fmt}"):
+            qr = make_qr(data)
+            
+            if fmt == 'svg':
+                return qr_svg(qr.get_matrix())
+            if fmt == 'bitmap':
+                return qr_bitmap(qr.get_matrix())
+            
+            img = qr.make_image(fill_color="black", back_color="white")
+            buffer = io.BytesIO()
+            img.save(buffer, format='PNG')
+            buffer.seek(0)
+            
+            return base64.b64encode(buffer.getvalue()).decode()
     except Exception as e:
-        print(f"QR code generation error: {str(e)}")
+        log.error("QR code generation error", extra={'error': str(e)})
         return None
 
-def create_game_instance():
-    """Create a game using expanded puzzle system"""
-    global CURRENT_GAME_INDEX
+def new_game_data():
+    """Build the next game record in the rotation (not yet saved)"""
+    # Initialize expanded games if not done
+    if not EXPANDED_GAMES:
+        expand_puzzles_to_all_answers()
+    
+    if not EXPANDED_GAMES:
+        log.error("No expanded games available")
+        return None
     
+    # Claim the next sequence number and get that game from the expanded list
     try:
-        # Initialize expanded games if not done
-        if not EXPANDED_GAMES:
-            expand_puzzles_to_all_answers()
-        
-        if not EXPANDED_GAMES:
-            print("ERROR: No expanded games available!")
+        game_sequence = SEQUENCE.next()
+    except Exception as e:
+        # Counter unreachable: a numberless random game keeps the counter serving, and issues no
+        # number the real counter could hand out again once it is back
+        storage_log.warning("Sequence counter unavailable - picking a random game", extra={'error': str(e)})
+        return game_record(None, EXPANDED_GAMES, random.randrange(len(EXPANDED_GAMES)))
+    return game_record(game_sequence, EXPANDED_GAMES)
+
+def game_record(game_sequence, games, index=None):
+    """New game record for a sequence number (or a given index when it is None), from the given
+    expanded games (one catalog per lookup)"""
+    current_game = games[(game_sequence - 1) % len(games) if index is None else index]
+    
+    return {
+        'id': str(uuid.uuid4()),
+        'type': 'letter_puzzle',
+        'available_letters': current_game.available_letters,
+        'featured_letter': current_game.featured_letter,
+        'answer': current_game.answer,
+        'guess': None,
+        'status': 'active',
+        'created_at': datetime.datetime.now().isoformat(),
+        'accessed': False,
+        'accessed_at': None,
+        'redemption_code': None,
+        'max_attempts': 1,
+        'puzzle_number': current_game.puzzle_number,
+        'answer_number': current_game.answer_number,
+        'total_answers': current_game.total_answers_in_puzzle,
+        'game_sequence': game_sequence
+    }
+
+# Bulk minting (events, printed table cards): games live until played, up to MINT_GAME_TTL
+MINT_GAME_TTL = int(os.getenv('MINT_GAME_TTL', str(30 * 24 * 60 * 60)))
+MINT_BATCH_SIZE = int(os.getenv('MINT_BATCH_SIZE', '500'))
+MINT_MAX_GAMES = int(os.getenv('MINT_MAX_GAMES', '10000'))  # per /api/mint_games request
+MINT_MAX_TTL = int(os.getenv('MINT_MAX_TTL', str(90 * 24 * 60 * 60)))
+
+def mint_games(count, ttl=MINT_GAME_TTL, batch_size=MINT_BATCH_SIZE):
+    """Create count games up front, yielding each batch of game dicts once it is saved
+
+    One counter round trip reserves every sequence number, and each batch of
+    records is written in one set_many pipeline. Writes go through the circuit
+    breaker but never to the memory fallback: a printed game has to outlive
+    this process, so a StorageError is raised rather than hidden - also up
+    front, before any number is reserved, while the circuit is open.
+    """
+    if not 0 < ttl <= MINT_MAX_TTL:
+        raise ValueError(f"Minted games must expire within {MINT_MAX_TTL // 86400} days")
+    if not STORAGE.closed:
+        raise StorageError(f"Game store unavailable ({STORAGE.name}) - not minting into memory")
+    games = EXPANDED_GAMES
+    first = SEQUENCE.reserve(count)
+    for start in range(first, first + count, batch_size):
+        batch = [game_record(seq, games) for seq in range(start, min(start + batch_size, first + count))]
+        records = {}
+        for game_data in batch:
+            records.update(split_game(game_data))
+        try:
+            saved = STORAGE.set_many(records, ttl, fallback=False)
+        except Exception as e:
+            raise StorageError(f"Failed to save minted games {start}-{start + len(batch) - 1}: {e}") from e
+        if not saved:
+            raise StorageError(f"Failed to save minted games {start}-{start + len(batch) - 1}")
+        game_log.info("Games minted", extra={'first': start, 'count': len(batch)})
+        yield batch
+
+def create_game_instance(ttl=GAME_TTL_ACTIVE):
+    """Create a game using expanded puzzle system, unplayed games expiring after ttl seconds"""
+    try:
+        game_data = new_game_data()
+        if not game_data:
             return None
         
-        game_id = str(uuid.uuid4())
-        
-        # Get current game from expanded list
-        current_game = EXPANDED_GAMES[CURRENT_GAME_INDEX % len(EXPANDED_GAMES)]
-        
-        # Move to next game
-        CURRENT_GAME_INDEX += 1
-        
-        game_data = {
-            'id': game_id,
-            'type': 'letter_puzzle',
-            'available_letters': current_game['available_letters'],
-            'featured_letter': current_game['featured_letter'],
-            'answer': current_game['answer'],
-            'guess': None,
-            'status': 'active',
-            'created_at': datetime.datetime.now().isoformat(),
-            'accessed': False,
-            'redemption_code': None,
-            'max_attempts': 1,
-            'puzzle_number': current_game['puzzle_number'],
-            'answer_number': current_game['answer_number'],
-            'total_answers': current_game['total_answers_in_puzzle'],
-            'game_sequence': CURRENT_GAME_INDEX
-        }
-        
-        # Save to storage
-        saved = redis_set(f"GAME_{game_id}", game_data)
+        # Save the immutable fields and the initial state in one round trip
+        saved = redis_set_many(split_game(game_data), ttl=ttl)
         if saved:
-            print(f"Game #{CURRENT_GAME_INDEX}: Puzzle {current_game['puzzle_number']}.{current_game['answer_number']} → '{current_game['answer']}' (featured: '{current_game['featured_letter']}')")
+            game_log.info("Game created", extra={'game_id': game_data['id'], 'sequence': game_data['game_sequence'],
+                                                 'puzzle': f"{game_data['puzzle_number']}.{game_data['answer_number']}"})
             return game_data
         else:
-            print(f"Failed to save game {game_id}")
+            game_log.error("Failed to save game", extra={'game_id': game_data['id']})
             return None
         
-    except Exception as e:
-        print(f"Error creating game: {str(e)}")
-        traceback.print_exc()
+    except Exception:
+        log.exception("Error creating game")
         return None
 
 def get_game_instance(game_id):
-    """Retrieve game instance from storage"""
+    """Retrieve game instance - cached immutable fields plus the current state from storage"""
     try:
-        return redis_get(f"GAME_{game_id}")
+        fields = GAME_CACHE.get(game_id)
+        if fields is not None:
+            state = redis_get(state_key(game_id))
+        else:
+            fields, state = redis_get_many([game_key(game_id), state_key(game_id)])
+            if not fields:
+                return None
+            if state is None and 'status' in fields:
+                # Game saved before the state record existed - split it now
+                records = split_game(fields)
+                fields, state = records[game_key(game_id)], records[state_key(game_id)]
+                redis_set_many(records, ttl=GAME_TTL_ACTIVE)
+            GAME_CACHE.put(game_id, fields)
+        if not state:
+            return None
+        return merge_game(fields, state)
     except Exception as e:
-        print(f"Error getting game {game_id}: {str(e)}")
+        log.error("Error getting game", extra={'game_id': game_id, 'error': str(e)})
         return None
 
 def update_game_instance(game_id, game_data):
-    """Update game instance in storage"""
+    """Save a game's state record, restarting the expiry of both records (the immutable one is never rewritten)"""
     try:
-        return redis_set(f"GAME_{game_id}", game_data)
+        ttl = GAME_TTL_ACTIVE if game_data.get('status') == 'active' else GAME_TTL_FINISHED
+        state = split_game(game_data)[state_key(game_id)]
+        return redis_set_many({state_key(game_id): state}, ttl=ttl, expire_keys=[game_key(game_id)])
     except Exception as e:
-        print(f"Error updating game {game_id}: {str(e)}")
+        log.error("Error updating game", extra={'game_id': game_id, 'error': str(e)})
         return False
 
 # Remove unused redemption functions and routes - no longer needed for simplified system
@@ -346,26 +598,21 @@ def validate_word(guess, available_letters, featured_letter):
             return False, f"You must use the featured letter '{featured_letter}'"
         
         # Check if word is in valid word list
-        if guess not in WORD_LIST:
+        if guess not in DICTIONARY:
             return False, "Not a valid word"
         
         # Check if all letters are available
-        available_count = {}
-        for letter in available_letters:
-            available_count[letter] = available_count.get(letter, 0) + 1
-        
-        guess_count = {}
-        for letter in guess:
-            guess_count[letter] = guess_count.get(letter, 0) + 1
-        
-        for letter, needed in guess_count.items():
-            if available_count.get(letter, 0) < needed:
-                return False, f"Not enough '{letter}' letters available"
+        available = pool_vector(tuple(available_letters))
+        if not DICTIONARY.can_form(guess, available):
+            guess_vector = DICTIONARY.vector(guess)
+            for letter in guess:
+                if letter_count(guess_vector, letter) > letter_count(available, letter):
+                    return False, f"Not enough '{letter}' letters available"
         
         return True, "Valid word"
         
     except Exception as e:
-        print(f"Error validating word: {str(e)}")
+        log.error("Error validating word", extra={'error': str(e)})
         return False, "Validation error"
 
 # Routes
@@ -383,15 +630,11 @@ def counter_device():
 def test_game():
     """Quick test route - creates a game and redirects to it"""
     try:
-        print("Creating test game...")
         game_data = create_game_instance()
         
         if game_data:
             game_id = game_data['id']
-            print(f"Test game created with ID: {game_id}")
-            print(f"Answer: {game_data['answer']}")
-            print(f"Available letters: {game_data['available_letters']}")
-            print(f"Featured letter: {game_data['featured_letter']}")
+            game_log.debug("Test game created", extra={'game_id': game_id})
             
             # Redirect directly to the game
             return redirect(url_for('play_game', game_id=game_id))
@@ -399,40 +642,153 @@ def test_game():
             return "Failed to create test game", 500
             
     except Exception as e:
-        print(f"Test game error: {str(e)}")
+        log.exception("Test game error")
         return f"Error creating test game: {str(e)}", 500
 
+def create_game_with_qr(base_url):
+    """Create a game and render its QR code - used by the QR pool's refill thread"""
+    game_data = create_game_instance(ttl=GAME_TTL_ACTIVE + QR_POOL_MAX_AGE)
+    if not game_data:
+        return None
+    with app.test_request_context('/', base_url=base_url):
+        game_url = url_for('play_game', game_id=game_data['id'], _external=True)
+    qr_code_data = generate_qr_code(game_url, QR_POOL_FORMAT)
+    if not qr_code_data:
+        return None
+    return game_data, game_url, qr_code_data
+
+# Games kept ready with their QR codes rendered, so the counter never waits on a render.
+# Pooled games are saved with QR_POOL_MAX_AGE of extra TTL and replaced once that old, so a
+# popped game always has the full GAME_TTL_ACTIVE left - as long as the counter shows a fresh one.
+QR_POOL_MAX_AGE = GAME_TTL_ACTIVE // 2
+QR_POOL = QRPool(create_game_with_qr, max_age=QR_POOL_MAX_AGE)
+
+@app.route('/api/mint_games', methods=['POST'])
+@require_admin
+def api_mint_games():
+    """Mint up to MINT_MAX_GAMES games at once, streamed back as CSV (sequence,game_id,url)
+
+    JSON body: {"count": N, "ttl_days": D}. The last line is "#complete,N", or
+    "#error,<games saved>,<message>" if a later batch failed after the 200 went
+    out - a file without either was cut short. Print sheets with mint.py.
+    """
+    body = request.get_json(silent=True) or {}
+    try:
+        count = int(body.get('count', 0))
+        ttl = int(float(body.get('ttl_days', MINT_GAME_TTL / 86400)) * 86400)
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'count and ttl_days must be numbers'}), 400
+    if not 0 < count <= MINT_MAX_GAMES or not 0 < ttl <= MINT_MAX_TTL:
+        return jsonify({'success': False, 'error': f'count must be 1-{MINT_MAX_GAMES} and ttl_days '
+                                                   f'positive, at most {MINT_MAX_TTL // 86400}'}), 400
+    
+    if not STORAGE.closed:
+        return jsonify({'success': False, 'error': 'Game store unavailable - try again later'}), 503
+    
+    base = f"{request.url_root}game/"
+    batches = mint_games(count, ttl)
+    try:
+        first = next(batches)  # fail with a status code, not a truncated stream, if storage is down
+    except StorageError as e:
+        log.exception("Bulk mint failed")
+        return jsonify({'success': False, 'error': f'Game store unavailable: {str(e)}'}), 503
+    except Exception as e:
+        log.exception("Bulk mint failed")
+        return jsonify({'success': False, 'error': f'Failed to mint games: {str(e)}'}), 500
+    
+    def rows():
+        yield "sequence,game_id,url\n"
+        saved = 0
+        try:
+            for batch in itertools.chain([first], batches):
+                saved += len(batch)
+                yield ''.join(f"{g['game_sequence']},{g['id']},{base}{g['id']}\n" for g in batch)
+        except Exception as e:
+            log.exception("Bulk mint failed partway", extra={'saved': saved, 'count': count})
+            yield f"#error,{saved},{' '.join(str(e).split())}\n"
+            return
+        yield f"#complete,{saved}\n"
+    
+    return Response(rows(), mimetype='text/csv',
+                    headers={'Content-Disposition': f'attachment; filename="games-{count}.csv"'})
+
 @app.route('/api/create_game', methods=['POST'])
 def api_create_game():
-    """API endpoint to create a new game and return QR code"""
+    """API endpoint to create a new game and return QR code
+
+    The QR image format comes from ?format= or a JSON body {"format": ...}:
+    png (base64, default), svg (markup) or bitmap ('SIZE:BASE64' modules).
+    """
     try:
-        print("Creating new letter puzzle game...")
-        game_data = create_game_instance()
+        body = request.get_json(silent=True) or {}
+        fmt = request.args.get('format') or body.get('format') or 'png'
+        if fmt not in QR_FORMATS:
+            return jsonify({'success': False, 'error': f'Unknown QR format: {fmt}'}), 400
         
-        if game_data:
-            # Generate QR code with URL to the game
-            game_url = url_for('play_game', game_id=game_data['id'], _external=True)
-            print(f"Game URL: {game_url}")
-            
-            qr_code_data = generate_qr_code(game_url)
-            
-            if qr_code_data:
-                return jsonify({
-                    'success': True,
-                    'game_id': game_data['id'],
-                    'qr_code': qr_code_data,
-                    'game_url': game_url
-                })
-            else:
-                return jsonify({'success': False, 'error': 'Failed to generate QR code'}), 500
+        entry = QR_POOL.pop(request.url_root)
+        
+        if entry:
+            game_data, game_url, qr_code_data = entry
+            if fmt != QR_POOL_FORMAT:
+                qr_code_data = generate_qr_code(game_url, fmt)
         else:
-            return jsonify({'success': False, 'error': 'Failed to create game - check server logs'}), 500
+            # Pool empty (cold start or burst) - create and render inline
+            game_log.debug("QR pool empty - creating game inline")
+            game_data = create_game_instance()
             
+            if not game_data:
+                return jsonify({'success': False, 'error': 'Failed to create game - check server logs'}), 500
+            
+            # Generate QR code with URL to the game
+            game_url = url_for('play_game', game_id=game_data['id'], _external=True)
+            qr_code_data = generate_qr_code(game_url, fmt)
+        
+        if not qr_code_data:
+            return jsonify({'success': False, 'error': 'Failed to generate QR code'}), 500
+        
+        record_event('scans', game_data['puzzle_number'])
+        return jsonify({
+            'success': True,
+            'game_id': game_data['id'],
+            'qr_code': qr_code_data,
+            'qr_format': fmt,
+            'qr_url': url_for('game_qr', game_id=game_data['id'], format=fmt if fmt != 'bitmap' else 'png'),
+            'game_url': game_url
+        })
     except Exception as e:
-        print(f"API create_game error: {str(e)}")
-        traceback.print_exc()
+        log.exception("API create_game error")
         return jsonify({'success': False, 'error': f'Server error: {str(e)}'}), 500
 
+@app.route('/game/<game_id>/qr')
+def game_qr(game_id):
+    """QR image for a game as its own cacheable resource (?format=png|svg)
+
+    The image only depends on the game URL, so it never changes: clients can
+    cache it for good and revalidate with the ETag.
+    """
+    fmt = request.args.get('format', 'png')
+    if fmt not in ('png', 'svg'):
+        return jsonify({'success': False, 'error': f'Unknown QR format: {fmt}'}), 400
+    # Only real games get an image - this response is cached publicly for a year
+    if GAME_CACHE.get(game_id) is None and not get_game_instance(game_id):
+        return jsonify({'success': False, 'error': 'Game not found'}), 404
+    
+    game_url = url_for('play_game', game_id=game_id, _external=True)
+    etag = hashlib.sha1(f"{fmt}:{game_url}".encode()).hexdigest()
+    if etag in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        qr_code_data = generate_qr_code(game_url, fmt)
+        if not qr_code_data:
+            return jsonify({'success': False, 'error': 'Failed to generate QR code'}), 500
+        if fmt == 'svg':
+            response = app.response_class(qr_code_data, mimetype='image/svg+xml')
+        else:
+            response = app.response_class(base64.b64decode(qr_code_data), mimetype='image/png')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
 @app.route('/api/check_game_access/<game_id>')
 def check_game_access(game_id):
     """Check if a game has been accessed by a customer"""
@@ -445,7 +801,39 @@ def check_game_access(game_id):
         else:
             return jsonify({'success': True, 'accessed': False})
     except Exception as e:
-        print(f"Error checking game access: {str(e)}")
+        log.error("Error checking game access", extra={'game_id': game_id, 'error': str(e)})
+        return jsonify({'success': False, 'error': str(e)})
+
+def stored_access(game_id):
+    """Whether storage says the game has been scanned or played"""
+    game_data = get_game_instance(game_id)
+    return bool(game_data and (game_data.get('guess') is not None or game_data.get('accessed', False)))
+
+@app.route('/api/wait_game_access/<game_id>')
+def wait_game_access(game_id):
+    """Long-poll version of check_game_access - answers as soon as the game is scanned
+
+    The counter passes ?check=1 on its first poll for a game, so a scan that
+    happened before this worker's listener connected is still read from storage.
+    Later polls wait for the push, then check storage once if none arrived, in
+    case the publish was lost (listener reconnecting, or publish failed).
+    """
+    try:
+        ACCESS_NOTIFIER.ensure_listening()
+        if ACCESS_NOTIFIER.seen(game_id):
+            return jsonify({'success': True, 'accessed': True})
+        
+        if (request.args.get('check') == '1' or not ACCESS_NOTIFIER.listening) and stored_access(game_id):
+            return jsonify({'success': True, 'accessed': True})
+        
+        listening = ACCESS_NOTIFIER.listening
+        accessed = ACCESS_NOTIFIER.wait(game_id, ACCESS_WAIT_TIMEOUT if listening else ACCESS_FALLBACK_POLL)
+        if not accessed and listening:
+            # One read per long-poll; without the listener the next poll reads storage anyway
+            accessed = stored_access(game_id)
+        return jsonify({'success': True, 'accessed': accessed})
+    except Exception as e:
+        log.error("Error waiting for game access", extra={'game_id': game_id, 'error': str(e)})
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/game/<game_id>')
@@ -456,32 +844,29 @@ def play_game(game_id):
         if not game_data:
             return render_template('error.html', message="Game not found or expired"), 404
         
+        if game_data.get('type') == 'wordle':
+            return redirect(url_for('play_wordle', game_id=game_id))
+        
         # CHECK: If game is already completed, block access
         if game_data.get('status') != 'active':
-            print(f"Blocked access to completed game {game_id} (status: {game_data.get('status')})")
-            
-            # Show different messages based on game outcome
-            if game_data.get('status') == 'won':
-                if game_data.get('redemption_code'):
-                    message = f"🎉 You already won this puzzle and got discount code: {game_data['redemption_code']}<br><br>Scan a new QR code for another puzzle!"
-                else:
-                    message = "🎉 You already won this puzzle!<br><br>Scan a new QR code for another puzzle!"
-            else:
-                message = "❌ This puzzle has been completed.<br><br>Scan a new QR code for a fresh puzzle!"
-            
+            game_log.info("Blocked access to completed game", extra={'game_id': game_id, 'status': game_data.get('status')})
             return redirect(url_for('blocked_access'))
         
         # Mark game as accessed when customer visits (first time only)
         if not game_data.get('accessed', False):
             game_data['accessed'] = True
+            game_data['accessed_at'] = datetime.datetime.now().isoformat()
             update_game_instance(game_id, game_data)
-            print(f"Game {game_id} accessed by customer for first time")
+            ACCESS_NOTIFIER.publish(game_id)
+            record_event('accesses', game_data['puzzle_number'])
+            game_log.info("Game accessed", extra={'game_id': game_id})
         
-        return render_template('letter_puzzle.html', 
+        return render_template('letter_puzzle.html',
                              game_id=game_id,
-                             game_data=game_data)
-    except Exception as e:
-        print(f"Error loading game {game_id}: {str(e)}")
+                             game_data=client_game_data(game_data),
+                             guess_bundle=guess_bundle(game_id, game_data))
+    except Exception:
+        log.exception("Error loading game", extra={'game_id': game_id})
         return render_template('error.html', message="Error loading game"), 500
 
 @app.route('/game/<game_id>/guess', methods=['POST'])
@@ -495,39 +880,43 @@ def submit_guess(game_id):
         guess = request.json.get('guess', '').strip().upper()
         
         # Validate the guess
-        is_valid, message = validate_word(guess, game_data['available_letters'], game_data['featured_letter'])
+        with STAGE_LATENCY.time('validate_word'):
+            is_valid, message = validate_word(guess, game_data['available_letters'], game_data['featured_letter'])
         if not is_valid:
             return jsonify({'success': False, 'error': message})
         
-        # Update game data
-        game_data['guess'] = guess
-        
-        # Check win condition
-        if guess == game_data['answer']:
-            game_data['status'] = 'won'
-            # No need to create redemption codes - just show winner screen to staff
-        else:
-            game_data['status'] = 'lost'
-        
-        # Save updated game data
-        update_game_instance(game_id, game_data)
+        # Record the guess and check the win condition atomically in storage,
+        # so a double-tap can't submit twice against the same active game
+        outcome = redis_submit_guess(state_key(game_id), guess, GAME_TTL_FINISHED, [game_key(game_id)])
+        if not outcome or not outcome['applied']:
+            return jsonify({'success': False, 'error': 'Game not available'}), 400
+        record_event('wins' if outcome['status'] == 'won' else 'losses', game_data['puzzle_number'])
+        GUESS_LOG.append(guess_event(game_data, guess, outcome['status']))
+        # No need to create redemption codes - just show winner screen to staff
         
         result = {
             'success': True,
-            'status': game_data['status'],
-            'word': game_data['answer']
+            'status': outcome['status'],
+            'word': outcome['answer']
         }
         
         # No QR codes or redemption codes needed anymore
         return jsonify(result)
         
-    except Exception as e:
-        print(f"Error submitting guess: {str(e)}")
-        traceback.print_exc()
+    except Exception:
+        log.exception("Error submitting guess", extra={'game_id': game_id})
         return jsonify({'success': False, 'error': 'Server error processing guess'}), 500
 
 # Redemption routes removed - simplified system uses direct winner screen verification
 
+@app.route('/sw.js')
+def service_worker():
+    """Service worker for the game pages - served from the root so its scope covers /game/"""
+    script = render_template('sw.js', version=ASSETS.version, dist_prefix=f"{app.static_url_path}/{DIST_DIR}/")
+    response = app.response_class(script, mimetype='application/javascript')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 @app.route('/staff')
 def staff_guide():
     """Staff guide for handling winning customers"""
@@ -536,9 +925,8 @@ def staff_guide():
 @app.route('/ad_click')
 def track_ad_click():
     """Track ad clicks and redirect to Agent Whisperer"""
-    global AD_CLICKS
-    AD_CLICKS += 1
-    print(f"Ad clicked! Total clicks: {AD_CLICKS} - Redirecting to Agent Whisperer")
+    record_event('ad_clicks')
+    log.info("Ad clicked - redirecting to Agent Whisperer")
     
     # Redirect to the actual ad destination
     return redirect("https://agentwhisperer.onrender.com")
@@ -560,9 +948,161 @@ def game_status(game_id):
             'status': game_data.get('status'),
             'message': 'Game active' if is_active else 'Game completed'
         })
-    except Exception as e:
+    except Exception:
         return jsonify({'valid': False, 'message': 'Error checking game'})
 
+def wordle_feedback(guess, answer):
+    """Feedback code for a Wordle guess - a table lookup when feedback.bin is loaded"""
+    code = FEEDBACK.code(guess, answer) if FEEDBACK else None
+    return wordle_score(guess, answer) if code is None else code
+
+def wordle_remaining(guesses, codes):
+    """How many answers still fit the feedback so far"""
+    count = FEEDBACK.remaining(guesses, codes) if FEEDBACK else None
+    return count_remaining(ANSWER_LIST, guesses, codes) if count is None else count
+
+def wordle_view(game_data):
+    """The Wordle fields the page and guess responses need - the answer only once it's over"""
+    attempts = game_data.get('attempts') or []
+    codes = [wordle_feedback(guess, game_data['answer']) for guess in attempts]
+    view = {
+        'status': game_data['status'],
+        'attempts': attempts,
+        'feedbacks': [marks(code) for code in codes],
+        'max_attempts': game_data['max_attempts'],
+        'remaining': wordle_remaining(attempts, codes) if attempts and game_data['status'] == 'active' else None
+    }
+    if game_data['status'] != 'active':
+        view['word'] = game_data['answer']
+    return view
+
+def new_wordle_data():
+    """Build a classic Wordle game record (not yet saved)"""
+    return {
+        'id': str(uuid.uuid4()),
+        'type': 'wordle',
+        'answer': random.choice(ANSWER_LIST),
+        'guess': None,
+        'attempts': [],
+        'max_attempts': WORDLE_MAX_ATTEMPTS,
+        'status': 'active',
+        'created_at': datetime.datetime.now().isoformat(),
+        'accessed': False,
+        'accessed_at': None
+    }
+
+@app.route('/api/create_wordle', methods=['POST'])
+def api_create_wordle():
+    """Create a classic Wordle game and return its QR code - same request and response as /api/create_game"""
+    try:
+        body = request.get_json(silent=True) or {}
+        fmt = request.args.get('format') or body.get('format') or 'png'
+        if fmt not in QR_FORMATS:
+            return jsonify({'success': False, 'error': f'Unknown QR format: {fmt}'}), 400
+        
+        game_data = new_wordle_data()
+        if not redis_set_many(split_game(game_data), ttl=GAME_TTL_ACTIVE):
+            return jsonify({'success': False, 'error': 'Failed to create game - check server logs'}), 500
+        game_url = url_for('play_wordle', game_id=game_data['id'], _external=True)
+        qr_code_data = generate_qr_code(game_url, fmt)
+        if not qr_code_data:
+            return jsonify({'success': False, 'error': 'Failed to generate QR code'}), 500
+        
+        record_event('scans')
+        game_log.info("Wordle game created", extra={'game_id': game_data['id']})
+        return jsonify({
+            'success': True,
+            'game_id': game_data['id'],
+            'qr_code': qr_code_data,
+            'qr_format': fmt,
+            'game_url': game_url
+        })
+    except Exception as e:
+        log.exception("API create_wordle error")
+        return jsonify({'success': False, 'error': f'Server error: {str(e)}'}), 500
+
+@app.route('/test_wordle')
+def test_wordle():
+    """Quick test route - creates a Wordle game and redirects to it"""
+    game_data = new_wordle_data()
+    if not redis_set_many(split_game(game_data), ttl=GAME_TTL_ACTIVE):
+        return "Failed to create test game", 500
+    return redirect(url_for('play_wordle', game_id=game_data['id']))
+
+@app.route('/wordle/<game_id>')
+def play_wordle(game_id):
+    """Play a classic Wordle game - finished games show their result"""
+    try:
+        game_data = get_game_instance(game_id)
+        if not game_data or game_data.get('type') != 'wordle':
+            return render_template('error.html', message="Game not found or expired"), 404
+        
+        if not game_data.get('accessed', False):
+            game_data['accessed'] = True
+            game_data['accessed_at'] = datetime.datetime.now().isoformat()
+            update_game_instance(game_id, game_data)
+            ACCESS_NOTIFIER.publish(game_id)
+            record_event('accesses')
+            game_log.info("Wordle game accessed", extra={'game_id': game_id})
+        
+        return render_template('cafe_wordle.html', game_id=game_id, game_data=wordle_view(game_data))
+    except Exception:
+        log.exception("Error loading Wordle game", extra={'game_id': game_id})
+        return render_template('error.html', message="Error loading game"), 500
+
+@app.route('/wordle/<game_id>/guess', methods=['POST'])
+def submit_wordle_guess(game_id):
+    """Score a Wordle guess; the game ends on the answer or after max_attempts guesses"""
+    try:
+        game_data = get_game_instance(game_id)
+        if not game_data or game_data.get('type') != 'wordle' or game_data['status'] != 'active':
+            return jsonify({'success': False, 'error': 'Game not available'}), 400
+        
+        guess = (request.get_json(silent=True) or {}).get('guess', '').strip().upper()
+        if len(guess) != 5:
+            return jsonify({'success': False, 'error': 'Word must be 5 letters long'})
+        if guess not in DICTIONARY:
+            return jsonify({'success': False, 'error': 'Not a valid word'})
+        
+        # Appended atomically, so a double-tap can't spend two attempts on one guess
+        outcome = redis_submit_guess(state_key(game_id), guess, GAME_TTL_FINISHED, [game_key(game_id)])
+        if not outcome or not outcome['applied']:
+            return jsonify({'success': False, 'error': 'Game not available'}), 400
+        if outcome['status'] != 'active':
+            record_event('wins' if outcome['status'] == 'won' else 'losses')
+        
+        game_data.update(status=outcome['status'], attempts=outcome['attempts'])
+        view = wordle_view(game_data)
+        return jsonify(success=True, feedback=view['feedbacks'][-1], **view)
+    except Exception:
+        log.exception("Error submitting Wordle guess", extra={'game_id': game_id})
+        return jsonify({'success': False, 'error': 'Server error processing guess'}), 500
+
+@app.route('/admin/wordle')
+@require_admin
+def admin_wordle():
+    """Classic Wordle difficulty: best openers and the answers they narrow down least"""
+    if not FEEDBACK:
+        return "<h1>Wordle Analytics</h1><p>No feedback table - build it with <code>python feedback.py</code> and restart.</p>"
+    
+    openers = FEEDBACK.openers()
+    best = openers[0][1]
+    difficulty = FEEDBACK.answer_difficulty(best)
+    hardest = sorted(difficulty.items(), key=lambda item: -item[1])[:20]
+    
+    html = "<h1>Wordle Analytics</h1>"
+    html += f"<p>{FEEDBACK.answer_count} answers x {FEEDBACK.guess_count} guesses, {WORDLE_MAX_ATTEMPTS} attempts per game</p>"
+    html += "<h2>Best Openers</h2><ol>"
+    for expected, guess in openers[:10]:
+        html += f"<li><strong>{guess}</strong>: {expected:.1f} answers left on average</li>"
+    html += "</ol>"
+    html += f"<h2>Hardest Answers After {best}</h2><ol>"
+    for answer, left in hardest:
+        html += f"<li><strong>{answer}</strong>: {left} answers still possible</li>"
+    html += "</ol>"
+    html += "<hr><p><a href='/admin'>Back to Admin</a></p>"
+    return html
+
 @app.route('/blocked')
 def blocked_access():
     """Show blocked access page with option to get new game"""
@@ -590,55 +1130,92 @@ def blocked_access():
     </body>
     </html>
     """
+@app.route('/admin/sequence')
+@require_admin
 def admin_game_sequence():
-    """Show the full game sequence"""
-    global CURRENT_GAME_INDEX, EXPANDED_GAMES
-    
+    """Show the upcoming games by puzzle and answer number, with their play stats (never the answers)"""
     if not EXPANDED_GAMES:
         expand_puzzles_to_all_answers()
     
+    # Numbers already reserved by any worker; blocks mean a few may still be unissued
+    try:
+        current_index = SEQUENCE.reserved()
+    except Exception as e:
+        return f"<h1>Game Sequence</h1><p>Game store unavailable: {e}</p>", 503
+    catalog = CATALOG
+    games = catalog.games
+    
     html = "<h1>Game Sequence</h1>"
-    html += f"<p><strong>Next game will be: #{(CURRENT_GAME_INDEX % len(EXPANDED_GAMES)) + 1}</strong></p>"
-    html += f"<p>Total games available: {len(EXPANDED_GAMES)}</p>"
+    html += f"<p><strong>Next game will be: #{(current_index % len(games)) + 1}</strong></p>"
+    html += f"<p>Total games available: {len(games)}</p>"
     html += "<hr>"
     
+    upcoming = [games[(current_index + i) % len(games)] for i in range(min(20, len(games)))]
+    # Live per-puzzle counters (one round trip) and per-answer analytics from guess_stats.py
+    try:
+        live = read_puzzles(redis_get_counts, sorted({game.puzzle_number for game in upcoming}))
+    except Exception as e:
+        log.error("Error reading puzzle counters", extra={'error': str(e)})
+        live = {}
+    analytics = read_stats()
+    
     # Show next 20 games
     html += "<h2>Next 20 Games:</h2><ol>"
-    for i in range(min(20, len(EXPANDED_GAMES))):
-        game_index = (CURRENT_GAME_INDEX + i) % len(EXPANDED_GAMES)
-        game = EXPANDED_GAMES[game_index]
+    for i, game in enumerate(upcoming):
         status = "→ NEXT" if i == 0 else ""
-        html += f"<li>Game #{CURRENT_GAME_INDEX + i + 1}: Puzzle {game['puzzle_number']}.{game['answer_number']} = <strong>{game['answer']}</strong> (featured: {game['featured_letter']}) {status}</li>"
+        html += f"<li>Game #{current_index + i + 1}: Puzzle {game.puzzle_number}.{game.answer_number} {status}"
+        pair = analytics['pairs'].get(f"{game.puzzle_number}.{game.answer_number}")
+        if pair:
+            summary = pair_summary(pair)
+            ttg = f", median time ≤{summary['median_ttg']}s" if summary['median_ttg'] is not None else ""
+            html += f"<br><small>This answer: won {summary['wins']}/{summary['games']} ({summary['win_rate']:.0%}){ttg}</small>"
+        counts = live.get(game.puzzle_number)
+        if counts and counts['wins'] + counts['losses']:
+            wrong = ', '.join(f"{guess} ({count})" for guess, count in top_wrong_guesses(analytics['puzzles'].get(str(game.puzzle_number)), 3))
+            html += f"<br><small>Puzzle {game.puzzle_number}: {counts['wins']} won, {counts['losses']} lost"
+            html += f"; common wrong guesses: {wrong}</small>" if wrong else "</small>"
+        html += "</li>"
     html += "</ol>"
+    if analytics['events']:
+        html += f"<p><small>Answer stats from {analytics['events']} logged guesses (run guess_stats.py to refresh)</small></p>"
     
     # Show puzzle breakdown
     html += "<hr><h2>Puzzle Breakdown:</h2>"
-    puzzle_counts = {}
-    for game in EXPANDED_GAMES:
-        puzzle_num = game['puzzle_number']
-        if puzzle_num not in puzzle_counts:
-            puzzle_counts[puzzle_num] = 0
-        puzzle_counts[puzzle_num] += 1
-    
-    for puzzle_num in sorted(puzzle_counts.keys()):
-        count = puzzle_counts[puzzle_num]
+    for puzzle_idx in range(catalog.puzzle_count):
+        puzzle_num = puzzle_idx + 1
+        count = catalog.answer_count(puzzle_idx)
+        if not count:
+            continue
         html += f"<p><strong>Puzzle {puzzle_num}:</strong> {count} different answers</p>"
     
-    html += f"<hr><p><a href='/counter_device'>Back to Counter Device</a></p>"
+    html += "<hr><p><a href='/counter_device'>Back to Counter Device</a></p>"
     
     return html
 
-# Simple storage for admin metrics
-AD_CLICKS = 0
+@app.route('/admin/reload', methods=['POST'])
+@require_admin
+def admin_reload():
+    """Reload the word and puzzle files in this worker now (?force=1 even if unchanged)
+
+    Other workers pick the change up on their next source check.
+    """
+    try:
+        stats = reload_catalog(force=request.args.get('force') == '1')
+    except Exception as e:
+        log.error("Catalog reload failed", extra={'error': str(e)})
+        return jsonify({'success': False, 'error': str(e)}), 500
+    return jsonify({'success': True, 'reloaded': stats is not None, 'stats': stats or CATALOG_STATE['last_reload']})
 
 @app.route('/admin')
+@require_admin
 def admin_dashboard():
     """Simple admin dashboard - 3 key metrics only"""
     try:
-        # Calculate key metrics
-        total_scans = CURRENT_GAME_INDEX  # Total games created (scanned)
-        total_winners = sum(1 for g in GAMES_STORAGE.values() if g.get('status') == 'won')
-        total_ad_clicks = AD_CLICKS
+        # Key metrics - pre-aggregated counters shared by all workers, one round trip
+        totals = read_totals(redis_get_counts, ('scans', 'wins', 'ad_clicks'))
+        total_scans = totals['scans']
+        total_winners = totals['wins']
+        total_ad_clicks = totals['ad_clicks']
         
         return f"""
         <!DOCTYPE html>
@@ -746,6 +1323,7 @@ def admin_dashboard():
                     <a href="/counter_device" class="link">🎯 Counter Device</a>
                     <a href="/staff" class="link">👥 Staff Guide</a>
                     <a href="/test_game" class="link">🧪 Test Game</a>
+                    <a href="/admin/sequence" class="link">🔢 Game Sequence</a>
                     <a href="javascript:window.location.reload()" class="link">🔄 Refresh</a>
                 </div>
 
@@ -758,24 +1336,70 @@ def admin_dashboard():
         """
                              
     except Exception as e:
-        print(f"Admin panel error: {str(e)}")
+        log.exception("Admin panel error")
         return f"<h1>Admin Error</h1><p>{str(e)}</p>", 500
 
 @app.route('/health')
 def health_check():
     """Simple health check endpoint"""
+    try:
+        game_sequence = SEQUENCE.reserved()
+    except Exception as e:
+        game_sequence = None  # the counter has no fallback; games are picked at random meanwhile
+        log.warning("Sequence counter unavailable for health check", extra={'error': str(e)})
+    totals = read_totals(redis_get_counts)
     return jsonify({
-        'status': 'healthy',
+        'status': 'healthy' if STORAGE.closed and game_sequence is not None else 'degraded',
         'timestamp': datetime.datetime.now().isoformat(),
         'game_type': 'multi_answer_letter_puzzle',
         'puzzles_available': len(LETTER_PUZZLES),
         'total_games': len(EXPANDED_GAMES),
-        'current_game_index': CURRENT_GAME_INDEX,
-        'qr_scans': CURRENT_GAME_INDEX,
-        'winners': sum(1 for g in GAMES_STORAGE.values() if g.get('status') == 'won'),
-        'ad_clicks': AD_CLICKS
+        'last_catalog_reload': CATALOG_STATE['last_reload'],
+        'current_game_index': game_sequence,
+        'qr_scans': totals['scans'],
+        'accesses': totals['accesses'],
+        'winners': totals['wins'],
+        'losses': totals['losses'],
+        'ad_clicks': totals['ad_clicks'],
+        'qr_pool': QR_POOL.stats(),
+        'game_cache': GAME_CACHE.stats(),
+        'guess_log': GUESS_LOG.stats(),
+        'logging': log_stats(),
+        'fallback_store': FALLBACK_STORE.stats(),
+        'storage': STORAGE.stats()
     })
 
+@app.route('/api/stats')
+def api_stats():
+    """Dashboard counters: totals plus hourly buckets (?hours=24) and per puzzle (?puzzle=N, repeatable)"""
+    try:
+        hours = min(max(int(request.args.get('hours', 24)), 1), 24 * 7)
+        puzzles = [int(p) for p in request.args.getlist('puzzle')]
+        return jsonify({
+            'success': True,
+            'totals': read_totals(redis_get_counts),
+            'hourly': read_hourly(redis_get_counts, hours),
+            'puzzles': read_puzzles(redis_get_counts, puzzles) if puzzles else {}
+        })
+    except ValueError:
+        return jsonify({'success': False, 'error': 'hours and puzzle must be integers'}), 400
+    except Exception as e:
+        log.exception("Stats error")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint: request, storage and stage latency histograms"""
+    logging_stats = log_stats()
+    gauges = {
+        'cafe_storage_circuit_open': 0 if STORAGE.closed else 1,
+        'cafe_qr_pool_depth': QR_POOL.stats()['depth'],
+        'cafe_game_cache_entries': GAME_CACHE.stats()['entries'],
+        'cafe_log_dropped_total': logging_stats.get('dropped', 0),
+        'cafe_log_sampled_out_total': logging_stats.get('sampled_out', 0)
+    }
+    return Response(render_metrics(gauges), mimetype='text/plain; version=0.0.4')
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
@@ -794,7 +1418,7 @@ if __name__ == '__main__':
     print("🔗 URLs:")
     print("   Counter Device: http://localhost:5000")
     print("   TEST GAME:      http://localhost:5000/test_game")
-    print("   ADMIN PANEL:    http://localhost:5000/admin")
+    print("   ADMIN PANEL:    http://localhost:5000/admin" + ("" if ADMIN_PASSWORD else "  (set ADMIN_PASSWORD to unlock)"))
     print("   Staff Guide:    http://localhost:5000/staff")
     print("   Health Check:   http://localhost:5000/health")
     print("   Ad Click Track: http://localhost:5000/ad_click")
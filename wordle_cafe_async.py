@@ -0,0 +1,304 @@
+"""Asyncio serving mode for the game API.
+
+    hypercorn wordle_cafe_async:application --workers 2 --bind 0.0.0.0:$PORT
+
+The hot customer and counter routes are Quart views that await storage on a
+shared async client:
+    /api/create_game, /game/<id>, /game/<id>/guess, /game/<id>/status and
+    /api/check_game_access/<id>
+A slow Upstash response then only parks a coroutine, and thousands of
+in-flight storage calls share one worker. Every other route (counter page,
+admin, QR images, long-polls...) is served by the regular Flask app, run in
+a thread pool behind the same ASGI entry point.
+
+Catalog, validation, QR rendering and the game sequence are shared with
+wordle_cafe.py.
+"""
+
+import asyncio
+import datetime
+import logging
+import time
+
+from quart import Quart, render_template, request, redirect, url_for, jsonify, g
+from hypercorn.middleware import AsyncioWSGIMiddleware
+from werkzeug.exceptions import MethodNotAllowed, NotFound
+
+import wordle_cafe as cafe
+from access_notifier import ACCESS_CHANNEL
+from async_storage import get_async_store
+from counters import event_increments
+from game_cache import (game_key, state_key, split_game, merge_game,
+                        GAME_TTL_ACTIVE, GAME_TTL_FINISHED)
+from guess_log import guess_event
+from metrics import REQUEST_LATENCY, STAGE_LATENCY, STORAGE_LATENCY, start_flusher as start_metrics_flusher
+from storage import GAME_STORE, MemoryStore
+
+app = Quart(__name__, static_folder=None)  # /static is served by the Flask app
+app.secret_key = cafe.app.secret_key
+app.add_template_global(cafe.ASSETS.picture, 'asset')
+
+STORAGE = None  # created on the serving event loop in open_storage()
+
+log = logging.getLogger('cafe.app')
+game_log = logging.getLogger('cafe.games')
+storage_log = logging.getLogger('cafe.storage')
+
+
+@app.before_request
+async def start_request_timer():
+    start_metrics_flusher()
+    cafe.check_catalog_sources()
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+async def observe_request_latency(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_LATENCY.observe((route, request.method, response.status_code), time.perf_counter() - start)
+    return response
+
+
+@app.before_serving
+async def open_storage():
+    global STORAGE
+    STORAGE = get_async_store(
+        GAME_STORE, url=cafe.UPSTASH_REDIS_URL, token=cafe.UPSTASH_REDIS_TOKEN,
+        store=cafe.STORAGE.primary if isinstance(cafe.STORAGE.primary, MemoryStore) else None)
+
+
+@app.after_serving
+async def close_storage():
+    await STORAGE.close()
+
+
+async def guarded(method, *args):
+    """Run an async storage call behind the worker's circuit breaker (wordle_cafe.STORAGE)
+
+    Falls back to memory storage when the call fails or the circuit is open.
+    """
+    breaker = cafe.STORAGE
+    if breaker.closed:
+        start = time.perf_counter()
+        try:
+            result = await getattr(STORAGE, method)(*args)
+        except Exception as e:
+            STORAGE_LATENCY.observe((STORAGE.name, method, 'error'), time.perf_counter() - start)
+            storage_log.warning("Storage call failed - using memory storage", extra={'method': method, 'error': str(e)})
+            breaker.record_failure(e)
+        else:
+            elapsed = time.perf_counter() - start
+            STORAGE_LATENCY.observe((STORAGE.name, method, 'ok'), elapsed)
+            breaker.record_success(elapsed)
+            return result
+    return breaker.run_fallback(method, *args)
+
+async def store_get(key):
+    return await guarded('get', key)
+
+async def store_set(key, value, ttl=None):
+    return await guarded('set', key, value, ttl)
+
+async def store_get_many(keys):
+    return await guarded('get_many', keys)
+
+async def store_set_many(items, ttl=None, expire_keys=()):
+    return await guarded('set_many', items, ttl, expire_keys)
+
+async def store_submit_guess(key, guess, ttl=None, expire_keys=()):
+    return await guarded('submit_guess', key, guess, ttl, expire_keys)
+
+
+async def record_event(event, puzzle_number=None):
+    """Async wordle_cafe.record_event"""
+    await guarded('incr_many', *event_increments(event, puzzle_number))
+
+
+async def load_game(game_id):
+    """Async get_game_instance: cached immutable fields plus the current state"""
+    fields = cafe.GAME_CACHE.get(game_id)
+    if fields is not None:
+        state = await store_get(state_key(game_id))
+    else:
+        fields, state = await store_get_many([game_key(game_id), state_key(game_id)])
+        if not fields:
+            return None
+        if state is None and 'status' in fields:
+            # Game saved before the state record existed - split it now
+            records = split_game(fields)
+            fields, state = records[game_key(game_id)], records[state_key(game_id)]
+            await store_set_many(records, ttl=GAME_TTL_ACTIVE)
+        cafe.GAME_CACHE.put(game_id, fields)
+    if not state:
+        return None
+    return merge_game(fields, state)
+
+
+@app.route('/api/create_game', methods=['POST'])
+async def api_create_game():
+    """API endpoint to create a new game and return QR code"""
+    try:
+        body = await request.get_json(silent=True) or {}
+        fmt = request.args.get('format') or body.get('format') or 'png'
+        if fmt not in cafe.QR_FORMATS:
+            return jsonify({'success': False, 'error': f'Unknown QR format: {fmt}'}), 400
+
+        entry = cafe.QR_POOL.pop(request.url_root)
+
+        if entry:
+            game_data, game_url, qr_code_data = entry
+            if fmt != cafe.QR_POOL_FORMAT:
+                qr_code_data = await asyncio.to_thread(cafe.generate_qr_code, game_url, fmt)
+        else:
+            # new_game_data may reserve a sequence block from storage - keep it off the loop
+            game_data = await asyncio.to_thread(cafe.new_game_data)
+            if not game_data or not await store_set_many(split_game(game_data), ttl=GAME_TTL_ACTIVE):
+                return jsonify({'success': False, 'error': 'Failed to create game - check server logs'}), 500
+
+            game_url = url_for('play_game', game_id=game_data['id'], _external=True)
+            qr_code_data = await asyncio.to_thread(cafe.generate_qr_code, game_url, fmt)
+
+        if not qr_code_data:
+            return jsonify({'success': False, 'error': 'Failed to generate QR code'}), 500
+
+        await record_event('scans', game_data['puzzle_number'])
+        return jsonify({
+            'success': True,
+            'game_id': game_data['id'],
+            'qr_code': qr_code_data,
+            'qr_format': fmt,
+            'qr_url': f"/game/{game_data['id']}/qr?format={fmt if fmt != 'bitmap' else 'png'}",
+            'game_url': game_url
+        })
+
+    except Exception as e:
+        log.exception("API create_game error")
+        return jsonify({'success': False, 'error': f'Server error: {str(e)}'}), 500
+
+
+@app.route('/api/check_game_access/<game_id>')
+async def check_game_access(game_id):
+    """Check if a game has been accessed by a customer"""
+    try:
+        game_data = await load_game(game_id)
+        if game_data:
+            accessed = game_data.get('guess') is not None or game_data.get('accessed', False)
+            return jsonify({'success': True, 'accessed': accessed})
+        else:
+            return jsonify({'success': True, 'accessed': False})
+    except Exception as e:
+        log.error("Error checking game access", extra={'game_id': game_id, 'error': str(e)})
+        return jsonify({'success': False, 'error': str(e)})
+
+
+@app.route('/game/<game_id>')
+async def play_game(game_id):
+    """Play a specific game instance - ONE ATTEMPT ONLY"""
+    try:
+        game_data = await load_game(game_id)
+        if not game_data:
+            return await render_template('error.html', message="Game not found or expired"), 404
+
+        if game_data.get('type') == 'wordle':
+            return redirect(f'/wordle/{game_id}')
+
+        if game_data.get('status') != 'active':
+            game_log.info("Blocked access to completed game", extra={'game_id': game_id, 'status': game_data.get('status')})
+            return redirect('/blocked')
+
+        # Mark game as accessed when customer visits (first time only)
+        if not game_data.get('accessed', False):
+            game_data['accessed'] = True
+            game_data['accessed_at'] = datetime.datetime.now().isoformat()
+            # Independent writes, so they share one round trip's worth of waiting.
+            # Every worker's access listener picks up the publish and wakes the counter.
+            await asyncio.gather(
+                store_set_many({state_key(game_id): split_game(game_data)[state_key(game_id)]},
+                               ttl=GAME_TTL_ACTIVE, expire_keys=[game_key(game_id)]),
+                guarded('publish', ACCESS_CHANNEL, game_id),
+                record_event('accesses', game_data['puzzle_number']))
+            game_log.info("Game accessed", extra={'game_id': game_id})
+
+        return await render_template('letter_puzzle.html',
+                                     game_id=game_id,
+                                     game_data=cafe.client_game_data(game_data),
+                                     guess_bundle=cafe.guess_bundle(game_id, game_data))
+    except Exception:
+        log.exception("Error loading game", extra={'game_id': game_id})
+        return await render_template('error.html', message="Error loading game"), 500
+
+
+@app.route('/game/<game_id>/guess', methods=['POST'])
+async def submit_guess(game_id):
+    """Submit a guess for a specific game"""
+    try:
+        game_data = await load_game(game_id)
+        if not game_data or game_data['status'] != 'active':
+            return jsonify({'success': False, 'error': 'Game not available'}), 400
+
+        body = await request.get_json()
+        guess = body.get('guess', '').strip().upper()
+
+        with STAGE_LATENCY.time('validate_word'):
+            is_valid, message = cafe.validate_word(guess, game_data['available_letters'], game_data['featured_letter'])
+        if not is_valid:
+            return jsonify({'success': False, 'error': message})
+
+        outcome = await store_submit_guess(state_key(game_id), guess, GAME_TTL_FINISHED, [game_key(game_id)])
+        if not outcome or not outcome['applied']:
+            return jsonify({'success': False, 'error': 'Game not available'}), 400
+        await record_event('wins' if outcome['status'] == 'won' else 'losses', game_data['puzzle_number'])
+        # A blocking file append - keep it off the event loop
+        await asyncio.to_thread(cafe.GUESS_LOG.append, guess_event(game_data, guess, outcome['status']))
+
+        return jsonify({
+            'success': True,
+            'status': outcome['status'],
+            'word': outcome['answer']
+        })
+
+    except Exception:
+        log.exception("Error submitting guess", extra={'game_id': game_id})
+        return jsonify({'success': False, 'error': 'Server error processing guess'}), 500
+
+
+@app.route('/game/<game_id>/status')
+async def game_status(game_id):
+    """Check game status - for frontend to verify game is still active"""
+    try:
+        game_data = await load_game(game_id)
+        if not game_data:
+            return jsonify({'valid': False, 'message': 'Game not found'})
+
+        is_active = game_data.get('status') == 'active'
+
+        return jsonify({
+            'valid': is_active,
+            'status': game_data.get('status'),
+            'message': 'Game active' if is_active else 'Game completed'
+        })
+    except Exception:
+        return jsonify({'valid': False, 'message': 'Error checking game'})
+
+
+# Everything else goes to the Flask app in a thread pool
+flask_app = AsyncioWSGIMiddleware(cafe.app)
+
+
+def is_async_route(path):
+    try:
+        app.url_map.bind('').match(path, method='GET')
+    except MethodNotAllowed:
+        return True
+    except NotFound:
+        return False
+    return True
+
+
+async def application(scope, receive, send):
+    """ASGI entry point: async views for the hot routes, Flask for the rest"""
+    if scope['type'] == 'http' and not is_async_route(scope['path']):
+        return await flask_app(scope, receive, send)
+    return await app(scope, receive, send)